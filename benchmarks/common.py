@@ -0,0 +1,74 @@
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+# Required settings, real credentials are never needed by the benchmarks
+DEFAULT_ENV = {
+    "SERVER__RELOAD": "False",
+    "GOOGLE__OAUTH__CLIENT_ID": "benchmark-google-client",
+    "GOOGLE__OAUTH__CLIENT_SECRET": "benchmark-google-secret",
+    "YANDEX__OAUTH__CLIENT_ID": "benchmark-yandex-client",
+    "YANDEX__OAUTH__CLIENT_SECRET": "benchmark-yandex-secret",
+    "RATE_LIMIT__ENABLED": "False",  # All load comes from a single address
+}
+
+
+def setup_environment(**overrides: str) -> None:
+    """Make `src` importable and provide settings, must run before importing app modules."""
+
+    for name, value in DEFAULT_ENV.items():
+        os.environ.setdefault(name, value)
+
+    os.environ.update(overrides)
+
+    if str(SRC_DIR) not in sys.path:
+        sys.path.insert(0, str(SRC_DIR))
+
+
+def percentile(samples: list[float], percent: float) -> float:
+    if not samples:
+        return 0.0
+
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+
+    return ordered[index]
+
+
+async def run_load(
+    request: Callable[[], Awaitable[object]],
+    total: int,
+    concurrency: int,
+) -> dict[str, float]:
+    """Run `total` requests with `concurrency` workers and return throughput and latency stats."""
+
+    latencies: list[float] = []
+    remaining = total
+
+    async def worker() -> None:
+        nonlocal remaining
+
+        while remaining > 0:
+            remaining -= 1
+            started_at = time.perf_counter()
+            await request()
+            latencies.append(time.perf_counter() - started_at)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+    }
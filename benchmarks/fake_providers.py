@@ -0,0 +1,388 @@
+"""Local stand-ins for Google and Yandex OAuth/API endpoints.
+
+Every endpoint sleeps for a configurable latency and fails with a configurable
+probability, so the service can be load tested without real providers. Google
+endpoints honour the `fields` partial response parameter like the real API, and
+id_tokens are RS256 signed with a key generated at startup and published at /google/certs.
+
+    python benchmarks/fake_providers.py --port 9100 --latency 0.05 --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import base64
+import dataclasses
+import hashlib
+import itertools
+import json
+import random
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from urllib.parse import unquote
+
+from aiohttp import web
+from yarl import URL
+
+from common import DEFAULT_ENV
+
+# ASN.1 DigestInfo prefix for SHA-256 (RFC 8017, section 9.2)
+SHA256_DIGEST_INFO_PREFIX = bytes.fromhex("3031300d060960864801650304020105000420")
+
+
+@dataclasses.dataclass
+class FakeProvidersConfig:
+    latency: float = 0.05  # Mean response latency (in seconds)
+    jitter: float = 0.2  # Relative latency spread, 0.2 means +-20%
+    error_rate: float = 0.0  # Probability of 503 response
+    calendars: int = 3  # Calendars in the user's calendar list
+    sync_events: int = 50  # Events returned by a full calendar sync, incremental syncs return no changes
+    audience: str = DEFAULT_ENV["GOOGLE__OAUTH__CLIENT_ID"]  # Service client id, the aud claim of id_tokens
+
+
+def _b64url_encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _is_probable_prime(n: int, rounds: int = 40) -> bool:
+    """Miller-Rabin test."""
+
+    for p in (3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37):
+        if n % p == 0:
+            return n == p
+
+    d, s = n - 1, 0
+
+    while d % 2 == 0:
+        d, s = d // 2, s + 1
+
+    for _ in range(rounds):
+        x = pow(random.randrange(2, n - 1), d, n)
+
+        if x in (1, n - 1):
+            continue
+
+        for _ in range(s - 1):
+            x = pow(x, 2, n)
+
+            if x == n - 1:
+                break
+        else:
+            return False
+
+    return True
+
+
+def _random_prime(bits: int) -> int:
+    while True:
+        candidate = random.getrandbits(bits) | (0b11 << (bits - 2)) | 1  # Top two bits set, product has 2 * bits
+
+        if _is_probable_prime(candidate):
+            return candidate
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class RSASigningKey:
+    """RSA key signing id_tokens the way Google does (RS256), its public part is served as JWK."""
+
+    kid: str
+    n: int
+    e: int
+    p: int
+    q: int
+    d: int
+
+    @classmethod
+    def generate(cls, bits: int = 2048, e: int = 65537) -> "RSASigningKey":
+        while True:
+            p, q = _random_prime(bits // 2), _random_prime(bits // 2)
+            phi = (p - 1) * (q - 1)
+
+            if p != q and phi % e != 0:
+                break
+
+        n = p * q
+
+        return cls(kid=hashlib.sha256(str(n).encode()).hexdigest()[:40], n=n, e=e, p=p, q=q, d=pow(e, -1, phi))
+
+    def jwk(self) -> dict:
+        size = (self.n.bit_length() + 7) // 8
+
+        return {
+            "kty": "RSA",
+            "alg": "RS256",
+            "use": "sig",
+            "kid": self.kid,
+            "n": _b64url_encode(self.n.to_bytes(size, "big")),
+            "e": _b64url_encode(self.e.to_bytes((self.e.bit_length() + 7) // 8, "big")),
+        }
+
+    def sign_rs256(self, message: bytes) -> bytes:
+        """RSASSA-PKCS1-v1_5 SHA-256 signature."""
+
+        size = (self.n.bit_length() + 7) // 8
+        digest_info = SHA256_DIGEST_INFO_PREFIX + hashlib.sha256(message).digest()
+        encoded = b"\x00\x01" + b"\xff" * (size - len(digest_info) - 3) + b"\x00" + digest_info
+
+        message_int = int.from_bytes(encoded, "big")
+
+        # Chinese remainder theorem, about 3x faster than pow(message_int, d, n), signing runs on the event loop
+        m1 = pow(message_int, self.d % (self.p - 1), self.p)
+        m2 = pow(message_int, self.d % (self.q - 1), self.q)
+        signature = m2 + self.q * ((m1 - m2) * pow(self.q, -1, self.p) % self.p)
+
+        return signature.to_bytes(size, "big")
+
+    def id_token(self, claims: dict) -> str:
+        header = {"alg": "RS256", "kid": self.kid, "typ": "JWT"}
+        signing_input = ".".join(_b64url_encode(json.dumps(part).encode()) for part in (header, claims))
+
+        return f"{signing_input}.{_b64url_encode(self.sign_rs256(signing_input.encode()))}"
+
+
+FieldsTree = dict[str, "FieldsTree | None"]  # Selected field -> its selected subfields, None - the whole value
+
+
+def parse_fields(mask: str) -> FieldsTree:
+    """Parse Google partial response mask, `a,b(c,d(e))` (the `a/b` path form is not supported)."""
+
+    def parse(position: int) -> tuple[FieldsTree, int]:
+        tree: FieldsTree = {}
+
+        while position < len(mask):
+            end = position
+
+            while end < len(mask) and mask[end] not in ",()":
+                end += 1
+
+            name, position, subtree = mask[position:end].strip(), end, None
+
+            if position < len(mask) and mask[position] == "(":
+                subtree, position = parse(position + 1)
+                position += 1  # Closing parenthesis
+
+            tree[name] = subtree
+
+            if position < len(mask) and mask[position] == ")":
+                break
+
+            position += 1  # Comma
+
+        return tree, position
+
+    return parse(0)[0]
+
+
+def select_fields(payload: Any, mask: str | FieldsTree | None) -> Any:
+    """Keep only the fields of the mask, lists apply it to every item."""
+
+    if mask is None:
+        return payload
+
+    tree = parse_fields(mask) if isinstance(mask, str) else mask
+
+    if isinstance(payload, list):
+        return [select_fields(item, tree) for item in payload]
+
+    if isinstance(payload, dict):
+        return {name: select_fields(payload[name], subtree) for name, subtree in tree.items() if name in payload}
+
+    return payload
+
+
+def provider_urls(base_url: str) -> dict[str, str]:
+    """Service settings (as env variables) pointing at fake providers running on base_url."""
+
+    return {
+        "GOOGLE__OAUTH__GOOGLE_TOKEN_URL": f"{base_url}/google/token",
+        "GOOGLE__OAUTH__GOOGLE_USER_INFO_URL": f"{base_url}/google/userinfo",
+        "GOOGLE__OAUTH__GOOGLE_JWKS_URL": f"{base_url}/google/certs",
+        "GOOGLE__OAUTH__GOOGLE_CALENDAR_API_URL": f"{base_url}/google/calendar/v3",
+        "GOOGLE__OAUTH__GOOGLE_CALENDAR_BATCH_URL": f"{base_url}/google/batch/calendar/v3",
+        "YANDEX__OAUTH__YANDEX_TOKEN_URL": f"{base_url}/yandex/token",
+        "YANDEX__OAUTH__YANDEX_USER_INFO_URL": f"{base_url}/yandex/info",
+    }
+
+
+def create_app(config: FakeProvidersConfig) -> web.Application:
+    counter = itertools.count(1)
+    signing_key = RSASigningKey.generate()
+
+    @web.middleware
+    async def simulate_upstream(request: web.Request, handler) -> web.StreamResponse:
+        await asyncio.sleep(max(0.0, config.latency * random.uniform(1 - config.jitter, 1 + config.jitter)))
+
+        if random.random() < config.error_rate:
+            return web.json_response({"error": "backendError"}, status=503)
+
+        return await handler(request)
+
+    async def google_token(request: web.Request) -> web.Response:
+        await request.post()
+        n = next(counter)
+        now = int(time.time())
+        id_token = signing_key.id_token(
+            {
+                "iss": "https://accounts.google.com",
+                "aud": config.audience,
+                "sub": f"google-access-{n}",  # Same identity userinfo reports for the access token
+                "email": f"google-access-{n}@example.com",
+                "email_verified": True,
+                "iat": now,
+                "exp": now + 3600,
+            }
+        )
+
+        return web.json_response(
+            {
+                "access_token": f"google-access-{n}",
+                "expires_in": 3599,
+                "refresh_token": f"google-refresh-{n}",
+                "scope": "openid email",
+                "token_type": "Bearer",
+                "id_token": id_token,
+                "refresh_token_expires_in": 604799,
+            }
+        )
+
+    async def google_user_info(request: web.Request) -> web.Response:
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+
+        return web.json_response(
+            select_fields(
+                {"id": token, "email": f"{token}@example.com", "verified_email": True},
+                request.query.get("fields"),
+            )
+        )
+
+    async def google_certs(request: web.Request) -> web.Response:
+        return web.json_response({"keys": [signing_key.jwk()]}, headers={"Cache-Control": "public, max-age=3600"})
+
+    def calendar_ids() -> list[str]:
+        return ["primary"] + [f"calendar-{n}@group.calendar.google.com" for n in range(1, config.calendars)]
+
+    def events_payload(calendar_id: str, max_results: int) -> dict:
+        # Calendars get interleaved start times, so merging them is meaningful
+        offset = calendar_ids().index(calendar_id) if calendar_id in calendar_ids() else 0
+        start = datetime.now(timezone.utc) + timedelta(hours=1, minutes=10 * offset)
+
+        return {
+            "kind": "calendar#events",
+            "timeZone": "UTC",
+            "items": [
+                {
+                    "id": f"event-{i}",
+                    "status": "confirmed",
+                    "summary": f"Event {i}",
+                    "start": {"dateTime": (start + timedelta(hours=i)).isoformat()},
+                    "end": {"dateTime": (start + timedelta(hours=i, minutes=30)).isoformat()},
+                }
+                for i in range(max_results)
+            ],
+        }
+
+    async def google_events(request: web.Request) -> web.Response:
+        if "syncToken" in request.query:
+            payload = {"kind": "calendar#events", "items": [], "nextSyncToken": "fake-sync-token"}
+        elif "orderBy" not in request.query:  # Full sync
+            payload = events_payload(request.match_info["calendar_id"], config.sync_events)
+            payload |= {"nextSyncToken": "fake-sync-token"}
+        else:
+            payload = events_payload(request.match_info["calendar_id"], int(request.query.get("maxResults", 1)))
+
+        return web.json_response(select_fields(payload, request.query.get("fields")))
+
+    async def google_calendar_list(request: web.Request) -> web.Response:
+        payload = {
+            "kind": "calendar#calendarList",
+            "items": [
+                {"id": calendar_id, "summary": calendar_id, "primary": index == 0, "selected": True}
+                for index, calendar_id in enumerate(calendar_ids())
+            ],
+        }
+
+        return web.json_response(select_fields(payload, request.query.get("fields")))
+
+    async def google_batch(request: web.Request) -> web.Response:
+        boundary = request.headers["Content-Type"].split("boundary=")[1]
+        parts = []
+
+        for part in (await request.read()).decode().split(f"--{boundary}")[1:-1]:
+            content_id = re.search(r"Content-ID: <(.+?)>", part).group(1)
+            url = URL(re.search(r"^GET (\S+)", part, re.M).group(1))
+            payload = select_fields(
+                events_payload(unquote(url.path.split("/")[-2]), int(url.query.get("maxResults", 1))),
+                url.query.get("fields"),
+            )
+            parts.append(
+                f"--batch_fake\r\nContent-Type: application/http\r\nContent-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n\r\n{json.dumps(payload)}\r\n"
+            )
+
+        return web.Response(
+            body="".join(parts) + "--batch_fake--\r\n",
+            headers={"Content-Type": "multipart/mixed; boundary=batch_fake"},
+        )
+
+    async def yandex_token(request: web.Request) -> web.Response:
+        await request.post()
+        n = next(counter)
+
+        return web.json_response(
+            {
+                "access_token": f"yandex-access-{n}",
+                "expires_in": 31536000,
+                "token_type": "bearer",
+                "refresh_token": f"yandex-refresh-{n}",
+            }
+        )
+
+    async def yandex_info(request: web.Request) -> web.Response:
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+
+        return web.Response(
+            text=json.dumps({"id": token, "login": token, "default_email": f"{token}@yandex.ru", "emails": []}),
+            content_type="application/json",
+        )
+
+    async def head_root(request: web.Request) -> web.Response:
+        return web.Response()
+
+    app = web.Application(middlewares=[simulate_upstream])
+    app.router.add_post("/google/token", google_token)
+    app.router.add_get("/google/userinfo", google_user_info)
+    app.router.add_get("/google/certs", google_certs)
+    app.router.add_get("/google/calendar/v3/calendars/{calendar_id}/events", google_events)
+    app.router.add_get("/google/calendar/v3/users/me/calendarList", google_calendar_list)
+    app.router.add_post("/google/batch/calendar/v3", google_batch)
+    app.router.add_post("/yandex/token", yandex_token)
+    app.router.add_get("/yandex/info", yandex_info)
+    app.router.add_route("HEAD", "/", head_root)  # Connection warmup
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--calendars", type=int, default=3)
+    parser.add_argument("--audience", default=FakeProvidersConfig.audience, help="Service Google client id")
+    args = parser.parse_args()
+
+    config = FakeProvidersConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        calendars=args.calendars,
+        audience=args.audience,
+    )
+    web.run_app(create_app(config), host=args.host, port=args.port, print=None, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Local stand-in for Redis, speaking the subset of RESP2 used by the storage backend.
+
+Supports PING, AUTH, SELECT, GET, SET (with EX/PX), DEL and GETDEL on a single
+in-memory keyspace, enough to run the service with STORAGE__BACKEND=redis.
+
+    python benchmarks/fake_redis.py --port 6390
+"""
+
+import argparse
+import asyncio
+import time
+
+
+class FakeRedis:
+    def __init__(self, password: str | None = None) -> None:
+        self.password = password
+        self.data: dict[bytes, tuple[float | None, bytes]] = {}
+
+    async def start(self, host: str, port: int) -> asyncio.Server:
+        return await asyncio.start_server(self._handle, host, port)
+
+    def _get(self, key: bytes) -> bytes | None:
+        entry = self.data.get(key)
+
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+
+        return value
+
+    def _execute(self, command: list[bytes], authenticated: bool) -> bytes:
+        name, args = command[0].upper(), command[1:]
+
+        if name == b"AUTH":
+            return b"+OK\r\n" if args[-1].decode() == self.password else b"-WRONGPASS invalid password\r\n"
+        if self.password is not None and not authenticated:
+            return b"-NOAUTH Authentication required.\r\n"
+        if name == b"PING":
+            return b"+PONG\r\n"
+        if name == b"SELECT":
+            return b"+OK\r\n"
+        if name in (b"GET", b"GETDEL"):
+            value = self._get(args[0])
+
+            if name == b"GETDEL":
+                self.data.pop(args[0], None)
+
+            return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+        if name == b"SET":
+            expires_at = None
+
+            if len(args) == 4:
+                unit = 1000 if args[2].upper() == b"PX" else 1
+                expires_at = time.monotonic() + int(args[3]) / unit
+
+            self.data[args[0]] = (expires_at, args[1])
+
+            return b"+OK\r\n"
+        if name == b"DEL":
+            return b":%d\r\n" % sum(self.data.pop(key, None) is not None for key in args)
+
+        return b"-ERR unknown command '%s'\r\n" % name
+
+    async def _read_command(self, reader: asyncio.StreamReader) -> list[bytes]:
+        header = await reader.readuntil(b"\r\n")
+        command = []
+
+        for _ in range(int(header[1:-2])):
+            length = int((await reader.readuntil(b"\r\n"))[1:-2])
+            command.append((await reader.readexactly(length + 2))[:-2])
+
+        return command
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        authenticated = False
+
+        try:
+            while True:
+                command = await self._read_command(reader)
+                reply = self._execute(command, authenticated)
+                authenticated = authenticated or (command[0].upper() == b"AUTH" and reply == b"+OK\r\n")
+                writer.write(reply)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    parser.add_argument("--password")
+    args = parser.parse_args()
+
+    server = await FakeRedis(args.password).start(args.host, args.port)
+
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,233 @@
+"""Compare upstream transports: aiohttp over HTTP/1.1, httpx over HTTP/1.1 and httpx over HTTP/2.
+
+Runs a local stand-in of an upstream API in a subprocess, HTTP/1.1 (aiohttp) and HTTP/2 over
+plain TCP (h2, prior knowledge) on separate ports, both answering after a fixed latency.
+Reports throughput, latency, connections the stand-in accepted and client CPU time per request.
+
+    python benchmarks/http_transport.py --requests 5000 --concurrency 100 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from aiohttp import web
+
+import h2.config
+import h2.connection
+import h2.events
+
+from common import run_load, setup_environment
+
+BODY = json.dumps(
+    {
+        "kind": "calendar#events",
+        "items": [
+            {
+                "id": f"event{i}",
+                "status": "confirmed",
+                "summary": "Planning meeting",
+                "start": {"dateTime": "2030-01-01T10:00:00Z"},
+                "end": {"dateTime": "2030-01-01T11:00:00Z"},
+            }
+            for i in range(5)
+        ],
+    }
+).encode()
+
+
+class H2Protocol(asyncio.Protocol):
+    """Minimal HTTP/2 server answering every request with BODY after latency."""
+
+    def __init__(self, latency: float, connections: set) -> None:
+        self.latency = latency
+        self.connections = connections
+        self.conn = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False))
+        self.transport: asyncio.Transport | None = None
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        self.transport = transport
+        self.conn.initiate_connection()
+        transport.write(self.conn.data_to_send())
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        self.transport = None
+
+    def data_received(self, data: bytes) -> None:
+        for event in self.conn.receive_data(data):
+            if isinstance(event, h2.events.RequestReceived):
+                self.connections.add(self.transport.get_extra_info("peername"))
+                asyncio.ensure_future(self.respond(event.stream_id))
+            elif isinstance(event, h2.events.DataReceived):
+                self.conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+            elif isinstance(event, h2.events.ConnectionTerminated):
+                self.transport.close()
+
+        self.flush()
+
+    async def respond(self, stream_id: int) -> None:
+        await asyncio.sleep(self.latency)
+
+        if self.transport is None:
+            return
+
+        self.conn.send_headers(
+            stream_id,
+            [(":status", "200"), ("content-type", "application/json"), ("content-length", str(len(BODY)))],
+        )
+        self.conn.send_data(stream_id, BODY, end_stream=True)
+        self.flush()
+
+    def flush(self) -> None:
+        if self.transport is not None:
+            self.transport.write(self.conn.data_to_send())
+
+
+async def serve(http1_port: int, http2_port: int, latency: float) -> None:
+    connections: dict[str, set] = {"http1": set(), "http2": set()}
+
+    async def data(request: web.Request) -> web.Response:
+        connections["http1"].add(request.transport.get_extra_info("peername"))
+        await asyncio.sleep(latency)
+        return web.Response(body=BODY, content_type="application/json")
+
+    async def stats(_: web.Request) -> web.Response:
+        return web.json_response({name: len(peers) for name, peers in connections.items()})
+
+    async def reset(_: web.Request) -> web.Response:
+        for peers in connections.values():
+            peers.clear()
+        return web.json_response({})
+
+    app = web.Application()
+    app.router.add_get("/data", data)
+    app.router.add_get("/stats", stats)
+    app.router.add_post("/reset", reset)
+
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", http1_port).start()
+
+    loop = asyncio.get_running_loop()
+    await loop.create_server(lambda: H2Protocol(latency, connections["http2"]), "127.0.0.1", http2_port)
+    await asyncio.Event().wait()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_stand_in(http1_port: int, http2_port: int, latency: float) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            str(Path(__file__).resolve()),
+            "serve",
+            f"--http1-port={http1_port}",
+            f"--http2-port={http2_port}",
+            f"--latency={latency}",
+        ]
+    )
+    deadline = time.monotonic() + 10
+
+    while time.monotonic() < deadline:
+        try:
+            for port in (http1_port, http2_port):
+                socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.05)
+
+    process.kill()
+    raise RuntimeError("Stand-in server did not start")
+
+
+async def main(args: argparse.Namespace) -> None:
+    # aiohttp pool hands released connections to whoever asks first, so below the concurrency some requests
+    # starve for the whole run. By default it gets a connection per concurrent request, as HTTP/1.1 needs
+    pool_per_host = args.pool_per_host or args.concurrency
+    setup_environment(HTTP_CLIENT__POOL_LIMIT_PER_HOST=str(pool_per_host), HTTP_CLIENT__POOL_LIMIT=str(pool_per_host))
+
+    from integrations.transport import AiohttpTransport, HttpxTransport, Transport
+
+    http1_port, http2_port = free_port(), free_port()
+    control = f"http://127.0.0.1:{http1_port}"
+    stand_in = start_stand_in(http1_port, http2_port, args.latency)
+
+    variants: list[tuple[str, Transport, str]] = [
+        ("aiohttp HTTP/1.1", AiohttpTransport(), f"http://127.0.0.1:{http1_port}/data"),
+        ("httpx HTTP/1.1", HttpxTransport(http2=False), f"http://127.0.0.1:{http1_port}/data"),
+        ("httpx HTTP/2", HttpxTransport(http2=True, prior_knowledge=True), f"http://127.0.0.1:{http2_port}/data"),
+    ]
+
+    print(
+        f"{args.requests} requests, concurrency {args.concurrency}, upstream latency {args.latency * 1000:.0f} ms, "
+        f"aiohttp per-host pool {pool_per_host}\n"
+    )
+    print(f"{'transport':<20}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'conns':>8}{'cpu us/req':>12}")
+
+    try:
+        for name, transport, url in variants:
+            reset = AiohttpTransport()
+            await reset.request("POST", f"{control}/reset")
+
+            async def request() -> None:
+                response = await transport.request(
+                    "GET",
+                    url,
+                    headers={"Authorization": "Bearer benchmark-token"},
+                    params={"maxResults": 5},
+                )
+                assert response.status == 200 and response.body == BODY
+
+            cpu_started_at = time.process_time()
+            stats = await run_load(request, args.requests, args.concurrency)
+            cpu = time.process_time() - cpu_started_at
+            version = (await transport.request("GET", url)).http_version
+            await transport.close()
+
+            connections = (await reset.request("GET", f"{control}/stats")).json()
+            await reset.close()
+            accepted = connections["http2" if url.startswith(f"http://127.0.0.1:{http2_port}") else "http1"]
+
+            print(
+                f"{name:<20}{stats['rps']:>10.0f}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}"
+                f"{stats['p99_ms']:>10.2f}{accepted:>8}{cpu / stats['requests'] * 1e6:>12.0f}"
+                + ("" if version in name else f"  (negotiated {version})")
+            )
+    finally:
+        stand_in.terminate()
+        stand_in.wait()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command")
+
+    serve_parser = subparsers.add_parser("serve", help="Run the stand-in upstream server")
+    serve_parser.add_argument("--http1-port", type=int, required=True)
+    serve_parser.add_argument("--http2-port", type=int, required=True)
+    serve_parser.add_argument("--latency", type=float, default=0.02)
+
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.02, help="Stand-in response delay (in seconds)")
+    parser.add_argument("--pool-per-host", type=int, default=0, help="aiohttp connection limit, 0 - concurrency")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+
+    if arguments.command == "serve":
+        asyncio.run(serve(arguments.http1_port, arguments.http2_port, arguments.latency))
+    else:
+        asyncio.run(main(arguments))
@@ -0,0 +1,152 @@
+"""Compare CPU time per request of the dict-based and the bytes-based JSON paths.
+
+"dict" is the previous path: `json.loads` + `Schema(**data)` on the way in and
+FastAPI response_model serialization + `json.dumps` on the way out. "bytes" is
+`Schema.model_validate_json` + `SchemaResponse`. Requests are sent straight to
+the ASGI app, no network or upstream calls are involved.
+
+    python benchmarks/json_path.py --requests 5000 --events 50
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Callable
+
+from common import setup_environment
+
+setup_environment()
+
+from fastapi import FastAPI  # noqa: E402
+
+from api.responses import SchemaResponse  # noqa: E402
+from integrations.google.schemas import CalendarListResponseSchema  # noqa: E402
+from integrations.yandex.schemas import YandexUserInfoSchema  # noqa: E402
+
+
+def calendar_payload(events: int) -> bytes:
+    items = [
+        {
+            "kind": "calendar#event",
+            "id": f"event{index}",
+            "status": "confirmed",
+            "summary": f"Event {index}",
+            "description": "Benchmark event " * 8,
+            "start": {"dateTime": "2030-01-01T10:00:00+03:00", "timeZone": "Europe/Moscow"},
+            "end": {"dateTime": "2030-01-01T11:00:00+03:00", "timeZone": "Europe/Moscow"},
+            "attendees": [{"email": f"user{n}@example.com", "responseStatus": "accepted"} for n in range(3)],
+        }
+        for index in range(events)
+    ]
+
+    return json.dumps({"kind": "calendar#events", "summary": "primary", "items": items}).encode()
+
+
+YANDEX_PAYLOAD = json.dumps(
+    {
+        "id": "1000000",
+        "login": "benchmark",
+        "client_id": "benchmark-yandex-client",
+        "display_name": "Benchmark",
+        "real_name": "Benchmark User",
+        "first_name": "Benchmark",
+        "last_name": "User",
+        "sex": "male",
+        "default_email": "benchmark@yandex.ru",
+        "emails": ["benchmark@yandex.ru"],
+        "default_avatar_id": "0/0-0",
+        "is_avatar_empty": False,
+        "psuid": "1.AAAA.BBBB.CCCC",
+    }
+).encode()
+
+
+def create_app(calendar_body: bytes) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/dict/calendar")
+    async def dict_calendar() -> CalendarListResponseSchema:
+        return CalendarListResponseSchema(**json.loads(calendar_body))
+
+    @app.get("/dict/yandex")
+    async def dict_yandex() -> YandexUserInfoSchema:
+        return YandexUserInfoSchema(**json.loads(YANDEX_PAYLOAD))
+
+    @app.get("/bytes/calendar", response_model=CalendarListResponseSchema)
+    async def bytes_calendar() -> SchemaResponse:
+        return SchemaResponse(CalendarListResponseSchema.model_validate_json(calendar_body))
+
+    @app.get("/bytes/yandex", response_model=YandexUserInfoSchema)
+    async def bytes_yandex() -> SchemaResponse:
+        return SchemaResponse(YandexUserInfoSchema.model_validate_json(YANDEX_PAYLOAD))
+
+    return app
+
+
+async def call(app: FastAPI, path: str) -> bytes:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+    body = bytearray()
+
+    async def receive() -> dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, (path, message["status"])
+        elif message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+
+    await app(scope, receive, send)
+
+    return bytes(body)
+
+
+async def cpu_per_request(request: Callable[[], Any], total: int) -> float:
+    for _ in range(min(total, 200)):  # Warm up route and validator caches
+        await request()
+
+    started_at = time.process_time()
+
+    for _ in range(total):
+        await request()
+
+    return (time.process_time() - started_at) / total * 1_000_000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--events", type=int, default=50, help="Calendar items in the upstream response")
+    args = parser.parse_args()
+
+    calendar_body = calendar_payload(args.events)
+    app = create_app(calendar_body)
+
+    for name in ("calendar", "yandex"):
+        assert json.loads(await call(app, f"/dict/{name}")) == json.loads(await call(app, f"/bytes/{name}")), name
+
+    print(f"calendar payload: {len(calendar_body)} bytes, {args.events} events")
+    print(f"{'endpoint':<10} {'dict us/req':>12} {'bytes us/req':>13} {'gain':>8}")
+
+    for name in ("calendar", "yandex"):
+        before = await cpu_per_request(lambda: call(app, f"/dict/{name}"), args.requests)
+        after = await cpu_per_request(lambda: call(app, f"/bytes/{name}"), args.requests)
+        print(f"{name:<10} {before:>12.1f} {after:>13.1f} {before / after - 1:>+8.1%}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
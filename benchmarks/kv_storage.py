@@ -0,0 +1,141 @@
+"""Compare key-value storage backends: latency and cache hit rate across workers.
+
+The redis backend runs against the local stand-in from fake_redis.py, sqlite uses
+a temporary database. Hit rate is measured with several worker processes doing
+read-through lookups over the same keys, like the shared response cache does.
+
+    python benchmarks/kv_storage.py --requests 5000 --workers 4
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from common import run_load, setup_environment
+
+setup_environment()
+
+from storage.base import KeyValueBackend  # noqa: E402
+from storage.memory import MemoryBackend  # noqa: E402
+from storage.redis import RedisBackend  # noqa: E402
+from storage.sqlite import SQLiteBackend  # noqa: E402
+
+VALUE = b"x" * 1024
+
+
+def create_backend(name: str, sqlite_path: Path, redis_url: str) -> KeyValueBackend:
+    if name == "sqlite":
+        return SQLiteBackend(sqlite_path, prefix="bench:")
+    if name == "redis":
+        return RedisBackend(redis_url, prefix="bench:")
+
+    return MemoryBackend(max_size=1_000_000, prefix="bench:")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_fake_redis(port: int) -> subprocess.Popen:
+    process = subprocess.Popen([sys.executable, str(Path(__file__).parent / "fake_redis.py"), "--port", str(port)])
+    deadline = time.monotonic() + 10
+
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.05)
+
+    process.kill()
+    raise RuntimeError("Fake redis did not start")
+
+
+async def measure_latency(backend: KeyValueBackend, total: int, concurrency: int) -> dict[str, float]:
+    counter = iter(range(total * 2))
+
+    async def roundtrip() -> None:
+        key = f"key:{next(counter)}"
+        await backend.set(key, VALUE, 60)
+        assert await backend.get(key) == VALUE
+        assert await backend.pop(key) == VALUE
+
+    return await run_load(roundtrip, total, concurrency)
+
+
+async def read_through(name: str, sqlite_path: Path, redis_url: str, keys: int, lookups: int, seed: int) -> int:
+    backend = create_backend(name, sqlite_path, redis_url)
+    rng = random.Random(seed)
+    hits = 0
+
+    for _ in range(lookups):
+        key = f"shared:{rng.randrange(keys)}"
+
+        if await backend.get(key) is not None:
+            hits += 1
+        else:
+            await backend.set(key, VALUE, 60)
+
+    await backend.close()
+
+    return hits
+
+
+def worker(args: tuple[str, Path, str, int, int, int]) -> int:
+    setup_environment()
+
+    return asyncio.run(read_through(*args))
+
+
+def measure_hit_rate(name: str, sqlite_path: Path, redis_url: str, workers: int, keys: int, lookups: int) -> float:
+    with multiprocessing.get_context("spawn").Pool(workers) as pool:
+        hits = pool.map(worker, [(name, sqlite_path, redis_url, keys, lookups, seed) for seed in range(workers)])
+
+    return sum(hits) / (workers * lookups)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=3000, help="set/get/pop roundtrips per backend")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--keys", type=int, default=500, help="Distinct keys in the hit rate test")
+    parser.add_argument("--lookups", type=int, default=1000, help="Lookups per worker in the hit rate test")
+    args = parser.parse_args()
+
+    redis_port = free_port()
+    redis_url = f"redis://127.0.0.1:{redis_port}/0"
+    fake_redis = start_fake_redis(redis_port)
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            print(f"{'backend':<8} {'rps':>9} {'p50 ms':>8} {'p99 ms':>8} {'hit rate':>9}")
+
+            for name in ("memory", "sqlite", "redis"):
+                sqlite_path = Path(directory) / f"{name}.sqlite3"
+                backend = create_backend(name, sqlite_path, redis_url)
+                stats = await measure_latency(backend, args.requests, args.concurrency)
+                await backend.close()
+
+                hit_rate = measure_hit_rate(
+                    name, Path(directory) / "shared.sqlite3", redis_url, args.workers, args.keys, args.lookups
+                )
+                print(
+                    f"{name:<8} {stats['rps']:>9.0f} {stats['p50_ms']:>8.2f} {stats['p99_ms']:>8.2f} {hit_rate:>9.1%}"
+                )
+    finally:
+        fake_redis.terminate()
+        fake_redis.wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
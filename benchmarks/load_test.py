@@ -0,0 +1,241 @@
+"""End-to-end load test of the service against local fake providers.
+
+Starts fake Google/Yandex servers and the service in subprocesses, points
+provider URLs at the fakes, then drives concurrent login -> callback -> data
+flows and reports RPS, latency percentiles and service event loop lag.
+
+    python benchmarks/load_test.py --users 50 --iterations 10 --latency 0.05 --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import aiohttp
+
+from common import DEFAULT_ENV, SRC_DIR, percentile
+from fake_providers import provider_urls
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+LAG_REPORT_PREFIX = "EVENT_LOOP_LAG "
+
+DATA_PATHS = {
+    "google": ("/api/google/calendar/next-event", "/api/google/user/info", "/api/dashboard"),
+    "yandex": ("/api/yandex/user/info", "/api/dashboard"),
+}
+
+
+async def monitor_loop_lag(samples: list[float], interval: float = 0.01) -> None:
+    loop = asyncio.get_running_loop()
+
+    while True:
+        started_at = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(loop.time() - started_at - interval)
+
+
+async def serve(port: int) -> None:
+    """Run the service with event loop lag monitor, report lag on shutdown."""
+
+    import uvicorn
+
+    samples: list[float] = []
+    monitor = asyncio.create_task(monitor_loop_lag(samples))
+
+    server = uvicorn.Server(uvicorn.Config("main:app", host="127.0.0.1", port=port, log_level="warning"))
+    await server.serve()
+
+    monitor.cancel()
+    report = {
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "max_ms": max(samples, default=0.0) * 1000,
+    }
+    print(LAG_REPORT_PREFIX + json.dumps(report), flush=True)
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    async def request(self, session: aiohttp.ClientSession, step: str, url: str, **kwargs) -> aiohttp.ClientResponse:
+        started_at = time.perf_counter()
+
+        try:
+            async with session.get(url, allow_redirects=False, **kwargs) as response:
+                await response.read()
+        except aiohttp.ClientError:
+            self.errors[step] += 1
+            raise
+
+        self.latencies[step].append(time.perf_counter() - started_at)
+
+        if response.status >= 400:
+            self.errors[step] += 1
+
+        return response
+
+
+async def user_flow(base_url: str, provider: str, data_requests: int, recorder: Recorder) -> None:
+    async with aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True)) as session:
+        response = await recorder.request(session, "login", f"{base_url}/api/{provider}/auth/login")
+        state = parse_qs(urlsplit(response.headers["Location"]).query)["state"][0]
+
+        response = await recorder.request(
+            session,
+            "callback",
+            f"{base_url}/api/{provider}/auth/callback",
+            params={"code": "load-test-code", "state": state},
+        )
+
+        if response.status >= 400:
+            return
+
+        for i in range(data_requests):
+            path = DATA_PATHS[provider][i % len(DATA_PATHS[provider])]
+            await recorder.request(session, path, f"{base_url}{path}")
+
+
+async def drive(args: argparse.Namespace, base_url: str) -> tuple[Recorder, float]:
+    recorder = Recorder()
+    providers = args.providers.split(",")
+
+    async def virtual_user(n: int) -> None:
+        for i in range(args.iterations):
+            try:
+                await user_flow(base_url, providers[(n + i) % len(providers)], args.data_requests, recorder)
+            except aiohttp.ClientError:
+                pass
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(virtual_user(n) for n in range(args.users)))
+
+    return recorder, time.perf_counter() - started_at
+
+
+async def wait_until_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+
+    async with aiohttp.ClientSession() as session:
+        while True:
+            try:
+                async with session.get(url) as response:
+                    if response.status < 500:
+                        return
+            except aiohttp.ClientError:
+                if time.monotonic() > deadline:
+                    raise
+
+            await asyncio.sleep(0.1)
+
+
+def print_report(recorder: Recorder, elapsed: float, lag: dict | None) -> None:
+    total = sum(len(latencies) for latencies in recorder.latencies.values())
+
+    print(f"\n{'step':<36} {'requests':>9} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+
+    for step, latencies in recorder.latencies.items():
+        print(
+            f"{step:<36} {len(latencies):>9} {recorder.errors[step]:>7}"
+            f" {percentile(latencies, 50) * 1000:>8.2f}"
+            f" {percentile(latencies, 95) * 1000:>8.2f}"
+            f" {percentile(latencies, 99) * 1000:>8.2f}"
+        )
+
+    all_latencies = [latency for latencies in recorder.latencies.values() for latency in latencies]
+    print(
+        f"\ntotal: {total} requests in {elapsed:.2f}s, {total / elapsed:.0f} rps,"
+        f" p50 {percentile(all_latencies, 50) * 1000:.2f} ms,"
+        f" p95 {percentile(all_latencies, 95) * 1000:.2f} ms,"
+        f" p99 {percentile(all_latencies, 99) * 1000:.2f} ms"
+    )
+
+    if lag is not None:
+        print(f"event loop lag: p50 {lag['p50_ms']:.2f} ms, p99 {lag['p99_ms']:.2f} ms, max {lag['max_ms']:.2f} ms")
+
+
+async def main(args: argparse.Namespace) -> None:
+    providers_url = f"http://127.0.0.1:{args.fake_port}"
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    env = {**os.environ, **DEFAULT_ENV, **provider_urls(providers_url), "PYTHONPATH": str(SRC_DIR)}
+
+    fake_providers = subprocess.Popen(
+        [
+            sys.executable,
+            str(BENCHMARKS_DIR / "fake_providers.py"),
+            f"--port={args.fake_port}",
+            f"--latency={args.latency}",
+            f"--error-rate={args.error_rate}",
+            f"--audience={env['GOOGLE__OAUTH__CLIENT_ID']}",
+        ],
+    )
+    service = subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), "serve", f"--port={args.port}"],
+        env=env,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+
+    try:
+        await wait_until_ready(f"{providers_url}/google/certs")
+        await wait_until_ready(f"{base_url}/")
+
+        recorder, elapsed = await drive(args, base_url)
+    finally:
+        service.send_signal(signal.SIGINT)
+        output, _ = service.communicate(timeout=30)
+        fake_providers.terminate()
+        fake_providers.wait()
+
+    lag = next(
+        (
+            json.loads(line.removeprefix(LAG_REPORT_PREFIX))
+            for line in output.splitlines()
+            if line.startswith(LAG_REPORT_PREFIX)
+        ),
+        None,
+    )
+    print_report(recorder, elapsed, lag)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command")
+
+    serve_parser = subparsers.add_parser("serve", help="Run the service with event loop lag monitor")
+    serve_parser.add_argument("--port", type=int, default=8100)
+
+    parser.add_argument("--port", type=int, default=8100, help="Service port")
+    parser.add_argument("--fake-port", type=int, default=9100, help="Fake providers port")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--iterations", type=int, default=5, help="Login flows per virtual user")
+    parser.add_argument("--data-requests", type=int, default=10, help="Data requests per login flow")
+    parser.add_argument("--providers", default="google,yandex")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake provider latency (in seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fake provider error probability")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+
+    if arguments.command == "serve":
+        sys.path.insert(0, str(SRC_DIR))
+
+        # Uvicorn re-raises the shutdown signal once the server has stopped
+        with contextlib.suppress(KeyboardInterrupt):
+            asyncio.run(serve(arguments.port))
+    else:
+        asyncio.run(main(arguments))
@@ -0,0 +1,195 @@
+"""Check Google `fields` masks against the schemas and measure what partial responses save.
+
+For every Google client method the mask derived from its schema is applied to a full resource,
+as Google would do, and the projected response must parse into the same model as the full one.
+A mask missing a field the schema reads fails the check (exit status 1). Then reports response
+size, plain and gzipped, and parse time of full and projected responses.
+
+    python benchmarks/partial_response.py --events 50 --repeat 2000
+    python benchmarks/partial_response.py --check-only
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import time
+
+from common import setup_environment
+from fake_providers import select_fields
+
+setup_environment()
+
+from pydantic import BaseModel, ValidationError  # noqa: E402
+
+from integrations.google.fields import fields_mask  # noqa: E402
+from integrations.google.schemas import (  # noqa: E402
+    CalendarEventsPageSchema,
+    CalendarListEntriesSchema,
+    CalendarListResponseSchema,
+    CalendarSyncPageSchema,
+    UserInfoResponseSchema,
+)
+
+
+def event(index: int) -> dict:
+    """Event resource with the fields Google returns for a typical meeting."""
+
+    return {
+        "kind": "calendar#event",
+        "etag": f'"3{index:015d}"',
+        "id": f"event{index}",
+        "status": "confirmed",
+        "htmlLink": f"https://www.google.com/calendar/event?eid=ZXZlbnR7aW5kZXh9{index}",
+        "created": "2029-12-01T09:00:00.000Z",
+        "updated": "2029-12-02T09:00:00.000Z",
+        "summary": f"Planning meeting {index}",
+        "description": "Agenda: status updates, risks, next steps. " * 4,
+        "location": "Meeting room 4",
+        "creator": {"email": "owner@example.com", "self": True},
+        "organizer": {"email": "owner@example.com", "self": True},
+        "start": {"dateTime": "2030-01-01T10:00:00+03:00", "timeZone": "Europe/Moscow"},
+        "end": {"dateTime": "2030-01-01T11:00:00+03:00", "timeZone": "Europe/Moscow"},
+        "iCalUID": f"event{index}@google.com",
+        "sequence": 0,
+        "attendees": [
+            {"email": f"user{n}@example.com", "responseStatus": "accepted", "displayName": f"User {n}"}
+            for n in range(4)
+        ],
+        "hangoutLink": "https://meet.google.com/abc-defg-hij",
+        "conferenceData": {
+            "entryPoints": [{"entryPointType": "video", "uri": "https://meet.google.com/abc-defg-hij"}],
+            "conferenceSolution": {"key": {"type": "hangoutsMeet"}, "name": "Google Meet"},
+            "conferenceId": "abc-defg-hij",
+        },
+        "reminders": {"useDefault": True},
+        "eventType": "default",
+    }
+
+
+def events_page(events: int) -> dict:
+    return {
+        "kind": "calendar#events",
+        "etag": '"p33c9g7mdd0b8o0g"',
+        "summary": "owner@example.com",
+        "updated": "2029-12-02T09:00:00.000Z",
+        "timeZone": "Europe/Moscow",
+        "accessRole": "owner",
+        "defaultReminders": [{"method": "popup", "minutes": 10}],
+        "nextSyncToken": "CPDAlvWDx70CEPDAlvWDx70CGAU=",
+        "items": [event(index) for index in range(events)],
+    }
+
+
+def calendar_list(calendars: int) -> dict:
+    return {
+        "kind": "calendar#calendarList",
+        "etag": '"p33c9g7mdd0b8o0g"',
+        "items": [
+            {
+                "kind": "calendar#calendarListEntry",
+                "etag": f'"16{index:014d}"',
+                "id": f"calendar{index}@group.calendar.google.com",
+                "summary": f"Calendar {index}",
+                "timeZone": "Europe/Moscow",
+                "colorId": "14",
+                "backgroundColor": "#9fe1e7",
+                "foregroundColor": "#000000",
+                "selected": True,
+                "primary": index == 0,
+                "accessRole": "owner",
+                "defaultReminders": [{"method": "popup", "minutes": 10}],
+                "conferenceProperties": {"allowedConferenceSolutionTypes": ["hangoutsMeet"]},
+            }
+            for index in range(calendars)
+        ],
+    }
+
+
+USER_INFO = {
+    "id": "104719834710234710234",
+    "email": "owner@example.com",
+    "verified_email": True,
+    "name": "Calendar Owner",
+    "given_name": "Calendar",
+    "family_name": "Owner",
+    "picture": "https://lh3.googleusercontent.com/a/ACg8ocJ1234567890abcdefghijklmnopqrstuvwxyz=s96-c",
+    "locale": "ru",
+    "hd": "example.com",
+}
+
+
+def cases(events: int) -> list[tuple[str, type[BaseModel], dict]]:
+    """Client methods with the schema they parse and a full response of Google."""
+
+    return [
+        ("get_user_info", UserInfoResponseSchema, USER_INFO),
+        ("get_next_calendar_event", CalendarListResponseSchema, events_page(1)),
+        ("get_calendar_events", CalendarListResponseSchema, events_page(events)),
+        ("get_calendar_list", CalendarListEntriesSchema, calendar_list(10)),
+        ("get_upcoming_events", CalendarEventsPageSchema, events_page(events)),
+        ("iter_events_pages", CalendarSyncPageSchema, events_page(events)),
+    ]
+
+
+def parse_time(schema: type[BaseModel], body: bytes, repeat: int) -> float:
+    started_at = time.perf_counter()
+
+    for _ in range(repeat):
+        schema.model_validate_json(body)
+
+    return (time.perf_counter() - started_at) / repeat
+
+
+def mask_in_sync(schema: type[BaseModel], payload: dict, mask: str) -> bool:
+    try:
+        return schema.model_validate(select_fields(payload, mask)) == schema.model_validate(payload)
+    except ValidationError:  # Required field dropped
+        return False
+
+
+def main(args: argparse.Namespace) -> int:
+    failures = 0
+
+    for method, schema, payload in cases(args.events):
+        mask = fields_mask(schema)
+
+        if not mask_in_sync(schema, payload, mask):
+            failures += 1
+            print(f"{method}: fields={mask} drops data {schema.__name__} reads", file=sys.stderr)
+
+    if failures or args.check_only:
+        print(f"{failures} mask(s) out of sync" if failures else "All masks match their schemas")
+        return 1 if failures else 0
+
+    print(f"{args.events} events per page, parse time over {args.repeat} runs\n")
+    print(
+        f"{'method':<26}{'bytes':>9}{'projected':>11}{'gzip':>8}{'projected':>11}"
+        f"{'parse us':>10}{'projected':>11}"
+    )
+
+    for method, schema, payload in cases(args.events):
+        full = json.dumps(payload).encode()
+        projected = json.dumps(select_fields(payload, fields_mask(schema))).encode()
+
+        print(
+            f"{method:<26}{len(full):>9}{len(projected):>11}"
+            f"{len(gzip.compress(full)):>8}{len(gzip.compress(projected)):>11}"
+            f"{parse_time(schema, full, args.repeat) * 1e6:>10.1f}"
+            f"{parse_time(schema, projected, args.repeat) * 1e6:>11.1f}"
+        )
+
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=50, help="Events per page of multi-event responses")
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--check-only", action="store_true", help="Only check masks against schemas")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
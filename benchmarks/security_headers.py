@@ -0,0 +1,116 @@
+"""Compare BaseHTTPMiddleware and pure ASGI security headers middleware.
+
+Requests are served in-process through httpx ASGITransport, upstream clients
+are replaced with stubs, so the numbers reflect application overhead only.
+
+    python benchmarks/security_headers.py --requests 5000 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import math
+
+from common import run_load, setup_environment
+
+setup_environment(GOOGLE__CALENDAR__SYNC_ENABLED="False")  # next-event straight from the stub client
+
+import httpx  # noqa: E402
+from fastapi import FastAPI, Request, Response  # noqa: E402
+from starlette.responses import HTMLResponse  # noqa: E402
+
+from api.deps.auth import get_google_access_token, get_google_session, get_yandex_access_token  # noqa: E402
+from api.deps.getters import get_calendar_sync, get_google_client, get_yandex_client  # noqa: E402
+from api.router import router as api_router  # noqa: E402
+from core.assets import StaticAssets  # noqa: E402
+from core.constants import CACHE_CONTROL_REVALIDATE  # noqa: E402
+from core.settings import ROOT_DIR  # noqa: E402
+from core.templates import render_page  # noqa: E402
+from integrations.google.schemas import CalendarListResponseSchema  # noqa: E402
+from integrations.yandex.schemas import YandexUserInfoSchema  # noqa: E402
+from middlewares.security_headers import SECURITY_HEADERS, SecurityHeadersMiddleware  # noqa: E402
+from sessions.schemas import OAuthProvider, SessionData  # noqa: E402
+
+PATHS = ("/", "/static/js/app.js", "/api/google/calendar/next-event", "/api/yandex/user/info")
+
+
+class StubGoogleClient:
+    async def get_next_calendar_event(self, access_token: str) -> CalendarListResponseSchema:
+        return CalendarListResponseSchema(
+            items=[{"summary": "Benchmark", "start": {"dateTime": "2030-01-01T10:00:00Z"}, "end": {}}]
+        )
+
+
+class StubYandexClient:
+    async def get_user_info(self, access_token: str) -> YandexUserInfoSchema:
+        return YandexUserInfoSchema(id="1", login="benchmark")
+
+
+def create_app(pure_asgi: bool) -> FastAPI:
+    app = FastAPI()
+    static_assets = StaticAssets(ROOT_DIR / "src/static", exclude=("html",))
+    static_assets.load()
+    index_page = render_page("index.html", asset_url=static_assets.url)
+    app.mount(static_assets.url_prefix, static_assets, name="static")
+    app.include_router(api_router)
+
+    @app.get("/", response_class=HTMLResponse)
+    def get_index(request: Request) -> Response:
+        return index_page.response(request.headers, CACHE_CONTROL_REVALIDATE)
+
+    app.dependency_overrides.update(
+        {
+            get_google_access_token: lambda: "token",
+            get_google_session: lambda: SessionData(
+                id="benchmark", provider=OAuthProvider.GOOGLE, access_token="token", expires_at=math.inf
+            ),
+            get_calendar_sync: lambda: None,
+            get_yandex_access_token: lambda: "token",
+            get_google_client: StubGoogleClient,
+            get_yandex_client: StubYandexClient,
+        }
+    )
+
+    if pure_asgi:
+        app.add_middleware(SecurityHeadersMiddleware)
+    else:
+
+        @app.middleware("http")
+        async def add_security_headers(request: Request, call_next) -> Response:
+            response = await call_next(request)
+            response.headers.update(SECURITY_HEADERS)
+            return response
+
+    return app
+
+
+async def benchmark(app: FastAPI, path: str, total: int, concurrency: int) -> dict[str, float]:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        response = await client.get(path)
+        assert response.status_code == 200 and "x-frame-options" in response.headers, (path, response.status_code)
+
+        return await run_load(lambda: client.get(path), total, concurrency)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    variants = {"BaseHTTPMiddleware": create_app(pure_asgi=False), "pure ASGI": create_app(pure_asgi=True)}
+
+    print(f"{'path':<36} {'variant':<20} {'rps':>9} {'p50 ms':>8} {'p99 ms':>8}")
+
+    for path in PATHS:
+        results = {}
+
+        for name, app in variants.items():
+            results[name] = stats = await benchmark(app, path, args.requests, args.concurrency)
+            print(f"{path:<36} {name:<20} {stats['rps']:>9.0f} {stats['p50_ms']:>8.2f} {stats['p99_ms']:>8.2f}")
+
+        gain = results["pure ASGI"]["rps"] / results["BaseHTTPMiddleware"]["rps"] - 1
+        print(f"{'':<36} {'gain':<20} {gain:>+9.1%}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
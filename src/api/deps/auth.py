@@ -1,20 +1,34 @@
 import dataclasses
 import secrets
-from typing import TypeAlias
+from typing import Annotated, Callable, TypeAlias
 
-from fastapi.security import APIKeyCookie
+from fastapi import Depends
+from fastapi.security import APIKeyCookie, APIKeyHeader
 
+from api.deps.getters import get_session_manager, get_storage
 from core.constants import (
+    ADMIN_TOKEN_HEADER_NAME,
+    OAUTH_STATE_KEY_PREFIX,
+    STATE_COOKIE_MAX_AGE,
     STATE_COOKIE_NAME,
-    GOOGLE_ACCESS_TOKEN_COOKIE_NAME,
-    YANDEX_ACCESS_TOKEN_COOKIE_NAME,
+    GOOGLE_SESSION_COOKIE_NAME,
+    YANDEX_SESSION_COOKIE_NAME,
 )
 from core.settings import settings
+from sessions.manager import SessionManager
+from sessions.schemas import OAuthProvider, SessionData
+from storage.base import KeyValueBackend
 
-google_access_token_cookie_scheme = APIKeyCookie(name=GOOGLE_ACCESS_TOKEN_COOKIE_NAME)
-yandex_access_token_cookie_scheme = APIKeyCookie(name=YANDEX_ACCESS_TOKEN_COOKIE_NAME)
+google_session_cookie_scheme = APIKeyCookie(name=GOOGLE_SESSION_COOKIE_NAME)
+yandex_session_cookie_scheme = APIKeyCookie(name=YANDEX_SESSION_COOKIE_NAME)
 state_cookie_scheme = APIKeyCookie(name=STATE_COOKIE_NAME)
 
+admin_token_scheme = APIKeyHeader(name=ADMIN_TOKEN_HEADER_NAME, auto_error=False)
+
+# For endpoints that work with any subset of providers logged in
+optional_google_session_cookie_scheme = APIKeyCookie(name=GOOGLE_SESSION_COOKIE_NAME, auto_error=False)
+optional_yandex_session_cookie_scheme = APIKeyCookie(name=YANDEX_SESSION_COOKIE_NAME, auto_error=False)
+
 
 @dataclasses.dataclass
 class OAuthInitData:
@@ -28,23 +42,57 @@ GoogleOAuthInitData: TypeAlias = OAuthInitData
 YandexOAuthInitData: TypeAlias = OAuthInitData
 
 
-def get_google_oauth_init_data() -> GoogleOAuthInitData:
-    """Generate Google OAuth initialization data with CSRF protection."""
+async def create_oauth_init_data(
+    provider: OAuthProvider,
+    get_auth_url: Callable[[str], str],
+    storage: KeyValueBackend,
+) -> OAuthInitData:
+    """Generate state and remember it server-side, so the callback can consume it only once."""
 
     state = secrets.token_urlsafe(32)
+    await storage.set(OAUTH_STATE_KEY_PREFIX + state, provider.encode(), STATE_COOKIE_MAX_AGE)
+
+    return OAuthInitData(url=get_auth_url(state), state=state)
 
-    return OAuthInitData(
-        url=settings.google.oauth.get_auth_url(state),
-        state=state,
-    )
 
+async def get_google_oauth_init_data(
+    storage: Annotated[KeyValueBackend, Depends(get_storage)],
+) -> GoogleOAuthInitData:
+    """Generate Google OAuth initialization data with CSRF protection."""
+
+    return await create_oauth_init_data(OAuthProvider.GOOGLE, settings.google.oauth.get_auth_url, storage)
 
-def get_yandex_oauth_init_data() -> YandexOAuthInitData:
+
+async def get_yandex_oauth_init_data(
+    storage: Annotated[KeyValueBackend, Depends(get_storage)],
+) -> YandexOAuthInitData:
     """Generate Yandex OAuth initialization data with CSRF protection."""
 
-    state = secrets.token_urlsafe(32)
+    return await create_oauth_init_data(OAuthProvider.YANDEX, settings.yandex.oauth.get_auth_url, storage)
+
+
+async def get_google_session(
+    session_id: Annotated[str, Depends(google_session_cookie_scheme)],
+    session_manager: Annotated[SessionManager, Depends(get_session_manager)],
+) -> SessionData:
+    """Resolve Google session, refreshing its access token if expired."""
+
+    return await session_manager.get(session_id, OAuthProvider.GOOGLE)
+
+
+async def get_google_access_token(
+    session_id: Annotated[str, Depends(google_session_cookie_scheme)],
+    session_manager: Annotated[SessionManager, Depends(get_session_manager)],
+) -> str:
+    """Resolve Google access token from session, refreshing it if expired."""
+
+    return await session_manager.get_access_token(session_id, OAuthProvider.GOOGLE)
+
+
+async def get_yandex_access_token(
+    session_id: Annotated[str, Depends(yandex_session_cookie_scheme)],
+    session_manager: Annotated[SessionManager, Depends(get_session_manager)],
+) -> str:
+    """Resolve Yandex access token from session, refreshing it if expired."""
 
-    return OAuthInitData(
-        url=settings.yandex.oauth.get_auth_url(state),
-        state=state,
-    )
+    return await session_manager.get_access_token(session_id, OAuthProvider.YANDEX)
@@ -1,14 +1,15 @@
 from fastapi import Response
 
 from core.constants import (
+    CODE_EXCHANGE_TTL,
     STATE_COOKIE_NAME,
     STATE_COOKIE_MAX_AGE,
-    ACCESS_TOKEN_COOKIE_MAX_AGE,
+    SESSION_COOKIE_MAX_AGE,
 )
 from core.settings import settings
 
 
-def set_state_cookie(response: Response, state: str) -> None:
+def set_state_cookie(response: Response, state: str, max_age: int = STATE_COOKIE_MAX_AGE) -> None:
     """Set OAuth state cookie for CSRF protection."""
 
     response.set_cookie(
@@ -17,27 +18,31 @@ def set_state_cookie(response: Response, state: str) -> None:
         httponly=True,
         secure=settings.security.cookie_secure,
         samesite="lax",  # lax needed for OAuth redirect
-        max_age=STATE_COOKIE_MAX_AGE,
+        max_age=max_age,
     )
 
 
-def set_access_token_cookie(
-    response: Response, token: str, cookie_name: str, path: str = "/"
+def set_session_cookie(
+    response: Response, session_id: str, cookie_name: str, path: str = "/"
 ) -> None:
-    """Set access token cookie for authenticated requests."""
+    """Set session id cookie for authenticated requests."""
 
     response.set_cookie(
         key=cookie_name,
-        value=token,
+        value=session_id,
         httponly=True,
         path=path,
         secure=settings.security.cookie_secure,
         samesite=settings.security.cookie_samesite,
-        max_age=ACCESS_TOKEN_COOKIE_MAX_AGE,
+        max_age=SESSION_COOKIE_MAX_AGE,
     )
 
 
-def delete_state_cookie(response: Response) -> None:
-    """Delete OAuth state cookie after successful authentication."""
+def expire_state_cookie(response: Response, state: str) -> None:
+    """Shorten OAuth state cookie after successful authentication.
 
-    response.delete_cookie(STATE_COOKIE_NAME)
+    It outlives the callback as long as its code exchange is kept, so a repeated callback (reload,
+    prefetch followed by navigation) still passes the CSRF check and gets the same session.
+    """
+
+    set_state_cookie(response, state, max_age=CODE_EXCHANGE_TTL)
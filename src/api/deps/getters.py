@@ -1,7 +1,12 @@
 from fastapi import Request
 
 from integrations.google.client import GoogleClient
+from integrations.google.sync import CalendarSync
 from integrations.yandex.client import YandexClient
+from sessions.exchanges import CodeExchanges
+from sessions.manager import SessionManager
+from storage.base import KeyValueBackend
+from storage.files import FileCache
 
 
 def get_google_client(request: Request) -> GoogleClient:
@@ -10,3 +15,23 @@ def get_google_client(request: Request) -> GoogleClient:
 
 def get_yandex_client(request: Request) -> YandexClient:
     return request.app.state.yandex_client
+
+
+def get_session_manager(request: Request) -> SessionManager:
+    return request.app.state.session_manager
+
+
+def get_code_exchanges(request: Request) -> CodeExchanges:
+    return request.app.state.code_exchanges
+
+
+def get_storage(request: Request) -> KeyValueBackend:
+    return request.app.state.storage
+
+
+def get_calendar_sync(request: Request) -> CalendarSync:
+    return request.app.state.calendar_sync
+
+
+def get_avatar_cache(request: Request) -> FileCache:
+    return request.app.state.avatar_cache
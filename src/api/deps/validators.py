@@ -1,20 +1,57 @@
 import secrets
-from typing import Annotated
+from typing import Annotated, Awaitable, Callable
 
 from fastapi import Query, Depends, HTTPException
 
-from api.deps.auth import state_cookie_scheme
+from api.deps.auth import admin_token_scheme, state_cookie_scheme
+from api.deps.getters import get_code_exchanges, get_storage
+from core.constants import OAUTH_STATE_KEY_PREFIX
+from core.settings import settings
+from core.timing import span
+from sessions.exchanges import CodeExchange, CodeExchanges
+from sessions.schemas import OAuthProvider
+from storage.base import KeyValueBackend
 
 
-def validate_oauth_state(
-    query_state: Annotated[str, Query(alias="state")],
-    cookie_state: Annotated[str, Depends(state_cookie_scheme)],
-) -> None:
-    """Validate OAuth state parameter against cookie to prevent CSRF attacks."""
+def oauth_state_validator(provider: OAuthProvider) -> Callable[..., Awaitable[CodeExchange]]:
+    async def validate_oauth_state(
+        query_state: Annotated[str, Query(alias="state")],
+        code: Annotated[str, Query(min_length=1, max_length=512)],
+        cookie_state: Annotated[str, Depends(state_cookie_scheme)],
+        storage: Annotated[KeyValueBackend, Depends(get_storage)],
+        exchanges: Annotated[CodeExchanges, Depends(get_code_exchanges)],
+    ) -> CodeExchange:
+        """Validate OAuth state parameter against cookie and consume its server-side record.
 
-    if not secrets.compare_digest(query_state, cookie_state):
-        raise HTTPException(status_code=400, detail="Invalid state")
+        The cookie prevents CSRF, the one-time record prevents replays and states issued for another provider.
+        A repeated callback finds the state consumed and may only reuse the exchange of the same code.
+        """
 
+        with span("oauth_state"):
+            if not secrets.compare_digest(query_state, cookie_state):
+                raise HTTPException(status_code=400, detail="Invalid state")
 
-validate_google_oauth_state = validate_oauth_state
-validate_yandex_oauth_state = validate_oauth_state
+            key = exchanges.key(provider, query_state, code)
+
+            if await storage.pop(OAUTH_STATE_KEY_PREFIX + query_state) != provider.encode():
+                return CodeExchange(key=key, fresh=False)
+
+            await exchanges.begin(key)
+
+        return CodeExchange(key=key, fresh=True)
+
+    return validate_oauth_state
+
+
+validate_google_oauth_state = oauth_state_validator(OAuthProvider.GOOGLE)
+validate_yandex_oauth_state = oauth_state_validator(OAuthProvider.YANDEX)
+
+
+def validate_admin_token(token: Annotated[str | None, Depends(admin_token_scheme)]) -> None:
+    """Admin endpoints don't exist unless admin token is configured, and require it in the header."""
+
+    if settings.admin.token is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    if token is None or not secrets.compare_digest(token, settings.admin.token.get_secret_value()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
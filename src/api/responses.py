@@ -0,0 +1,93 @@
+import contextlib
+from enum import StrEnum
+from typing import Any, AsyncIterator, Sequence, TypeVar
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from core.assets import content_etag
+from core.constants import CACHE_CONTROL_PRIVATE_REVALIDATE
+from core.timing import span
+
+T = TypeVar("T")
+
+
+class SchemaResponse(Response):
+    """JSON response serialized straight to bytes by pydantic-core, skipping `jsonable_encoder` and `json.dumps`.
+
+    Carries ETag of the body, so a browser polling unchanged data revalidates it and gets 304 Not Modified.
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, content: Any, *args: Any, **kwargs: Any) -> None:
+        super().__init__(content, *args, **kwargs)
+
+        if isinstance(content, BaseModel):
+            self.headers.setdefault("ETag", content_etag(self.body))
+            self.headers.setdefault("Cache-Control", CACHE_CONTROL_PRIVATE_REVALIDATE)
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            with span("serialize"):
+                return content.__pydantic_serializer__.to_json(content)
+
+        return super().render(content)
+
+
+class StreamFormat(StrEnum):
+    NDJSON = "ndjson"
+    JSON = "json"
+
+    @property
+    def media_type(self) -> str:
+        return "application/x-ndjson" if self is StreamFormat.NDJSON else "application/json"
+
+
+async def prefetch(iterator: AsyncIterator[T]) -> AsyncIterator[T]:
+    """Pull the first item right away and return iterator over all items.
+
+    Errors of the first item still become a regular error response, once streaming starts the status is sent.
+    """
+
+    first = await anext(iterator)
+
+    async def resumed() -> AsyncIterator[T]:
+        async with contextlib.aclosing(iterator):
+            yield first
+
+            async for item in iterator:
+                yield item
+
+    return resumed()
+
+
+async def encode_stream(
+    batches: AsyncIterator[Sequence[BaseModel]],
+    stream_format: StreamFormat,
+) -> AsyncIterator[bytes]:
+    """Serialize batches of models as NDJSON lines or one JSON array, a chunk per batch."""
+
+    array = stream_format is StreamFormat.JSON
+    separator = b"," if array else b"\n"
+    started = False
+
+    if array:
+        yield b"["
+
+    async with contextlib.aclosing(batches):
+        async for batch in batches:
+            if not batch:
+                continue
+
+            chunk = separator.join(item.__pydantic_serializer__.to_json(item) for item in batch)
+
+            if array:
+                yield b"," + chunk if started else chunk
+            else:
+                yield chunk + b"\n"
+
+            started = True
+
+    if array:
+        yield b"]"
@@ -1,8 +1,14 @@
 from fastapi import APIRouter
 
+from api.routes.admin import router as admin_router
+from api.routes.dashboard import router as dashboard_router
 from api.routes.google import router as google_router
+from api.routes.monitoring import router as monitoring_router
 from api.routes.yandex import router as yandex_router
 
 router = APIRouter(prefix="/api")
 router.include_router(google_router, prefix="/google", tags=["Google"])
 router.include_router(yandex_router, prefix="/yandex", tags=["Yandex"])
+router.include_router(dashboard_router, prefix="/dashboard", tags=["Dashboard"])
+router.include_router(monitoring_router, prefix="/monitoring", tags=["Monitoring"])
+router.include_router(admin_router, prefix="/admin", tags=["Admin"], include_in_schema=False)
@@ -0,0 +1,34 @@
+import asyncio
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from api.deps.validators import validate_admin_token
+from core.profiler import render_collapsed, sample_stacks
+from core.settings import settings
+
+router = APIRouter(dependencies=[Depends(validate_admin_token)])
+
+_profiling = asyncio.Lock()
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: Annotated[float, Query(gt=0, le=settings.admin.profile_max_seconds)] = 10.0,
+    interval: Annotated[float, Query(ge=0.001, le=1.0)] = 0.005,
+) -> PlainTextResponse:
+    """Sample stacks of this worker process while it keeps serving requests, returns collapsed stacks.
+
+    Output feeds flamegraph tools directly, e.g. `flamegraph.pl profile.txt > profile.svg` or speedscope.
+    Only the worker that received the request is profiled.
+    """
+
+    if _profiling.locked():
+        raise HTTPException(status_code=409, detail="Profiling is already running")
+
+    async with _profiling:
+        # Sampler runs in a thread, the event loop goes on serving requests and shows up in the samples
+        stacks = await asyncio.to_thread(sample_stacks, seconds, interval)
+
+    return PlainTextResponse(render_collapsed(stacks))
@@ -0,0 +1,81 @@
+import asyncio
+from typing import Annotated, Awaitable, Callable, TypeVar
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from api.deps.auth import optional_google_session_cookie_scheme, optional_yandex_session_cookie_scheme
+from api.deps.getters import get_calendar_sync, get_google_client, get_session_manager, get_yandex_client
+from api.responses import SchemaResponse
+from api.routes.google import load_next_event
+from api.schemas import DashboardResponseSchema, ProviderErrorSchema
+from core.log import log_event
+from core.settings import settings
+from integrations.google.client import GoogleClient
+from integrations.google.schemas import CalendarListResponseSchema
+from integrations.google.sync import CalendarSync
+from integrations.resilience import request_deadline
+from integrations.yandex.client import YandexClient
+from integrations.yandex.schemas import YandexUserInfoSchema
+from sessions.manager import SessionManager
+from sessions.schemas import OAuthProvider
+
+T = TypeVar("T")
+
+router = APIRouter()
+
+
+async def _collect(
+    provider: OAuthProvider,
+    session_id: str | None,
+    load: Callable[[str], Awaitable[T]],
+    errors: dict[OAuthProvider, ProviderErrorSchema],
+) -> T | None:
+    """Load provider data within its own deadline, recording failure instead of raising it."""
+
+    if session_id is None:
+        errors[provider] = ProviderErrorSchema(status_code=401, detail="Not authenticated")
+        return None
+
+    try:
+        with request_deadline(settings.resilience.provider_deadline):
+            return await load(session_id)
+    except HTTPException as e:
+        errors[provider] = ProviderErrorSchema(status_code=e.status_code, detail=e.detail)
+        return None
+    except Exception as e:
+        # Unexpected (malformed upstream response, bug), the other provider's result is still returned
+        log_event("provider_error", always=True, provider=provider, error=f"{type(e).__name__}: {e}")
+        errors[provider] = ProviderErrorSchema(status_code=502, detail="Provider request failed.")
+        return None
+
+
+@router.get("", response_model=DashboardResponseSchema)
+async def get_dashboard(
+    google_session_id: Annotated[str | None, Depends(optional_google_session_cookie_scheme)],
+    yandex_session_id: Annotated[str | None, Depends(optional_yandex_session_cookie_scheme)],
+    session_manager: Annotated[SessionManager, Depends(get_session_manager)],
+    google_client: Annotated[GoogleClient, Depends(get_google_client)],
+    yandex_client: Annotated[YandexClient, Depends(get_yandex_client)],
+    calendar_sync: Annotated[CalendarSync, Depends(get_calendar_sync)],
+) -> SchemaResponse:
+    """Get next Google event and Yandex profile in one request, providers are queried concurrently.
+
+    Always 200, each provider succeeds or fails on its own.
+    """
+
+    async def load_google(session_id: str) -> CalendarListResponseSchema:
+        session = await session_manager.get(session_id, OAuthProvider.GOOGLE)
+        return await load_next_event(session, google_client, calendar_sync)
+
+    async def load_yandex(session_id: str) -> YandexUserInfoSchema:
+        access_token = await session_manager.get_access_token(session_id, OAuthProvider.YANDEX)
+        return await yandex_client.get_user_info(access_token)
+
+    errors: dict[OAuthProvider, ProviderErrorSchema] = {}
+
+    next_event, user_info = await asyncio.gather(
+        _collect(OAuthProvider.GOOGLE, google_session_id, load_google, errors),
+        _collect(OAuthProvider.YANDEX, yandex_session_id, load_yandex, errors),
+    )
+
+    return SchemaResponse(DashboardResponseSchema(next_event=next_event, user_info=user_info, errors=errors))
@@ -1,15 +1,36 @@
-from typing import Annotated
+import contextlib
+import math
+import time
+from datetime import datetime, timezone
+from typing import Annotated, AsyncIterator
 
-from fastapi import APIRouter, Query, Depends, status
-from fastapi.responses import RedirectResponse
+from fastapi import APIRouter, Query, Depends, HTTPException, status
+from fastapi.responses import RedirectResponse, StreamingResponse
 
-from api.deps.auth import GoogleOAuthInitData, get_google_oauth_init_data, google_access_token_cookie_scheme
-from api.deps.cookies import set_state_cookie, set_access_token_cookie, delete_state_cookie
-from api.deps.getters import get_google_client
+from api.deps.auth import (
+    GoogleOAuthInitData,
+    get_google_oauth_init_data,
+    get_google_access_token,
+    get_google_session,
+)
+from api.deps.cookies import set_state_cookie, set_session_cookie, expire_state_cookie
+from api.deps.getters import get_calendar_sync, get_code_exchanges, get_google_client, get_session_manager
 from api.deps.validators import validate_google_oauth_state
-from core.constants import GOOGLE_ACCESS_TOKEN_COOKIE_NAME
+from api.responses import SchemaResponse, StreamFormat, encode_stream, prefetch
+from core.constants import GOOGLE_SESSION_COOKIE_NAME, SESSION_COOKIE_PATH
+from core.settings import settings
 from integrations.google.client import GoogleClient
-from integrations.google.schemas import CalendarListResponseSchema
+from integrations.resilience import request_deadline
+from integrations.google.sync import CalendarSync
+from integrations.google.schemas import (
+    CalendarListResponseSchema,
+    CalendarSyncEventSchema,
+    UpcomingEventsResponseSchema,
+    UserInfoResponseSchema,
+)
+from sessions.exchanges import CodeExchange, CodeExchanges
+from sessions.manager import SessionManager
+from sessions.schemas import OAuthProvider, SessionData
 
 router = APIRouter()
 
@@ -32,29 +53,186 @@ def login(
     "/auth/callback",
     status_code=status.HTTP_307_TEMPORARY_REDIRECT,
     description="Google OAuth2 callback",
-    dependencies=[Depends(validate_google_oauth_state)],
 )
 async def callback(
     code: Annotated[str, Query(min_length=1, max_length=512)],  # Authorization code from Google OAuth callback
+    state: Annotated[str, Query()],
+    exchange: Annotated[CodeExchange, Depends(validate_google_oauth_state)],
+    exchanges: Annotated[CodeExchanges, Depends(get_code_exchanges)],
     client: Annotated[GoogleClient, Depends(get_google_client)],
+    session_manager: Annotated[SessionManager, Depends(get_session_manager)],
 ) -> RedirectResponse:
-    tokens = await client.get_auth_tokens(code)
+    async def create_session() -> str:
+        tokens = await client.get_auth_tokens(code)
+
+        try:
+            claims = await client.verify_id_token(tokens.id_token)
+        except (HTTPException, ValueError):
+            # Invalid token or signing keys unavailable (timeout, open breaker), but the code is spent already.
+            # Tokens come straight from Google, identity falls back to userinfo API
+            claims = None
+
+        session = await session_manager.create(
+            OAuthProvider.GOOGLE,
+            tokens,
+            subject=claims and claims.sub,
+            email=claims and claims.email,
+        )
+
+        return session.id
+
+    session_id = await exchanges.resolve(exchange, create_session)  # Repeated callbacks get the same session
 
     response = RedirectResponse(url="/")
-    set_access_token_cookie(
+    set_session_cookie(
         response,
-        tokens.access_token,
-        cookie_name=GOOGLE_ACCESS_TOKEN_COOKIE_NAME,
-        path="/api/google",
+        session_id,
+        cookie_name=GOOGLE_SESSION_COOKIE_NAME,
+        path=SESSION_COOKIE_PATH,
     )
-    delete_state_cookie(response)
+    response.delete_cookie(GOOGLE_SESSION_COOKIE_NAME, path="/api/google")  # Cookie of the former narrower path
+    expire_state_cookie(response, state)
 
     return response
 
 
-@router.get("/calendar/next-event")
+def _sync_key(session: SessionData) -> str:
+    """Index owner, sessions of one verified Google account share it."""
+
+    return f"sub:{session.subject}" if session.subject is not None else f"session:{session.id}"
+
+
+def _as_utc(moment: datetime) -> datetime:
+    return moment if moment.tzinfo is not None else moment.replace(tzinfo=timezone.utc)
+
+
+async def load_next_event(
+    session: SessionData,
+    client: GoogleClient,
+    calendar_sync: CalendarSync,
+) -> CalendarListResponseSchema:
+    """Next (or current) primary calendar event, from the synced index when sync is enabled."""
+
+    if not settings.google.calendar.sync_enabled:
+        return await client.get_next_calendar_event(session.access_token)
+
+    index = await calendar_sync.get_index(_sync_key(session), session.access_token)
+
+    return CalendarListResponseSchema(items=index.between(time.time(), math.inf, limit=1))
+
+
+@router.get("/calendar/next-event", response_model=CalendarListResponseSchema)
 async def get_next_event(
-    access_token: Annotated[str, Depends(google_access_token_cookie_scheme)],
+    session: Annotated[SessionData, Depends(get_google_session)],
     client: Annotated[GoogleClient, Depends(get_google_client)],
-) -> CalendarListResponseSchema:
-    return await client.get_next_calendar_event(access_token)
+    calendar_sync: Annotated[CalendarSync, Depends(get_calendar_sync)],
+) -> SchemaResponse:
+    """Get the next (or current) primary calendar event."""
+
+    return SchemaResponse(await load_next_event(session, client, calendar_sync))
+
+
+@router.get("/calendar/events", response_model=CalendarListResponseSchema)
+async def get_events(
+    session: Annotated[SessionData, Depends(get_google_session)],
+    client: Annotated[GoogleClient, Depends(get_google_client)],
+    calendar_sync: Annotated[CalendarSync, Depends(get_calendar_sync)],
+    time_min: datetime,
+    time_max: datetime,
+    limit: Annotated[int, Query(ge=1, le=settings.google.calendar.max_range_events)] = 50,
+) -> SchemaResponse:
+    """Get primary calendar events overlapping the range, ordered by start time (naive times are UTC)."""
+
+    time_min, time_max = _as_utc(time_min), _as_utc(time_max)
+
+    if time_max <= time_min:
+        raise HTTPException(status_code=400, detail="time_max must be after time_min")
+
+    if settings.google.calendar.sync_enabled:
+        index = await calendar_sync.get_index(_sync_key(session), session.access_token)
+
+        if time_min.timestamp() >= index.retained_from:
+            return SchemaResponse(
+                CalendarListResponseSchema(items=index.between(time_min.timestamp(), time_max.timestamp(), limit))
+            )
+
+    # Index keeps only recent past, older ranges are served by Google directly
+    return SchemaResponse(await client.get_calendar_events(session.access_token, time_min, time_max, limit))
+
+
+async def _export_pages(
+    client: GoogleClient,
+    access_token: str,
+    time_min: datetime,
+    time_max: datetime,
+) -> AsyncIterator[list[CalendarSyncEventSchema]]:
+    params = {
+        "timeMin": time_min.isoformat(),
+        "timeMax": time_max.isoformat(),
+        "singleEvents": "true",
+        "orderBy": "startTime",
+        "maxResults": settings.google.calendar.export_page_size,
+    }
+    pages = client.iter_events_pages(access_token, params, context="Calendar export")
+
+    async with contextlib.aclosing(pages):
+        while True:
+            # Each page gets its own deadline, the whole export may take much longer than a single request
+            with request_deadline(settings.resilience.request_deadline, renew=True):
+                page = await anext(pages, None)
+
+            if page is None:
+                return
+
+            yield page.items
+
+
+@router.get(
+    "/calendar/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {StreamFormat.NDJSON.media_type: {}, StreamFormat.JSON.media_type: {}}}},
+)
+async def export_events(
+    access_token: Annotated[str, Depends(get_google_access_token)],
+    client: Annotated[GoogleClient, Depends(get_google_client)],
+    time_min: datetime,
+    time_max: datetime,
+    format: StreamFormat = StreamFormat.NDJSON,
+) -> StreamingResponse:
+    """Stream all primary calendar events of the range as NDJSON or JSON array, page by page as Google returns them.
+
+    Client disconnect cancels the stream together with the upstream request in flight.
+    """
+
+    time_min, time_max = _as_utc(time_min), _as_utc(time_max)
+
+    if time_max <= time_min:
+        raise HTTPException(status_code=400, detail="time_max must be after time_min")
+
+    pages = await prefetch(_export_pages(client, access_token, time_min, time_max))
+
+    return StreamingResponse(encode_stream(pages, format), media_type=format.media_type)
+
+
+@router.get("/calendar/upcoming-events", response_model=UpcomingEventsResponseSchema)
+async def get_upcoming_events(
+    access_token: Annotated[str, Depends(get_google_access_token)],
+    client: Annotated[GoogleClient, Depends(get_google_client)],
+    limit: Annotated[int, Query(ge=1, le=settings.google.calendar.max_upcoming_events)] = 10,
+) -> SchemaResponse:
+    """Get next events across all of the user's calendars, ordered by start time."""
+
+    return SchemaResponse(await client.get_upcoming_events(access_token, limit))
+
+
+@router.get("/user/info", response_model=UserInfoResponseSchema)
+async def get_user_info(
+    session: Annotated[SessionData, Depends(get_google_session)],
+    client: Annotated[GoogleClient, Depends(get_google_client)],
+) -> SchemaResponse:
+    """Get Google user identity, resolved locally from the verified id_token when possible."""
+
+    if session.subject is not None and session.email is not None:
+        return SchemaResponse(UserInfoResponseSchema(id=session.subject, email=session.email))
+
+    return SchemaResponse(await client.get_user_info(session.access_token))
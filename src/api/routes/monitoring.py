@@ -0,0 +1,32 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+
+from api.deps.getters import get_google_client, get_yandex_client
+from integrations.google.client import GoogleClient
+from integrations.resilience import retry_budget
+from integrations.yandex.client import YandexClient
+
+router = APIRouter()
+
+
+@router.get("/upstreams")
+def get_upstreams_state(
+    google_client: Annotated[GoogleClient, Depends(get_google_client)],
+    yandex_client: Annotated[YandexClient, Depends(get_yandex_client)],
+) -> dict:
+    """Get circuit breaker and concurrency limit states and cache stats of upstream clients."""
+
+    return {
+        "google": {
+            "breakers": google_client.breaker_states(),
+            "bulkheads": google_client.bulkhead_states(),
+            "cache": google_client.cache.stats(),
+        },
+        "yandex": {
+            "breakers": yandex_client.breaker_states(),
+            "bulkheads": yandex_client.bulkhead_states(),
+            "cache": yandex_client.cache.stats(),
+        },
+        "retry_budget": round(retry_budget.available, 2),
+    }
@@ -1,15 +1,22 @@
+from functools import partial
 from typing import Annotated
 
 from fastapi import APIRouter, Query, Depends, status
-from fastapi.responses import RedirectResponse
+from fastapi.responses import FileResponse, RedirectResponse
 
-from api.deps.auth import YandexOAuthInitData, get_yandex_oauth_init_data, yandex_access_token_cookie_scheme
-from api.deps.cookies import set_state_cookie, set_access_token_cookie, delete_state_cookie
-from api.deps.getters import get_yandex_client
+from api.deps.auth import YandexOAuthInitData, get_yandex_oauth_init_data, get_yandex_access_token
+from api.deps.cookies import set_state_cookie, set_session_cookie, expire_state_cookie
+from api.deps.getters import get_avatar_cache, get_code_exchanges, get_yandex_client, get_session_manager
 from api.deps.validators import validate_yandex_oauth_state
-from core.constants import YANDEX_ACCESS_TOKEN_COOKIE_NAME
+from api.responses import SchemaResponse
+from core.constants import CACHE_CONTROL_PRIVATE_REVALIDATE, YANDEX_SESSION_COOKIE_NAME, SESSION_COOKIE_PATH
 from integrations.yandex.client import YandexClient
-from integrations.yandex.schemas import YandexUserInfoSchema
+from integrations.yandex.exceptions import YandexAPIError
+from integrations.yandex.schemas import YandexAvatarSize, YandexUserInfoSchema
+from sessions.exchanges import CodeExchange, CodeExchanges
+from sessions.manager import SessionManager
+from sessions.schemas import OAuthProvider
+from storage.files import FileCache
 
 router = APIRouter()
 
@@ -32,31 +39,71 @@ def login(
     "/auth/callback",
     status_code=status.HTTP_307_TEMPORARY_REDIRECT,
     description="Yandex OAuth2 callback",
-    dependencies=[Depends(validate_yandex_oauth_state)],
 )
 async def callback(
     code: Annotated[str, Query(min_length=1, max_length=512)],  # Authorization code from Yandex OAuth callback
+    state: Annotated[str, Query()],
+    exchange: Annotated[CodeExchange, Depends(validate_yandex_oauth_state)],
+    exchanges: Annotated[CodeExchanges, Depends(get_code_exchanges)],
     client: Annotated[YandexClient, Depends(get_yandex_client)],
+    session_manager: Annotated[SessionManager, Depends(get_session_manager)],
 ) -> RedirectResponse:
-    tokens = await client.get_auth_tokens(code)
+    async def create_session() -> str:
+        tokens = await client.get_auth_tokens(code)
+        session = await session_manager.create(OAuthProvider.YANDEX, tokens)
+
+        return session.id
+
+    session_id = await exchanges.resolve(exchange, create_session)  # Repeated callbacks get the same session
 
     response = RedirectResponse(url="/")
-    set_access_token_cookie(
+    set_session_cookie(
         response,
-        tokens.access_token,
-        cookie_name=YANDEX_ACCESS_TOKEN_COOKIE_NAME,
-        path="/api/yandex",
+        session_id,
+        cookie_name=YANDEX_SESSION_COOKIE_NAME,
+        path=SESSION_COOKIE_PATH,
     )
-    delete_state_cookie(response)
+    response.delete_cookie(YANDEX_SESSION_COOKIE_NAME, path="/api/yandex")  # Cookie of the former narrower path
+    expire_state_cookie(response, state)
 
     return response
 
 
-@router.get("/user/info")
+@router.get("/user/info", response_model=YandexUserInfoSchema)
 async def get_user_info(
-    access_token: Annotated[str, Depends(yandex_access_token_cookie_scheme)],
+    access_token: Annotated[str, Depends(get_yandex_access_token)],
     client: Annotated[YandexClient, Depends(get_yandex_client)],
-) -> YandexUserInfoSchema:
+) -> SchemaResponse:
     """Get Yandex user information."""
 
-    return await client.get_user_info(access_token)
+    return SchemaResponse(await client.get_user_info(access_token))
+
+
+@router.get("/avatar/{size}", response_class=FileResponse)
+async def get_avatar(
+    size: YandexAvatarSize,
+    access_token: Annotated[str, Depends(get_yandex_access_token)],
+    client: Annotated[YandexClient, Depends(get_yandex_client)],
+    avatar_cache: Annotated[FileCache, Depends(get_avatar_cache)],
+) -> FileResponse:
+    """Get Yandex user avatar, fetched once and served from the disk cache."""
+
+    user_info = await client.get_user_info(access_token)
+
+    if not user_info.default_avatar_id or user_info.is_avatar_empty:
+        raise YandexAPIError(404, "Avatar not found.")
+
+    avatar_id = user_info.default_avatar_id
+    cached = await avatar_cache.get_or_fetch(
+        f"yandex:{avatar_id}:{size}",
+        partial(client.get_avatar, avatar_id, size),
+    )
+
+    # Served from the file, with zero-copy sendfile on servers supporting ASGI path send. The URL is the same for
+    # another account or a changed avatar, so the browser revalidates by content digest ETag (304 when unchanged)
+    return FileResponse(
+        cached.path,
+        media_type=cached.media_type,
+        stat_result=cached.stat,
+        headers={"ETag": f'"{cached.digest}"', "Cache-Control": CACHE_CONTROL_PRIVATE_REVALIDATE},
+    )
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+
+from integrations.google.schemas import CalendarListResponseSchema
+from integrations.yandex.schemas import YandexUserInfoSchema
+from sessions.schemas import OAuthProvider
+
+
+class ProviderErrorSchema(BaseModel):
+    status_code: int
+    detail: str
+
+
+class DashboardResponseSchema(BaseModel):
+    """Data of all providers, a provider that failed (or is not logged in) has None and an entry in errors."""
+
+    next_event: CalendarListResponseSchema | None = None  # Google
+    user_info: YandexUserInfoSchema | None = None  # Yandex
+    errors: dict[OAuthProvider, ProviderErrorSchema] = {}
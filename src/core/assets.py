@@ -0,0 +1,110 @@
+import dataclasses
+import hashlib
+import mimetypes
+from pathlib import Path
+from typing import Iterable
+
+from starlette.datastructures import Headers
+from starlette.responses import PlainTextResponse, Response
+from starlette.types import Receive, Scope, Send
+
+from core.compression import SUPPORTED_ENCODINGS, choose_encoding, compress, is_compressible
+from core.constants import CACHE_CONTROL_IMMUTABLE, CACHE_CONTROL_REVALIDATE
+from core.settings import settings
+
+
+def content_digest(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+def content_etag(body: bytes) -> str:
+    """Weak validator from content hash, it holds for the body in any content coding."""
+
+    return f'W/"{content_digest(body)}"'
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class StaticAsset:
+    """In-memory response body, precompressed with every supported content coding."""
+
+    media_type: str
+    digest: str
+    bodies: dict[str | None, bytes]  # By content coding, None is identity
+
+    @classmethod
+    def build(cls, body: bytes, media_type: str) -> "StaticAsset":
+        bodies: dict[str | None, bytes] = {None: body}
+
+        if is_compressible(media_type) and len(body) >= settings.compression.minimum_size:
+            for encoding in SUPPORTED_ENCODINGS:
+                compressed = compress(body, encoding, static=True)
+
+                if len(compressed) < len(body):
+                    bodies[encoding] = compressed
+
+        return cls(media_type=media_type, digest=content_digest(body), bodies=bodies)
+
+    def response(self, request_headers: Headers, cache_control: str) -> Response:
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""), filter(None, self.bodies))
+        headers = {"ETag": f'W/"{self.digest}"', "Cache-Control": cache_control}
+
+        if len(self.bodies) > 1:
+            headers["Vary"] = "Accept-Encoding"
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+
+        return Response(self.bodies[encoding], headers=headers, media_type=self.media_type)
+
+
+class StaticAssets:
+    """ASGI app serving files of a directory from memory, precompressed and under fingerprinted URLs.
+
+    Fingerprinted URL changes with file content, so it is cached by browsers forever.
+    Plain URL keeps working and is revalidated by ETag.
+    """
+
+    def __init__(self, directory: Path, url_prefix: str = "/static", exclude: Iterable[str] = ()) -> None:
+        self.directory = directory
+        self.url_prefix = url_prefix
+        self.exclude = frozenset(exclude)  # Top level subdirectories that are not assets (templates)
+        self._assets: dict[str, tuple[StaticAsset, str]] = {}  # Path -> asset and its Cache-Control
+        self._fingerprinted: dict[str, str] = {}  # Path -> fingerprinted path
+
+    def load(self) -> None:
+        """Read, fingerprint and compress all files, done once on startup."""
+
+        for file in sorted(self.directory.rglob("*")):
+            path = file.relative_to(self.directory).as_posix()
+
+            if not file.is_file() or path.split("/", 1)[0] in self.exclude:
+                continue
+
+            asset = StaticAsset.build(
+                file.read_bytes(),
+                mimetypes.guess_type(path)[0] or "application/octet-stream",
+            )
+            stem, dot, suffix = path.rpartition(".")
+            fingerprinted = f"{stem}.{asset.digest}.{suffix}" if dot else f"{path}.{asset.digest}"
+
+            self._assets[path] = (asset, CACHE_CONTROL_REVALIDATE)
+            self._assets[fingerprinted] = (asset, CACHE_CONTROL_IMMUTABLE)
+            self._fingerprinted[path] = fingerprinted
+
+    def url(self, path: str) -> str:
+        """Fingerprinted URL of an asset, for templates."""
+
+        return f"{self.url_prefix}/{self._fingerprinted[path]}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Mount adds matched prefix to root_path and leaves full path in path
+        entry = self._assets.get(scope["path"][len(scope.get("root_path", "")) :].lstrip("/"))
+
+        if scope["method"] not in ("GET", "HEAD"):
+            response = PlainTextResponse("Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"})
+        elif entry is None:
+            response = PlainTextResponse("Not Found", status_code=404)
+        else:
+            asset, cache_control = entry
+            response = asset.response(Headers(scope=scope), cache_control)
+
+        await response(scope, receive, send)
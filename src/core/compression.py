@@ -0,0 +1,110 @@
+import gzip
+import zlib
+from typing import Final, Iterable, Protocol
+
+try:
+    import brotli
+except ImportError:  # Optional extra (pip install .[brotli]), responses fall back to gzip
+    brotli = None
+
+from core.settings import settings
+
+GZIP: Final[str] = "gzip"
+BROTLI: Final[str] = "br"
+
+# Server preference when the client accepts several encodings with the same weight
+SUPPORTED_ENCODINGS: Final[tuple[str, ...]] = (BROTLI, GZIP) if brotli is not None else (GZIP,)
+
+COMPRESSIBLE_TYPES: Final[tuple[str, ...]] = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "image/svg+xml",
+)
+
+
+class StreamCompressor(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes: ...
+
+    def finish(self) -> bytes: ...
+
+
+class _GzipStream:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 writes gzip header and trailer
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def choose_encoding(accept_encoding: str, available: Iterable[str] = SUPPORTED_ENCODINGS) -> str | None:
+    """Pick the best available content coding from Accept-Encoding, None means identity."""
+
+    weights = {}
+
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().lower().partition(";")
+        weight = 1.0
+
+        if params.strip().startswith("q="):
+            try:
+                weight = float(params.strip()[2:])
+            except ValueError:
+                continue
+
+        weights[name.strip()] = weight
+
+    best, best_weight = None, 0.0
+
+    for encoding in available:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+
+    return best
+
+
+def compress(data: bytes, encoding: str, static: bool = False) -> bytes:
+    """Compress whole body, static assets use the slowest and densest settings since they are compressed once."""
+
+    config = settings.compression
+
+    if encoding == BROTLI:
+        return brotli.compress(data, quality=11 if static else config.brotli_quality)
+
+    return gzip.compress(data, compresslevel=9 if static else config.gzip_level, mtime=0)
+
+
+def stream_compressor(encoding: str) -> StreamCompressor:
+    if encoding == BROTLI:
+        return _BrotliStream(settings.compression.brotli_quality)
+
+    return _GzipStream(settings.compression.gzip_level)
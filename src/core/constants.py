@@ -3,9 +3,30 @@ from typing import Final
 # Cookie names
 STATE_COOKIE_NAME: Final[str] = "oauth_state"
 ACCESS_TOKEN_COOKIE_NAME: Final[str] = "access_token"  # Legacy, for backwards compatibility
-GOOGLE_ACCESS_TOKEN_COOKIE_NAME: Final[str] = "google_access_token"
-YANDEX_ACCESS_TOKEN_COOKIE_NAME: Final[str] = "yandex_access_token"
+GOOGLE_SESSION_COOKIE_NAME: Final[str] = "google_session"
+YANDEX_SESSION_COOKIE_NAME: Final[str] = "yandex_session"
+
+# Session cookies are sent to every API route, so aggregated endpoints see sessions of all providers
+SESSION_COOKIE_PATH: Final[str] = "/api"
+
+# Header with admin token for /api/admin endpoints
+ADMIN_TOKEN_HEADER_NAME: Final[str] = "X-Admin-Token"
 
 # Cookie expiration times (in seconds)
 STATE_COOKIE_MAX_AGE: Final[int] = 600  # 10 minutes
-ACCESS_TOKEN_COOKIE_MAX_AGE: Final[int] = 3600  # 1 hour
+SESSION_COOKIE_MAX_AGE: Final[int] = 30 * 24 * 3600  # 30 days
+
+# Access tokens are refreshed when they expire within this time (in seconds)
+ACCESS_TOKEN_REFRESH_LEEWAY: Final[int] = 60
+
+# Storage key of server-side OAuth state record, valid for STATE_COOKIE_MAX_AGE and consumed by the callback
+OAUTH_STATE_KEY_PREFIX: Final[str] = "oauth_state:"
+
+# Storage key of authorization code exchange result, repeated callbacks reuse it within CODE_EXCHANGE_TTL
+OAUTH_EXCHANGE_KEY_PREFIX: Final[str] = "oauth_exchange:"
+CODE_EXCHANGE_TTL: Final[int] = 60  # In seconds
+
+# Cache-Control of served responses
+CACHE_CONTROL_IMMUTABLE: Final[str] = "public, max-age=31536000, immutable"  # Fingerprinted static assets
+CACHE_CONTROL_REVALIDATE: Final[str] = "no-cache"  # Stored by browser, but revalidated with ETag on every use
+CACHE_CONTROL_PRIVATE_REVALIDATE: Final[str] = "private, no-cache"  # Per-user API data
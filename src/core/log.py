@@ -0,0 +1,198 @@
+import contextlib
+import contextvars
+import dataclasses
+import json
+import queue
+import random
+import secrets
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Final, Iterator, TextIO
+from urllib.parse import parse_qsl, urlencode
+
+from core.metrics import CallbackCounter, CallbackGauge, registry
+from core.settings import settings
+
+REDACTED: Final[str] = "[redacted]"
+
+# Fields and query parameters holding credentials: exact names and name parts, compared in lower case
+SENSITIVE_NAMES: Final[frozenset[str]] = frozenset({"code", "state", "key"})
+SENSITIVE_NAME_PARTS: Final[tuple[str, ...]] = ("token", "secret", "password", "authorization", "cookie")
+
+
+def is_sensitive(name: str) -> bool:
+    name = name.lower()
+
+    return name in SENSITIVE_NAMES or any(part in name for part in SENSITIVE_NAME_PARTS)
+
+
+def redact(value: Any) -> Any:
+    """Replace values of sensitive keys in nested dicts and lists."""
+
+    if isinstance(value, dict):
+        return {key: REDACTED if is_sensitive(str(key)) else redact(item) for key, item in value.items()}
+
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+
+    return value
+
+
+def redact_query(query: str) -> str:
+    pairs = parse_qsl(query, keep_blank_values=True)
+
+    return urlencode([(name, REDACTED if is_sensitive(name) else value) for name, value in pairs], safe="[]")
+
+
+def _encode(record: dict) -> str:
+    record = redact(record)
+    record["ts"] = datetime.fromtimestamp(record["ts"], timezone.utc).isoformat(timespec="milliseconds")
+
+    if record.get("query"):
+        record["query"] = redact_query(record["query"])
+
+    return json.dumps(record, default=str, separators=(",", ":")) + "\n"
+
+
+class LogWriter:
+    """JSON lines writer: the event loop only queues records, a background thread encodes and writes them in batches.
+
+    Queueing never blocks. Records beyond the queue size are dropped and counted, so slow output (a full pipe,
+    a slow disk) costs log records instead of request latency. Counters are plain ints, each one is only
+    updated by one thread.
+    """
+
+    def __init__(self, max_queue: int, batch_size: int, stream: TextIO | None = None) -> None:
+        self._queue: queue.Queue[dict | None] = queue.Queue(max_queue)
+        self._batch_size = batch_size
+        self._stream = stream  # sys.stdout when not set, resolved by the thread
+        self._thread: threading.Thread | None = None
+        self.written = 0  # Writer thread
+        self.failed = 0  # Writer thread, lost to output errors
+        self.dropped = 0  # Event loop, queue was full
+        self.sampled_out = 0  # Event loop
+
+    def __len__(self) -> int:
+        return self._queue.qsize()
+
+    def emit(self, record: dict) -> None:
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Write queued records and stop the thread."""
+
+        if self._thread is None:
+            return
+
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        stream = self._stream or sys.stdout
+
+        while True:
+            # Batch is whatever piled up while the previous one was written: one write per record when idle,
+            # up to batch_size records per write under load
+            batch = [self._queue.get()]
+
+            with contextlib.suppress(queue.Empty):
+                while len(batch) < self._batch_size:
+                    batch.append(self._queue.get_nowait())
+
+            lines = [_encode(record) for record in batch if record is not None]
+
+            if lines:
+                try:
+                    stream.write("".join(lines))
+                    stream.flush()
+                except (OSError, ValueError):
+                    self.failed += len(lines)
+                else:
+                    self.written += len(lines)
+
+            if None in batch:
+                return
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "written": self.written,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "sampled_out": self.sampled_out,
+        }
+
+
+log_writer = LogWriter(settings.log.queue_size, settings.log.batch_size)
+
+registry.register(
+    CallbackCounter(
+        "log_records_total",
+        "Log records by outcome: written, failed, dropped on full queue or sampled out.",
+        ("outcome",),
+        lambda: (((outcome,), value) for outcome, value in log_writer.stats().items()),
+    )
+)
+registry.register(
+    CallbackGauge("log_queue_records", "Log records waiting for the writer thread.", (), lambda: [((), len(log_writer))])
+)
+
+
+@dataclasses.dataclass(slots=True)
+class RequestLog:
+    id: str
+    sampled: bool  # Records of successful operations are written only for sampled requests
+    cache_hits: int = 0
+
+
+_request_log: contextvars.ContextVar[RequestLog | None] = contextvars.ContextVar("request_log", default=None)
+
+
+@contextlib.contextmanager
+def request_log() -> Iterator[RequestLog]:
+    """Request id and sampling decision for records of this context (and tasks started from it)."""
+
+    entry = RequestLog(id=secrets.token_hex(8), sampled=random.random() < settings.log.sample_rate)
+    token = _request_log.set(entry)
+
+    try:
+        yield entry
+    finally:
+        _request_log.reset(token)
+
+
+def note_cache_hit() -> None:
+    entry = _request_log.get()
+
+    if entry is not None:
+        entry.cache_hits += 1
+
+
+def log_event(kind: str, always: bool = False, **fields: Any) -> None:
+    """Queue a record, written if the request is sampled or it is marked as always written (errors, slow calls)."""
+
+    if not settings.log.enabled:
+        return
+
+    entry = _request_log.get()
+    sampled = entry.sampled if entry is not None else random.random() < settings.log.sample_rate
+
+    if not (sampled or always):
+        log_writer.sampled_out += 1
+        return
+
+    log_writer.emit({"ts": time.time(), "type": kind, "request_id": entry and entry.id, **fields})
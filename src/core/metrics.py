@@ -0,0 +1,232 @@
+import abc
+import math
+from bisect import bisect_left
+from typing import Callable, Iterable, Iterator, TypeVar
+
+DEFAULT_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = tuple[str, ...]
+
+MetricT = TypeVar("MetricT", bound="_Metric")
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+
+    if extra:
+        pairs.append(extra)
+
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(abc.ABC):
+    type: str = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    @abc.abstractmethod
+    def samples(self) -> Iterator[str]: ...
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.type}"
+        yield from self.samples()
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._children: dict[LabelValues, _CounterChild] = {}
+
+    def labels(self, *values: str) -> _CounterChild:
+        child = self._children.get(values)
+
+        if child is None:
+            child = self._children[values] = _CounterChild()
+
+        return child
+
+    def samples(self) -> Iterator[str]:
+        for values, child in self._children.items():
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def labels(self, *values: str) -> _GaugeChild:
+        child = self._children.get(values)
+
+        if child is None:
+            child = self._children[values] = _GaugeChild()
+
+        return child
+
+
+class CallbackGauge(_Metric):
+    """Gauge whose samples are computed on scrape."""
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...],
+        collect: Callable[[], Iterable[tuple[LabelValues, float]]],
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._collect = collect
+
+    def samples(self) -> Iterator[str]:
+        for values, value in self._collect():
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(value)}"
+
+
+class CallbackCounter(CallbackGauge):
+    """Counter whose samples are computed on scrape."""
+
+    type = "counter"
+
+
+class _HistogramChild:
+    __slots__ = ("_upper_bounds", "counts", "sum")
+
+    def __init__(self, upper_bounds: tuple[float, ...]) -> None:
+        self._upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self._upper_bounds, value)] += 1
+        self.sum += value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._buckets = tuple(sorted(buckets))
+        self._children: dict[LabelValues, _HistogramChild] = {}
+
+    def labels(self, *values: str) -> _HistogramChild:
+        child = self._children.get(values)
+
+        if child is None:
+            child = self._children[values] = _HistogramChild(self._buckets)
+
+        return child
+
+    def samples(self) -> Iterator[str]:
+        for values, child in self._children.items():
+            cumulative = 0
+
+            for upper_bound, count in zip((*self._buckets, math.inf), child.counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, values, f'le="{_format_value(upper_bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    """Prometheus text exposition of registered metrics.
+
+    Metrics are only updated from the event loop thread, so recording is plain
+    arithmetic without locks. Label children are created once and reused, and
+    histogram buckets are preallocated lists.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: MetricT) -> MetricT:
+        self._metrics[metric.name] = metric
+
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics.values() for line in metric.render()) + "\n"
+
+
+registry = MetricsRegistry()
+
+# HTTP server
+http_requests_total = registry.register(
+    Counter("http_requests_total", "Total HTTP requests.", ("method", "route", "status"))
+)
+http_request_duration_seconds = registry.register(
+    Histogram("http_request_duration_seconds", "HTTP request latency.", ("method", "route", "status"))
+)
+http_requests_in_flight = registry.register(
+    Gauge("http_requests_in_flight", "HTTP requests currently being handled.")
+)
+http_requests_rate_limited_total = registry.register(
+    Counter("http_requests_rate_limited_total", "HTTP requests rejected by client rate limit.")
+)
+
+# Upstream APIs
+upstream_request_duration_seconds = registry.register(
+    Histogram(
+        "upstream_request_duration_seconds",
+        "Upstream API call latency, per attempt.",
+        ("provider", "endpoint", "status"),
+    )
+)
+upstream_requests_in_flight = registry.register(
+    Gauge("upstream_requests_in_flight", "Upstream API calls currently in flight.", ("provider",))
+)
+upstream_requests_shed_total = registry.register(
+    Counter(
+        "upstream_requests_shed_total",
+        "Upstream API calls rejected because the host concurrency queue was full or the wait too long.",
+        ("provider", "reason"),
+    )
+)
@@ -0,0 +1,46 @@
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+
+
+def _frame_name(frame: FrameType) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_qualname}"
+
+
+def sample_stacks(seconds: float, interval: float) -> Counter[str]:
+    """Wall-clock sampling of stacks of all threads but the calling one, for the given time.
+
+    Stacks are collapsed (thread name first, then frames from the outermost, separated by `;`),
+    with the number of samples they were seen in, the input format of flamegraph tools.
+    Blocking calls show up as well as CPU work, since every thread is sampled whether it runs or waits.
+    """
+
+    stacks: Counter[str] = Counter()
+    own_id = threading.get_ident()
+    deadline = time.monotonic() + seconds
+
+    while time.monotonic() < deadline:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+
+        for thread_id, frame in sys._current_frames().items():  # noqa
+            if thread_id == own_id:
+                continue
+
+            frames = []
+
+            while frame is not None:
+                frames.append(_frame_name(frame))
+                frame = frame.f_back
+
+            frames.append(names.get(thread_id, str(thread_id)))
+            stacks[";".join(reversed(frames))] += 1
+
+        time.sleep(interval)
+
+    return stacks
+
+
+def render_collapsed(stacks: Counter[str]) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
@@ -1,6 +1,6 @@
 from pathlib import Path
-from typing import Final
-from urllib.parse import urlencode
+from typing import Final, Literal
+from urllib.parse import quote, urlencode
 
 from pydantic import SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -27,6 +27,9 @@ class GoogleOAauth2Config(BaseSettingsConfig):
     google_auth_url: str = "https://accounts.google.com/o/oauth2/v2/auth"
     google_token_url: str = "https://oauth2.googleapis.com/token"
     google_user_info_url: str = "https://www.googleapis.com/oauth2/v2/userinfo"
+    google_jwks_url: str = "https://www.googleapis.com/oauth2/v3/certs"
+    google_calendar_api_url: str = "https://www.googleapis.com/calendar/v3"
+    google_calendar_batch_url: str = "https://www.googleapis.com/batch/calendar/v3"
 
     scopes: list[str] = [
         "openid",
@@ -49,6 +52,33 @@ class GoogleOAauth2Config(BaseSettingsConfig):
 
         return f"{self.google_auth_url}?{urlencode(params)}"
 
+    @property
+    def google_calendar_events_url(self) -> str:
+        return self.get_calendar_events_url("primary")
+
+    @property
+    def google_calendar_list_url(self) -> str:
+        return f"{self.google_calendar_api_url}/users/me/calendarList"
+
+    def get_calendar_events_url(self, calendar_id: str) -> str:
+        return f"{self.google_calendar_api_url}/calendars/{quote(calendar_id, safe='')}/events"
+
+
+class GoogleCalendarConfig(BaseSettingsConfig):
+    use_batch: bool = True  # Fetch events of all calendars in one multipart batch request
+    batch_size: int = 50  # Google limit of requests per batch
+    fanout_concurrency: int = 8  # Parallel per-calendar requests when batch is disabled or fails
+    max_upcoming_events: int = 50
+    max_range_events: int = 250
+    export_page_size: int = 250  # Events per upstream page of a streamed export, bounds its memory use
+
+    # Incremental sync (syncToken) of the primary calendar into a per-user in-memory index
+    sync_enabled: bool = True
+    sync_interval: float = 30.0  # Index older than this is brought up to date before answering (in seconds)
+    sync_retention: float = 86400.0  # Past events kept in the index (in seconds), older ranges go upstream
+    sync_max_users: int = 1000  # Indexes kept per worker, least recently used are dropped
+    sync_page_size: int = 2500
+
 
 class YandexOAauth2Config(BaseSettingsConfig):
     client_id: str
@@ -58,6 +88,8 @@ class YandexOAauth2Config(BaseSettingsConfig):
     # Common
     yandex_auth_url: str = "https://oauth.yandex.ru/authorize"
     yandex_token_url: str = "https://oauth.yandex.ru/token"
+    yandex_user_info_url: str = "https://login.yandex.ru/info"
+    yandex_avatar_url: str = "https://avatars.yandex.net/get-yapic"
 
     def get_auth_url(self, state: str) -> str:
         """Generate OAuth URL with CSRF state parameter."""
@@ -74,10 +106,19 @@ class YandexOAauth2Config(BaseSettingsConfig):
 
 class GoogleConfig(BaseSettingsConfig):
     oauth: GoogleOAauth2Config
+    calendar: GoogleCalendarConfig = GoogleCalendarConfig()
+
+
+class YandexAvatarConfig(BaseSettingsConfig):
+    # Avatars are fetched once and kept on disk, shared by workers, least recently used are evicted over the cap
+    cache_dir: Path = ROOT_DIR / "data/avatars"
+    cache_max_bytes: int = 100 * 1024 * 1024
+    max_file_size: int = 1024 * 1024  # Larger upstream images are rejected (in bytes)
 
 
 class YandexConfig(BaseSettingsConfig):
     oauth: YandexOAauth2Config
+    avatar: YandexAvatarConfig = YandexAvatarConfig()
 
 
 class SecurityConfig(BaseSettingsConfig):
@@ -86,8 +127,147 @@ class SecurityConfig(BaseSettingsConfig):
     cookie_samesite: str = "strict"
 
 
+class CacheConfig(BaseSettingsConfig):
+    max_size: int = 1024  # Max cached upstream responses per client
+
+    # Per-method TTLs (in seconds), 0 disables caching
+    google_user_info_ttl: float = 300.0
+    google_calendar_ttl: float = 30.0
+    google_calendar_list_ttl: float = 300.0
+    yandex_user_info_ttl: float = 300.0
+
+    # Upstream ETags of fetched responses are kept this long (in seconds) to refetch them with If-None-Match
+    revalidate_ttl: float = 3600.0
+
+
+class CompressionConfig(BaseSettingsConfig):
+    enabled: bool = True
+    minimum_size: int = 1024  # Smaller responses are sent as is (in bytes)
+    gzip_level: int = 6
+    brotli_quality: int = 4  # Used only when brotli package is installed
+
+
+class HTTPClientConfig(BaseSettingsConfig):
+    # aiohttp speaks HTTP/1.1, a connection per concurrent request. httpx negotiates HTTP/2 (with the h2 package
+    # installed) and multiplexes concurrent requests to a host over a few connections
+    transport: Literal["aiohttp", "httpx"] = "aiohttp"
+    http2: bool = True  # httpx only
+
+    # Connection pool
+    pool_limit: int = 100
+    pool_limit_per_host: int = 20  # aiohttp only
+    keepalive_timeout: float = 30.0
+    dns_cache_ttl: int = 300  # In seconds
+
+    # Timeouts (in seconds)
+    connect_timeout: float = 5.0
+    read_timeout: float = 10.0
+
+    # Connections pre-opened to every upstream host on startup
+    warmup_connections: int = 2
+    warmup_timeout: float = 5.0
+
+
+class ResilienceConfig(BaseSettingsConfig):
+    request_deadline: float = 15.0  # Upstream calls never outlive the client request (in seconds)
+    provider_deadline: float = 5.0  # Budget of each provider in aggregated endpoints like dashboard (in seconds)
+
+    # Concurrent calls per upstream host, the excess waits in a bounded queue and is shed with 503 beyond it
+    upstream_max_concurrency: int = 32
+    upstream_max_queue: int = 64
+    upstream_max_wait: float = 1.0  # (in seconds)
+    overload_retry_after: int = 1  # Retry-After of shed requests (in seconds)
+
+    # Retries of idempotent requests, with jittered exponential backoff (in seconds)
+    max_retries: int = 2
+    backoff_base: float = 0.1
+    backoff_max: float = 1.0
+
+    # Global retry budget: retries allowed per request, plus a small steady allowance
+    retry_budget_ratio: float = 0.1
+    retry_budget_min_per_second: float = 1.0
+    retry_budget_max_tokens: float = 10.0
+
+    # Circuit breaker per upstream host
+    breaker_failure_threshold: int = 5
+    breaker_recovery_timeout: float = 30.0  # In seconds
+
+
+class TokenRefreshConfig(BaseSettingsConfig):
+    enabled: bool = True
+
+    # Timings (in seconds)
+    lead_time: float = 300.0  # Refresh tokens this long before they expire
+    jitter: float = 60.0  # Random spread of refresh times to avoid bursts
+    retry_delay: float = 30.0  # Delay before retrying a failed refresh
+
+    max_concurrency: int = 8  # Max simultaneous refresh requests
+
+
+class RateLimitConfig(BaseSettingsConfig):
+    # Token bucket per client on /api routes
+    enabled: bool = True
+    key: Literal["ip", "session"] = "ip"  # session - by session cookie, requests without one fall back to ip
+    rate: float = 10.0  # Sustained requests per second
+    burst: int = 30
+    max_clients: int = 10000  # Tracked buckets per worker, least recently seen are dropped
+
+
+class AdminConfig(BaseSettingsConfig):
+    token: SecretStr | None = None  # Enables /api/admin endpoints, sent in X-Admin-Token header
+    server_timing: bool = False  # Report request phases in Server-Timing header, exposes internals, for debugging
+    profile_max_seconds: float = 60.0
+
+
+class LogConfig(BaseSettingsConfig):
+    # Structured JSON lines on stdout for requests and upstream calls, written by a background thread
+    enabled: bool = True
+    sample_rate: float = 1.0  # Share of requests logged, errors and slow requests are always logged
+    slow_request: float = 1.0  # In seconds
+    queue_size: int = 10000  # Records beyond it are dropped (and counted) instead of blocking requests
+    batch_size: int = 256  # Max records per write
+
+
+class StorageConfig(BaseSettingsConfig):
+    # Key-value backend for OAuth state, code exchanges, sessions and shared response cache.
+    # memory is per process, sqlite is shared by workers on one host, redis is shared by hosts
+    backend: Literal["memory", "sqlite", "redis"] = "memory"
+    key_prefix: str = "oauth-service:"
+
+    # Separate LRU bounds of the memory backend, sessions are bounded only by their TTL
+    memory_max_size: int = 100_000  # Response cache and other entries
+    memory_max_oauth_states: int = 10_000  # Pending logins, anyone can create them
+    memory_max_code_exchanges: int = 10_000
+
+    sqlite_path: Path = ROOT_DIR / "data/storage.sqlite3"
+
+    redis_url: str = "redis://127.0.0.1:6379/0"
+    redis_password: SecretStr | None = None
+    redis_pool_size: int = 10
+    redis_timeout: float = 2.0  # In seconds
+
+
 class ServerConfig(BaseSettingsConfig):
-    reload: bool = False
+    reload: bool = False  # Development only, ignores workers
+    host: str = "0.0.0.0"
+    port: int = 8000
+
+    # Worker processes, each one creates its own API clients in lifespan. 0 means one worker per CPU core
+    workers: int = 1
+
+    # "auto" picks uvloop and httptools when they are installed, falling back to asyncio and h11
+    loop: Literal["auto", "asyncio", "uvloop"] = "auto"
+    http: Literal["auto", "h11", "httptools"] = "auto"
+
+    # Worker recycling: a worker exits after serving this many requests (plus random jitter) and gets replaced
+    limit_max_requests: int | None = None
+    limit_max_requests_jitter: int = 0
+
+    # Timings (in seconds)
+    timeout_keep_alive: int = 5
+    timeout_graceful_shutdown: int | None = 30  # Time for in-flight requests on shutdown and restarts
+
+    backlog: int = 2048
 
 
 class Settings(BaseSettingsConfig):
@@ -95,6 +275,15 @@ class Settings(BaseSettingsConfig):
     google: GoogleConfig
     yandex: YandexConfig
     security: SecurityConfig = SecurityConfig()
+    cache: CacheConfig = CacheConfig()
+    compression: CompressionConfig = CompressionConfig()
+    http_client: HTTPClientConfig = HTTPClientConfig()
+    token_refresh: TokenRefreshConfig = TokenRefreshConfig()
+    resilience: ResilienceConfig = ResilienceConfig()
+    storage: StorageConfig = StorageConfig()
+    rate_limit: RateLimitConfig = RateLimitConfig()
+    admin: AdminConfig = AdminConfig()
+    log: LogConfig = LogConfig()
 
 
 settings = Settings()  # noqa
@@ -1,5 +1,14 @@
+from typing import Any
+
 from starlette.templating import Jinja2Templates
 
+from core.assets import StaticAsset
 from core.settings import ROOT_DIR
 
 templates = Jinja2Templates(directory=ROOT_DIR / "src/static/html")
+
+
+def render_page(name: str, **context: Any) -> StaticAsset:
+    """Render a template that doesn't depend on the request once, to serve it from memory."""
+
+    return StaticAsset.build(templates.get_template(name).render(**context).encode(), "text/html")
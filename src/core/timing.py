@@ -0,0 +1,58 @@
+import contextlib
+import contextvars
+import time
+from typing import Iterator
+
+# Phase name -> [seconds, count] of the current request, None when timing is off
+_timings: contextvars.ContextVar[dict[str, list] | None] = contextvars.ContextVar("timings", default=None)
+
+
+@contextlib.contextmanager
+def span(name: str) -> Iterator[None]:
+    """Add time spent in the block to a phase of the current request, no-op unless timings are collected."""
+
+    timings = _timings.get()
+
+    if timings is None:
+        yield
+        return
+
+    started_at = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        phase = timings.setdefault(name, [0.0, 0])
+        phase[0] += time.perf_counter() - started_at
+        phase[1] += 1
+
+
+@contextlib.contextmanager
+def collect_timings() -> Iterator[dict[str, list]]:
+    """Collect spans of this context (and tasks started from it) into a fresh dict."""
+
+    timings: dict[str, list] = {}
+    token = _timings.set(timings)
+
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+def format_server_timing(timings: dict[str, list], total: float) -> str:
+    """Server-Timing header value, durations in milliseconds. Phases of concurrent calls may overlap."""
+
+    metrics = []
+
+    for name, (duration, count) in timings.items():
+        metric = f"{name};dur={duration * 1000:.2f}"
+
+        if count > 1:
+            metric += f';desc="{count} calls"'
+
+        metrics.append(metric)
+
+    metrics.append(f"total;dur={total * 1000:.2f}")
+
+    return ", ".join(metrics)
@@ -1,28 +1,427 @@
-from typing import Self
+import abc
+import asyncio
+import hashlib
+import struct
+import time
+from functools import partial
+from typing import Any, Awaitable, Callable, Final, Hashable, Iterator, Mapping, NoReturn, TypeVar
 
-import aiohttp
+from yarl import URL
 
+from core.log import log_event, note_cache_hit
+from core.metrics import (
+    CallbackCounter,
+    CallbackGauge,
+    registry,
+    upstream_request_duration_seconds,
+    upstream_requests_in_flight,
+    upstream_requests_shed_total,
+)
+from core.settings import settings
+from core.timing import span
+from integrations.cache import ResponseCache
+from integrations.exceptions import (
+    InvalidGrantError,
+    UpstreamOverloadedError,
+    UpstreamRateLimitedError,
+    UpstreamTimeoutError,
+    UpstreamUnavailableError,
+)
+from integrations.resilience import (
+    Bulkhead,
+    CircuitBreaker,
+    OverloadedError,
+    backoff_delay,
+    deadline_remaining,
+    retry_budget,
+)
+from integrations.singleflight import SingleFlight
+from integrations.transport import ModelT, ResponseTooLargeError, TransportError, UpstreamResponse, create_transport
+from storage.base import KeyValueBackend
+from storage.exceptions import StorageUnavailableError
 
-class BaseAPIClient:
-    _instance: Self | None = None
+T = TypeVar("T")
 
-    def __new__(cls, *args, **kwargs) -> Self:
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
 
-        return cls._instance
+# Shared cache entries are prefixed with their absolute expiration time, so every worker honours the original TTL
+SHARED_CACHE_EXPIRES_AT: Final[struct.Struct] = struct.Struct("!d")
 
-    def __init__(self, *args, **kwargs) -> None:
-        self._session: aiohttp.ClientSession | None = None
 
-    @property
-    def session(self) -> aiohttp.ClientSession:
-        if self._session is None:
-            self._session = aiohttp.ClientSession()
+def parse_retry_after(value: str | None) -> int:
+    """Seconds of upstream Retry-After header, HTTP dates and missing values fall back to the overload default."""
 
-        return self._session
+    if value is not None and value.strip().isdigit():
+        return max(1, int(value))
+
+    return settings.resilience.overload_retry_after
+
+
+def oauth_error(response: UpstreamResponse) -> str | None:
+    """Error code of an OAuth token endpoint error response (RFC 6749, section 5.2)."""
+
+    try:
+        error = response.json().get("error")
+    except (ValueError, AttributeError):
+        return None
+
+    return error if isinstance(error, str) else None  # API errors of Google carry an object instead
+
+
+class BaseAPIClient(abc.ABC):
+    provider: str = "upstream"  # Label for metrics
+
+    # Upstream URLs whose hosts get pre-opened connections on startup
+    warmup_urls: tuple[str, ...] = ()
+
+    # Sent with every upstream request, headers of the request take precedence
+    default_headers: Mapping[str, str] = {}
+
+    def __init__(self, shared_cache: KeyValueBackend | None = None) -> None:
+        self.transport = create_transport()
+        self.cache = ResponseCache(max_size=settings.cache.max_size)
+        self.validators = ResponseCache(max_size=settings.cache.max_size)  # Key -> upstream ETag and its response
+        self.shared_cache = shared_cache  # Second level cache, shared by workers
+        self._inflight = SingleFlight()
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._bulkheads: dict[str, Bulkhead] = {}
+
+    async def warmup(self) -> None:
+        """Pre-open pooled connections to upstream hosts (DNS, TCP and TLS setup)."""
+
+        origins = {str(URL(url).origin()) for url in self.warmup_urls}
+        connections = settings.http_client.warmup_connections
+
+        timeout = settings.http_client.warmup_timeout
+
+        await asyncio.gather(
+            *(self.transport.open_connection(origin, timeout) for origin in origins for _ in range(connections)),
+            return_exceptions=True,  # Warmup is best effort, requests will connect lazily anyway
+        )
+
+    @staticmethod
+    @abc.abstractmethod
+    def _handle_error(status: int, context: str) -> NoReturn:
+        """Raise provider specific exception for error status."""
+
+    def _breaker(self, url: str) -> CircuitBreaker:
+        host = URL(url).host
+
+        if host not in self._breakers:
+            self._breakers[host] = CircuitBreaker(host)
+
+        return self._breakers[host]
+
+    def breaker_states(self) -> list[dict]:
+        return [breaker.snapshot() for breaker in self._breakers.values()]
+
+    def _bulkhead(self, url: str) -> Bulkhead:
+        host = URL(url).host
+
+        if host not in self._bulkheads:
+            self._bulkheads[host] = Bulkhead(host)
+
+        return self._bulkheads[host]
+
+    def bulkhead_states(self) -> list[dict]:
+        return [bulkhead.snapshot() for bulkhead in self._bulkheads.values()]
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        *,
+        context: str,
+        access_token: str | None = None,
+        params: Mapping[str, Any] | None = None,
+        data: Mapping[str, Any] | bytes | None = None,
+        headers: Mapping[str, str] | None = None,
+        idempotent: bool | None = None,
+        max_body: int | None = None,
+    ) -> UpstreamResponse:
+        """Send upstream request through circuit breaker, retries and request deadline.
+
+        Idempotent requests (by method, unless overridden) are retried on connection errors and
+        5xx responses while retry budget and deadline allow. Error statuses are passed to ``_handle_error``.
+        A body longer than max_body raises ``ResponseTooLargeError`` without reading the rest.
+        """
+
+        headers = {**self.default_headers, **(headers or {})}
+
+        if access_token:
+            headers["Authorization"] = f"Bearer {access_token}"
+
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+
+        breaker = self._breaker(url)
+        bulkhead = self._bulkhead(url)
+        retry_budget.record_request()
+
+        attempt = 0
+
+        while True:
+            try:
+                async with bulkhead.acquire():
+                    # Checked with a slot held, so a half-open probe let through is never shed afterwards
+                    if not breaker.allow_request():
+                        raise UpstreamUnavailableError(retry_after=breaker.retry_after())
+
+                    try:
+                        response = await self._send(
+                            method, url, context, headers=headers, params=params, data=data, max_body=max_body
+                        )
+                    except (TimeoutError, TransportError):
+                        raise  # Recorded as failures below
+                    except ResponseTooLargeError:
+                        breaker.record_success()  # Upstream answered, the response is just not acceptable
+                        raise
+                    except BaseException:
+                        # Cancelled (client gone, deadline of a sibling task) or unexpected, a half-open breaker
+                        # must not wait forever for the outcome of this probe
+                        breaker.release_probe()
+                        raise
+            except OverloadedError as e:
+                upstream_requests_shed_total.labels(self.provider, e.reason).inc()
+                raise UpstreamOverloadedError(retry_after=settings.resilience.overload_retry_after) from e
+            except TimeoutError as e:
+                breaker.record_failure()
+
+                if not self._should_retry(idempotent, attempt):
+                    raise UpstreamTimeoutError() from e
+            except TransportError:
+                breaker.record_failure()
+
+                if not self._should_retry(idempotent, attempt):
+                    self._handle_error(502, context)
+            else:
+                if response.status < 500:
+                    breaker.record_success()
+                    break
+
+                breaker.record_failure()
+
+                if not self._should_retry(idempotent, attempt):
+                    break
+
+            await asyncio.sleep(backoff_delay(attempt))
+            attempt += 1
+
+        if response.status == 429:
+            raise UpstreamRateLimitedError(retry_after=parse_retry_after(response.headers.get("Retry-After")))
+
+        if response.status == 400 and oauth_error(response) == "invalid_grant":
+            raise InvalidGrantError()
+
+        if response.status >= 400:
+            self._handle_error(response.status, context)
+
+        return response
+
+    @staticmethod
+    def _should_retry(idempotent: bool, attempt: int) -> bool:
+        if not idempotent or attempt >= settings.resilience.max_retries:
+            return False
+
+        remaining = deadline_remaining()
+
+        # Don't retry if backoff would eat the rest of the deadline
+        if remaining is not None and remaining <= settings.resilience.backoff_max:
+            return False
+
+        return retry_budget.try_spend()
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        context: str,
+        *,
+        headers: Mapping[str, str] | None,
+        params: Mapping[str, Any] | None,
+        data: Mapping[str, Any] | bytes | None,
+        max_body: int | None,
+    ) -> UpstreamResponse:
+        remaining = deadline_remaining()
+
+        if remaining is not None and remaining <= 0:
+            raise TimeoutError()
+
+        in_flight = upstream_requests_in_flight.labels(self.provider)
+        status = "error"
+        response: UpstreamResponse | None = None
+        started_at = time.perf_counter()
+        in_flight.inc()
+
+        try:
+            with span("upstream"):
+                async with asyncio.timeout(remaining):
+                    response = await self.transport.request(
+                        method, url, headers=headers, params=params, data=data, max_body=max_body
+                    )
+
+            status = str(response.status)
+
+            return response
+        finally:
+            in_flight.dec()
+            duration = time.perf_counter() - started_at
+            # Context is a fixed per-method name, unlike URL paths which may contain ids
+            upstream_request_duration_seconds.labels(self.provider, context, status).observe(duration)
+            log_event(
+                "upstream",
+                always=not status.startswith(("2", "3")),
+                provider=self.provider,
+                endpoint=context,
+                method=method,
+                url=url,
+                params=dict(params or {}),  # Redacted by the writer thread
+                status=status,
+                http_version=response and response.http_version,
+                duration_ms=round(duration * 1000, 2),
+            )
+
+    def pool_stats(self) -> dict[str, int]:
+        """Connection pool utilization of the client transport."""
+
+        return self.transport.pool_stats()
+
+    async def _get_revalidated(
+        self,
+        key: Hashable,
+        url: str,
+        schema: type[ModelT],
+        *,
+        context: str,
+        access_token: str,
+        params: Mapping[str, Any] | None = None,
+    ) -> ModelT:
+        """GET sending ETag of the previous response for key as If-None-Match, 304 reuses it without parsing."""
+
+        validator = self.validators.get(key)
+
+        response = await self._request(
+            "GET",
+            url,
+            context=context,
+            access_token=access_token,
+            params=params,
+            headers={"If-None-Match": validator[0]} if validator is not None else None,
+        )
+
+        if response.status == 304 and validator is not None:
+            etag, result = validator
+        else:
+            etag, result = response.headers.get("ETag"), response.parse(schema)
+
+        if etag is not None:
+            self.validators.set(key, (etag, result), settings.cache.revalidate_ttl)
+
+        return result
+
+    async def _cached(
+        self,
+        key: Hashable,
+        ttl: float,
+        fetch: Callable[[], Awaitable[ModelT]],
+        schema: type[ModelT],
+    ) -> ModelT:
+        """Return cached response for key or fetch and store it for ttl seconds.
+
+        Concurrent misses for the same key share a single lookup in the shared cache and a single upstream call.
+        """
+
+        cached = self.cache.get(key)
+
+        if cached is not None:
+            note_cache_hit()
+            return cached
+
+        result, expires_in = await self._inflight.do(key, partial(self._fetch_shared, key, ttl, fetch, schema))
+        self.cache.set(key, result, expires_in)
+
+        return result
+
+    def _shared_key(self, key: Hashable) -> str:
+        return f"cache:{self.provider}:{hashlib.sha256(repr(key).encode()).hexdigest()}"
+
+    async def _fetch_shared(
+        self,
+        key: Hashable,
+        ttl: float,
+        fetch: Callable[[], Awaitable[ModelT]],
+        schema: type[ModelT],
+    ) -> tuple[ModelT, float]:
+        """Read through the shared cache, it is best effort and never fails the request."""
+
+        if self.shared_cache is None:
+            return await fetch(), ttl
+
+        shared_key = self._shared_key(key)
+
+        try:
+            payload = await self.shared_cache.get(shared_key)
+        except StorageUnavailableError:
+            payload = None
+
+        if payload is not None:
+            note_cache_hit()
+            (expires_at,) = SHARED_CACHE_EXPIRES_AT.unpack_from(payload)
+            return schema.model_validate_json(payload[SHARED_CACHE_EXPIRES_AT.size :]), expires_at - time.time()
+
+        result = await fetch()
+
+        try:
+            await self.shared_cache.set(
+                shared_key,
+                SHARED_CACHE_EXPIRES_AT.pack(time.time() + ttl) + result.__pydantic_serializer__.to_json(result),
+                ttl,
+            )
+        except StorageUnavailableError:
+            pass
+
+        return result, ttl
+
+    def invalidate_cache(self, access_token: str | None = None) -> int:
+        """Drop process-local cached responses of access token (or all of them).
+
+        Shared entries are left to expire, they are keyed by token hash and unreachable once the token is replaced.
+        """
+
+        self.validators.invalidate(access_token)
+
+        return self.cache.invalidate(access_token)
 
     async def shutdown(self) -> None:
-        if self._session is not None:
-            await self._session.close()
-            self._session = None
+        await self.transport.close()
+
+
+def register_client_metrics(*clients: BaseAPIClient) -> None:
+    """Export connection pool and cache stats of clients, computed on scrape."""
+
+    def collect_pool() -> Iterator[tuple[tuple[str, ...], float]]:
+        for client in clients:
+            for state, value in client.pool_stats().items():
+                yield (client.provider, state), value
+
+    def collect_cache(counter: str) -> Callable[[], Iterator[tuple[tuple[str, ...], float]]]:
+        return lambda: (((client.provider,), client.cache.stats()[counter]) for client in clients)
+
+    registry.register(
+        CallbackGauge(
+            "upstream_pool_connections",
+            "Upstream connection pool connections by state.",
+            ("provider", "state"),
+            collect_pool,
+        )
+    )
+    registry.register(
+        CallbackCounter(
+            "upstream_cache_hits_total", "Upstream response cache hits.", ("provider",), collect_cache("hits")
+        )
+    )
+    registry.register(
+        CallbackCounter(
+            "upstream_cache_misses_total", "Upstream response cache misses.", ("provider",), collect_cache("misses")
+        )
+    )
@@ -0,0 +1,89 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Mapping
+
+_MISSING: Any = object()
+
+
+def hash_token(access_token: str) -> str:
+    """Hash access token so raw credentials never end up in cache keys."""
+
+    return hashlib.sha256(access_token.encode()).hexdigest()
+
+
+class ResponseCache:
+    """Bounded in-memory LRU cache with per-entry TTL for upstream responses."""
+
+    def __init__(self, max_size: int) -> None:
+        self._max_size = max_size
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(
+        access_token: str,
+        method: str,
+        url: str,
+        params: Mapping[str, Any] | None = None,
+    ) -> tuple:
+        """Build cache key from access token hash and request signature."""
+
+        return (
+            hash_token(access_token),
+            method.upper(),
+            url,
+            tuple(sorted((params or {}).items())),
+        )
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key, _MISSING)
+
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        if ttl <= 0 or self._max_size <= 0:
+            return
+
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, access_token: str | None = None) -> int:
+        """Drop entries of a single access token, or everything if not given."""
+
+        if access_token is None:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+
+        token_hash = hash_token(access_token)
+        keys = [key for key in self._entries if key[0] == token_hash]
+
+        for key in keys:
+            del self._entries[key]
+
+        return len(keys)
+
+    def stats(self) -> dict[str, int]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
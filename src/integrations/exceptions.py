@@ -0,0 +1,48 @@
+from fastapi import HTTPException
+
+
+class UpstreamUnavailableError(HTTPException):
+    """Upstream circuit breaker is open, request is rejected without calling it."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(
+            status_code=503,
+            detail="Upstream service temporarily unavailable. Please retry later.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class UpstreamOverloadedError(HTTPException):
+    """Too many calls to the upstream are queued already, request is shed instead of waiting."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(
+            status_code=503,
+            detail="Service is overloaded. Please retry later.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class UpstreamTimeoutError(HTTPException):
+    """Upstream call did not finish within the request deadline."""
+
+    def __init__(self) -> None:
+        super().__init__(status_code=504, detail="Upstream service timed out.")
+
+
+class UpstreamRateLimitedError(HTTPException):
+    """Upstream answered 429, the request may be retried after a while."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(
+            status_code=429,
+            detail="Upstream rate limit exceeded. Please retry later.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class InvalidGrantError(HTTPException):
+    """Token endpoint rejected the grant: refresh token revoked or expired, authorization code already used."""
+
+    def __init__(self) -> None:
+        super().__init__(status_code=400, detail="Authorization grant is invalid or expired. Please login again.")
@@ -0,0 +1,66 @@
+import dataclasses
+import re
+import secrets
+from typing import Final, Mapping
+
+_PART_HEADERS_END: Final[re.Pattern[bytes]] = re.compile(rb"\r?\n\r?\n")
+_CONTENT_ID: Final[re.Pattern[bytes]] = re.compile(rb"^content-id:\s*<(?:response-)?(.+?)>\s*$", re.I | re.M)
+_BOUNDARY: Final[re.Pattern[str]] = re.compile(r'boundary="?([^";]+)"?', re.I)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class BatchResponsePart:
+    status: int
+    body: bytes
+
+
+def build_batch_request(requests: Mapping[str, str]) -> tuple[bytes, str]:
+    """Encode GET requests (Content-ID -> path with query) as multipart/mixed batch body.
+
+    Returns body and its Content-Type. Authorization of the outer request applies to every part.
+    """
+
+    boundary = f"batch_{secrets.token_hex(12)}"
+    lines = []
+
+    for content_id, path in requests.items():
+        lines += [
+            f"--{boundary}",
+            "Content-Type: application/http",
+            f"Content-ID: <{content_id}>",
+            "",
+            f"GET {path}",
+            "",
+        ]
+
+    lines += [f"--{boundary}--", ""]
+
+    return "\r\n".join(lines).encode(), f"multipart/mixed; boundary={boundary}"
+
+
+def parse_batch_response(body: bytes, content_type: str) -> dict[str, BatchResponsePart]:
+    """Split multipart/mixed batch response into HTTP responses by Content-ID."""
+
+    match = _BOUNDARY.search(content_type)
+
+    if match is None:
+        raise ValueError("Batch response has no multipart boundary")
+
+    delimiter = b"--" + match.group(1).encode()
+    parts = {}
+
+    for part in body.split(delimiter)[1:]:
+        if part.startswith(b"--"):  # Closing delimiter
+            break
+
+        # Part headers, then embedded response status line with headers, then its body
+        sections = _PART_HEADERS_END.split(part.lstrip(b"\r\n"), maxsplit=2)
+        content_id = _CONTENT_ID.search(sections[0])
+        status_line = sections[1].split(maxsplit=2) if len(sections) == 3 else []
+
+        if content_id is None or len(status_line) < 2 or not status_line[1].isdigit():
+            raise ValueError("Malformed batch response part")
+
+        parts[content_id.group(1).decode()] = BatchResponsePart(status=int(status_line[1]), body=sections[2].strip())
+
+    return parts
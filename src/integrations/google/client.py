@@ -1,65 +1,129 @@
+import asyncio
 from datetime import datetime, timezone
+from functools import partial
+from typing import Any, AsyncIterator, Mapping, NoReturn, Sequence
+from urllib.parse import urlencode, urlsplit
 
-from aiohttp import ClientResponseError
+from fastapi import HTTPException
+from pydantic import ValidationError
 
 from core.settings import settings
 from integrations.base_api_client import BaseAPIClient
+from integrations.google.batch import build_batch_request, parse_batch_response
+from integrations.google.events import merge_upcoming_events
 from integrations.google.exceptions import GoogleAPIError
+from integrations.google.fields import fields_mask
+from integrations.google.id_token import JWKSCache, parse_max_age, verify_id_token
 from integrations.google.schemas import (
     GoogleTokenRequestSchema,
     GoogleTokenResponseSchema,
+    GoogleTokenRefreshRequestSchema,
+    GoogleTokenRefreshResponseSchema,
+    GoogleIdTokenClaimsSchema,
     UserInfoResponseSchema,
     CalendarListResponseSchema,
+    CalendarListEntriesSchema,
+    CalendarListEntrySchema,
+    CalendarEventsPageSchema,
+    CalendarSyncPageSchema,
+    UpcomingEventsResponseSchema,
 )
+from storage.base import KeyValueBackend
 
 
 class GoogleClient(BaseAPIClient):
+    provider = "google"
+    warmup_urls = (
+        settings.google.oauth.google_token_url,
+        settings.google.oauth.google_user_info_url,
+        settings.google.oauth.google_calendar_events_url,
+    )
+    # Google compresses responses only for clients with gzip in both Accept-Encoding and User-Agent
+    default_headers = {"Accept-Encoding": "gzip", "User-Agent": "oauth-service (gzip)"}
+
+    def __init__(self, shared_cache: KeyValueBackend | None = None) -> None:
+        super().__init__(shared_cache)
+        self._jwks = JWKSCache(self._fetch_jwks)
+
     @staticmethod
-    def _handle_error(e: ClientResponseError, context: str) -> None:
+    def _handle_error(status: int, context: str) -> NoReturn:
         """Handle API errors with sanitized messages."""
 
-        if e.status == 401:
+        if status == 401:
             raise GoogleAPIError(401, "Authentication expired. Please login again.")
-        elif e.status == 403:
+        elif status == 403:
             raise GoogleAPIError(403, "Access denied. Check permissions.")
-        elif e.status == 404:
+        elif status == 404:
             raise GoogleAPIError(404, f"{context} not found.")
-        elif e.status >= 500:
+        elif status == 410:
+            raise GoogleAPIError(410, f"{context} expired.")
+        elif status >= 500:
             raise GoogleAPIError(502, "Google service temporarily unavailable.")
         else:
             raise GoogleAPIError(400, f"Failed to {context.lower()}.")
 
     async def get_auth_tokens(self, code: str) -> GoogleTokenResponseSchema:
-        async with self.session.post(
-            url=settings.google.oauth.google_token_url,
+        response = await self._request(
+            "POST",
+            settings.google.oauth.google_token_url,
+            context="Exchange authorization code",
             data=GoogleTokenRequestSchema(code=code).model_dump(),
-        ) as response:
-            try:
-                response.raise_for_status()
-            except ClientResponseError as e:
-                self._handle_error(e, "Exchange authorization code")
+        )
 
-            data = await response.json()
+        return response.parse(GoogleTokenResponseSchema)
 
-        return GoogleTokenResponseSchema(**data)
+    async def refresh_tokens(self, refresh_token: str) -> GoogleTokenRefreshResponseSchema:
+        response = await self._request(
+            "POST",
+            settings.google.oauth.google_token_url,
+            context="Refresh access token",
+            data=GoogleTokenRefreshRequestSchema(refresh_token=refresh_token).model_dump(),
+        )
 
-    async def get_user_info(self, access_token: str) -> UserInfoResponseSchema:
-        headers = {"Authorization": f"Bearer {access_token}"}
+        return response.parse(GoogleTokenRefreshResponseSchema)
 
-        async with self.session.get(
-            url=settings.google.oauth.google_user_info_url,
-            headers=headers,
-        ) as response:
-            try:
-                response.raise_for_status()
-            except ClientResponseError as e:
-                self._handle_error(e, "User info")
+    async def verify_id_token(self, id_token: str) -> GoogleIdTokenClaimsSchema:
+        """Verify id_token locally against cached Google signing keys."""
+
+        return await verify_id_token(id_token, self._jwks, audience=settings.google.oauth.client_id)
+
+    async def _fetch_jwks(self) -> tuple[dict, int]:
+        response = await self._request("GET", settings.google.oauth.google_jwks_url, context="Signing keys")
 
-            data = await response.json()
+        return response.json(), parse_max_age(response.headers.get("Cache-Control"))
 
-        return UserInfoResponseSchema(**data)
+    async def get_user_info(self, access_token: str) -> UserInfoResponseSchema:
+        return await self._cached(
+            self.cache.make_key(access_token, "GET", settings.google.oauth.google_user_info_url),
+            settings.cache.google_user_info_ttl,
+            partial(self._fetch_user_info, access_token),
+            UserInfoResponseSchema,
+        )
+
+    async def _fetch_user_info(self, access_token: str) -> UserInfoResponseSchema:
+        url = settings.google.oauth.google_user_info_url
+
+        return await self._get_revalidated(
+            self.cache.make_key(access_token, "GET", url),
+            url,
+            UserInfoResponseSchema,
+            context="User info",
+            access_token=access_token,
+            params={"fields": fields_mask(UserInfoResponseSchema)},
+        )
 
     async def get_next_calendar_event(self, access_token: str) -> CalendarListResponseSchema:
+        return await self._cached(
+            # timeMin changes on every call, so the key covers only the stable part of the query
+            self.cache.make_key(
+                access_token, "GET", settings.google.oauth.google_calendar_events_url, {"maxResults": 1}
+            ),
+            settings.cache.google_calendar_ttl,
+            partial(self._fetch_next_calendar_event, access_token),
+            CalendarListResponseSchema,
+        )
+
+    async def _fetch_next_calendar_event(self, access_token: str) -> CalendarListResponseSchema:
         now = datetime.now(timezone.utc).isoformat()
 
         params = {
@@ -67,20 +131,230 @@ class GoogleClient(BaseAPIClient):
             "orderBy": "startTime",
             "singleEvents": "true",
             "timeMin": now,
+            "fields": fields_mask(CalendarListResponseSchema),
         }
 
-        headers = {"Authorization": f"Bearer {access_token}"}
-
-        async with self.session.get(
-            "https://www.googleapis.com/calendar/v3/calendars/primary/events",
+        response = await self._request(
+            "GET",
+            settings.google.oauth.google_calendar_events_url,
+            context="Calendar events",
+            access_token=access_token,
             params=params,
-            headers=headers,
-        ) as response:
+        )
+
+        return response.parse(CalendarListResponseSchema)
+
+    async def get_calendar_events(
+        self,
+        access_token: str,
+        time_min: datetime,
+        time_max: datetime,
+        limit: int,
+    ) -> CalendarListResponseSchema:
+        """Get primary calendar events overlapping the range, ordered by start time."""
+
+        response = await self._request(
+            "GET",
+            settings.google.oauth.google_calendar_events_url,
+            context="Calendar events",
+            access_token=access_token,
+            params={
+                "maxResults": limit,
+                "orderBy": "startTime",
+                "singleEvents": "true",
+                "timeMin": time_min.isoformat(),
+                "timeMax": time_max.isoformat(),
+                "fields": fields_mask(CalendarListResponseSchema),
+            },
+        )
+
+        return response.parse(CalendarListResponseSchema)
+
+    async def iter_events_pages(
+        self,
+        access_token: str,
+        params: Mapping[str, Any],
+        calendar_id: str = "primary",
+        context: str = "Calendar events",
+    ) -> AsyncIterator[CalendarSyncPageSchema]:
+        """Follow nextPageToken, yielding every page as soon as it arrives."""
+
+        params = {**params, "fields": fields_mask(CalendarSyncPageSchema)}
+
+        while True:
+            response = await self._request(
+                "GET",
+                settings.google.oauth.get_calendar_events_url(calendar_id),
+                context=context,
+                access_token=access_token,
+                params=params,
+            )
+            page = response.parse(CalendarSyncPageSchema)
+
+            yield page
+
+            if page.nextPageToken is None:
+                return
+
+            params["pageToken"] = page.nextPageToken
+
+    async def get_calendar_list(self, access_token: str) -> CalendarListEntriesSchema:
+        return await self._cached(
+            self.cache.make_key(access_token, "GET", settings.google.oauth.google_calendar_list_url),
+            settings.cache.google_calendar_list_ttl,
+            partial(self._fetch_calendar_list, access_token),
+            CalendarListEntriesSchema,
+        )
+
+    async def _fetch_calendar_list(self, access_token: str) -> CalendarListEntriesSchema:
+        url = settings.google.oauth.google_calendar_list_url
+
+        return await self._get_revalidated(
+            self.cache.make_key(access_token, "GET", url),
+            url,
+            CalendarListEntriesSchema,
+            context="Calendar list",
+            access_token=access_token,
+            params={"minAccessRole": "reader", "fields": fields_mask(CalendarListEntriesSchema)},
+        )
+
+    async def get_upcoming_events(self, access_token: str, limit: int) -> UpcomingEventsResponseSchema:
+        """Get next events across all calendars shown in the user's calendar UI."""
+
+        return await self._cached(
+            self.cache.make_key(
+                access_token, "GET", settings.google.oauth.google_calendar_list_url, {"upcoming": limit}
+            ),
+            settings.cache.google_calendar_ttl,
+            partial(self._fetch_upcoming_events, access_token, limit),
+            UpcomingEventsResponseSchema,
+        )
+
+    async def _fetch_upcoming_events(self, access_token: str, limit: int) -> UpcomingEventsResponseSchema:
+        calendar_list = await self.get_calendar_list(access_token)
+        calendars = [calendar for calendar in calendar_list.items if calendar.primary or calendar.selected]
+
+        params = {
+            "maxResults": limit,  # Every calendar can hold all of the next `limit` events
+            "orderBy": "startTime",
+            "singleEvents": "true",
+            "timeMin": datetime.now(timezone.utc).isoformat(),
+            "fields": fields_mask(CalendarEventsPageSchema),  # Also sent in batch parts
+        }
+
+        pages: dict[str, CalendarEventsPageSchema | None] = {}
+
+        if settings.google.calendar.use_batch and len(calendars) > 1:
+            pages = await self._fetch_events_batched(access_token, calendars, params)
+
+        # Calendars the batch failed to answer (or all of them without batch) are fetched one by one
+        pages |= await self._fetch_events_concurrently(
+            access_token, [calendar for calendar in calendars if calendar.id not in pages], params
+        )
+
+        return UpcomingEventsResponseSchema(
+            items=merge_upcoming_events(
+                ((calendar, page) for calendar in calendars if (page := pages.get(calendar.id)) is not None), limit
+            ),
+            failed_calendars=[calendar.id for calendar in calendars if pages.get(calendar.id) is None],
+        )
+
+    async def _fetch_events_batched(
+        self,
+        access_token: str,
+        calendars: Sequence[CalendarListEntrySchema],
+        params: Mapping[str, str | int],
+    ) -> dict[str, CalendarEventsPageSchema | None]:
+        """Fetch events of many calendars with multipart batch requests.
+
+        None marks calendars that failed for good, calendars missing from the result should be retried.
+        """
+
+        batch_size = settings.google.calendar.batch_size
+        chunks = [calendars[i : i + batch_size] for i in range(0, len(calendars), batch_size)]
+        results = await asyncio.gather(
+            *(self._fetch_events_batch(access_token, chunk, params) for chunk in chunks), return_exceptions=True
+        )
+        pages = {}
+
+        for result in results:
+            if isinstance(result, GoogleAPIError) and result.status_code == 401:
+                raise result
+            if isinstance(result, dict):
+                pages |= result  # Failed batches are left to the per-calendar fallback
+
+        return pages
+
+    async def _fetch_events_batch(
+        self,
+        access_token: str,
+        calendars: Sequence[CalendarListEntrySchema],
+        params: Mapping[str, str | int],
+    ) -> dict[str, CalendarEventsPageSchema | None]:
+        query = urlencode(params)
+        body, content_type = build_batch_request(
+            {
+                str(index): f"{urlsplit(settings.google.oauth.get_calendar_events_url(calendar.id)).path}?{query}"
+                for index, calendar in enumerate(calendars)
+            }
+        )
+
+        response = await self._request(
+            "POST",
+            settings.google.oauth.google_calendar_batch_url,
+            context="Calendar events batch",
+            access_token=access_token,
+            data=body,
+            headers={"Content-Type": content_type},
+            idempotent=True,  # Batch of GET requests
+        )
+
+        parts = parse_batch_response(response.body, response.headers.get("Content-Type", ""))
+        pages = {}
+
+        for index, calendar in enumerate(calendars):
+            part = parts.get(str(index))
+
+            if part is None or part.status == 429 or part.status >= 500:
+                continue  # Transient, retried individually
+            if part.status == 401:
+                self._handle_error(part.status, "Calendar events")
+
+            # Other errors (calendar deleted or no longer shared) are final
+            pages[calendar.id] = CalendarEventsPageSchema.model_validate_json(part.body) if part.status == 200 else None
+
+        return pages
+
+    async def _fetch_events_concurrently(
+        self,
+        access_token: str,
+        calendars: Sequence[CalendarListEntrySchema],
+        params: Mapping[str, str | int],
+    ) -> dict[str, CalendarEventsPageSchema | None]:
+        """Fetch events calendar by calendar, with at most `fanout_concurrency` requests in flight."""
+
+        semaphore = asyncio.Semaphore(settings.google.calendar.fanout_concurrency)
+
+        async def fetch(calendar: CalendarListEntrySchema) -> CalendarEventsPageSchema | None:
             try:
-                response.raise_for_status()
-            except ClientResponseError as e:
-                self._handle_error(e, "Calendar events")
+                async with semaphore:
+                    response = await self._request(
+                        "GET",
+                        settings.google.oauth.get_calendar_events_url(calendar.id),
+                        context="Calendar events",
+                        access_token=access_token,
+                        params=params,
+                    )
+
+                return response.parse(CalendarEventsPageSchema)
+            except (HTTPException, ValidationError) as e:
+                # One calendar failing (error, timeout, overload, unexpected body) is reported in failed_calendars,
+                # an expired token fails the whole response
+                if isinstance(e, HTTPException) and e.status_code == 401:
+                    raise
+
+                return None
 
-            data = await response.json()
+        pages = await asyncio.gather(*(fetch(calendar) for calendar in calendars))
 
-        return CalendarListResponseSchema(**data)
+        return {calendar.id: page for calendar, page in zip(calendars, pages)}
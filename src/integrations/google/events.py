@@ -0,0 +1,66 @@
+import heapq
+from datetime import date, datetime, time, timezone, tzinfo
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
+from typing import Iterable, Iterator
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from integrations.google.schemas import (
+    CalendarEventResponseSchema,
+    CalendarEventsPageSchema,
+    CalendarListEntrySchema,
+    UpcomingEventSchema,
+)
+
+
+@lru_cache(maxsize=128)
+def get_time_zone(name: str) -> tzinfo:
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return timezone.utc
+
+
+def parse_event_time(value: dict, time_zone: tzinfo) -> datetime:
+    """Event start or end as aware datetime, all-day events use midnight in the calendar time zone."""
+
+    if "dateTime" in value:
+        moment = datetime.fromisoformat(value["dateTime"])
+        return moment if moment.tzinfo is not None else moment.replace(tzinfo=time_zone)
+
+    return datetime.combine(date.fromisoformat(value["date"]), time.min, tzinfo=time_zone)
+
+
+def event_start(event: CalendarEventResponseSchema, time_zone: tzinfo) -> datetime:
+    return parse_event_time(event.start, time_zone)
+
+
+def _timeline(
+    calendar: CalendarListEntrySchema,
+    page: CalendarEventsPageSchema,
+) -> Iterator[tuple[datetime, CalendarListEntrySchema, CalendarEventResponseSchema]]:
+    time_zone = get_time_zone(page.timeZone)
+
+    for event in page.items:
+        yield event_start(event, time_zone), calendar, event
+
+
+def merge_upcoming_events(
+    pages: Iterable[tuple[CalendarListEntrySchema, CalendarEventsPageSchema]],
+    limit: int,
+) -> list[UpcomingEventSchema]:
+    """K-way merge of per-calendar pages already ordered by start time, keeping the first `limit` events."""
+
+    merged = heapq.merge(*(_timeline(calendar, page) for calendar, page in pages), key=itemgetter(0))
+
+    return [
+        UpcomingEventSchema(
+            calendar_id=calendar.id,
+            calendar_summary=calendar.summary,
+            summary=event.summary,
+            start=event.start,
+            end=event.end,
+        )
+        for _, calendar, event in islice(merged, limit)
+    ]
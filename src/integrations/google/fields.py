@@ -0,0 +1,38 @@
+import types
+import typing
+from functools import cache
+from typing import Any
+
+from pydantic import BaseModel
+
+
+def _nested_model(annotation: Any) -> type[BaseModel] | None:
+    """Model inside a field annotation, unwrapping Optional and list."""
+
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+
+    if typing.get_origin(annotation) in (list, typing.Union, types.UnionType):
+        for argument in typing.get_args(annotation):
+            if (model := _nested_model(argument)) is not None:
+                return model
+
+    return None
+
+
+@cache
+def fields_mask(schema: type[BaseModel]) -> str:
+    """Google partial response `fields` parameter selecting exactly the fields schema parses.
+
+    Nested models select their own fields (`items(summary,start,end)`), other fields (dicts included)
+    are taken whole. Derived from the schema, so a field added to it is requested too.
+    """
+
+    selectors = []
+
+    for name, field in schema.model_fields.items():
+        name = field.alias or name
+        model = _nested_model(field.annotation)
+        selectors.append(f"{name}({fields_mask(model)})" if model is not None else name)
+
+    return ",".join(selectors)
@@ -0,0 +1,130 @@
+import asyncio
+import base64
+import dataclasses
+import hashlib
+import hmac
+import json
+import re
+import time
+from typing import Awaitable, Callable
+
+from integrations.google.exceptions import GoogleAPIError
+from integrations.google.schemas import GoogleIdTokenClaimsSchema
+
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+CLOCK_SKEW_LEEWAY = 60  # In seconds
+
+JWKS_DEFAULT_MAX_AGE = 3600  # Used when Google response has no Cache-Control max-age
+JWKS_MIN_REFRESH_INTERVAL = 60  # Unknown kid forces refresh at most once per interval
+
+# ASN.1 DigestInfo prefix for SHA-256 (RFC 8017, section 9.2)
+SHA256_DIGEST_INFO_PREFIX = bytes.fromhex("3031300d060960864801650304020105000420")
+
+
+def _b64url_decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def parse_max_age(cache_control: str | None) -> int:
+    match = re.search(r"max-age=(\d+)", cache_control or "")
+
+    return int(match.group(1)) if match else JWKS_DEFAULT_MAX_AGE
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class RSAPublicKey:
+    n: int
+    e: int
+
+    @classmethod
+    def from_jwk(cls, jwk: dict) -> "RSAPublicKey":
+        return cls(
+            n=int.from_bytes(_b64url_decode(jwk["n"]), "big"),
+            e=int.from_bytes(_b64url_decode(jwk["e"]), "big"),
+        )
+
+    def verify_rs256(self, message: bytes, signature: bytes) -> bool:
+        """Verify RSASSA-PKCS1-v1_5 SHA-256 signature."""
+
+        size = (self.n.bit_length() + 7) // 8
+
+        if len(signature) != size:
+            return False
+
+        encoded = pow(int.from_bytes(signature, "big"), self.e, self.n).to_bytes(size, "big")
+        digest_info = SHA256_DIGEST_INFO_PREFIX + hashlib.sha256(message).digest()
+        expected = b"\x00\x01" + b"\xff" * (size - len(digest_info) - 3) + b"\x00" + digest_info
+
+        return hmac.compare_digest(encoded, expected)
+
+
+class JWKSCache:
+    """Google signing keys by kid, refreshed per Cache-Control and on key rotation."""
+
+    def __init__(self, fetch: Callable[[], Awaitable[tuple[dict, int]]]) -> None:
+        self._fetch = fetch
+        self._keys: dict[str, RSAPublicKey] = {}
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        self._refreshing: asyncio.Task | None = None
+
+    async def get_key(self, kid: str) -> RSAPublicKey | None:
+        now = time.monotonic()
+
+        if now >= self._expires_at or (
+            kid not in self._keys and now - self._fetched_at >= JWKS_MIN_REFRESH_INTERVAL
+        ):
+            await self._refresh()
+
+        return self._keys.get(kid)
+
+    async def _refresh(self) -> None:
+        # Concurrent verifications share one JWKS download
+        if self._refreshing is None:
+            self._refreshing = asyncio.create_task(self._load())
+            self._refreshing.add_done_callback(lambda _: setattr(self, "_refreshing", None))
+
+        await asyncio.shield(self._refreshing)
+
+    async def _load(self) -> None:
+        jwks, max_age = await self._fetch()
+        now = time.monotonic()
+
+        self._keys = {
+            jwk["kid"]: RSAPublicKey.from_jwk(jwk)
+            for jwk in jwks.get("keys", [])
+            if jwk.get("kty") == "RSA"
+        }
+        self._fetched_at = now
+        self._expires_at = now + max_age
+
+
+async def verify_id_token(id_token: str, keys: JWKSCache, audience: str) -> GoogleIdTokenClaimsSchema:
+    """Verify Google id_token signature and claims without calling Google."""
+
+    try:
+        encoded_header, encoded_claims, encoded_signature = id_token.split(".")
+        header = json.loads(_b64url_decode(encoded_header))
+        claims = GoogleIdTokenClaimsSchema.model_validate_json(_b64url_decode(encoded_claims))
+        signature = _b64url_decode(encoded_signature)
+    except ValueError:
+        raise GoogleAPIError(401, "Invalid ID token.")
+
+    # Valid JSON is not necessarily an object, claims that are not one fail schema validation above
+    if not isinstance(header, dict) or header.get("alg") != "RS256" or not isinstance(header.get("kid"), str):
+        raise GoogleAPIError(401, "Invalid ID token.")
+
+    key = await keys.get_key(header["kid"])
+
+    if key is None or not key.verify_rs256(f"{encoded_header}.{encoded_claims}".encode(), signature):
+        raise GoogleAPIError(401, "Invalid ID token.")
+
+    now = time.time()
+
+    if claims.iss not in GOOGLE_ISSUERS or claims.aud != audience:
+        raise GoogleAPIError(401, "Invalid ID token.")
+
+    if claims.exp < now - CLOCK_SKEW_LEEWAY or claims.iat > now + CLOCK_SKEW_LEEWAY:
+        raise GoogleAPIError(401, "ID token expired.")
+
+    return claims
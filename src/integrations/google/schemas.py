@@ -13,6 +13,13 @@ class GoogleTokenRequestSchema(BaseModel):
     grant_type: Literal["authorization_code"] = "authorization_code"
 
 
+class GoogleTokenRefreshRequestSchema(BaseModel):
+    refresh_token: str
+    client_id: str = settings.google.oauth.client_id
+    client_secret: str = settings.google.oauth.client_secret.get_secret_value()
+    grant_type: Literal["refresh_token"] = "refresh_token"
+
+
 class GoogleTokenResponseSchema(BaseModel):
     access_token: str
     expires_in: int
@@ -23,16 +30,76 @@ class GoogleTokenResponseSchema(BaseModel):
     refresh_token_expires_in: int
 
 
+class GoogleTokenRefreshResponseSchema(BaseModel):
+    access_token: str
+    expires_in: int
+    scope: str
+    token_type: str
+    id_token: str | None = None
+    refresh_token: str | None = None  # Only returned when Google rotates the refresh token
+
+
+class GoogleIdTokenClaimsSchema(BaseModel):
+    iss: str
+    aud: str
+    sub: str
+    exp: int
+    iat: int
+    email: str | None = None
+    email_verified: bool | None = None
+
+
 class UserInfoResponseSchema(BaseModel):
     id: str
     email: str
 
 
 class CalendarEventResponseSchema(BaseModel):
-    summary: str
+    summary: str | None = None  # Missing for events the user can see only as busy
     start: dict
     end: dict
 
 
 class CalendarListResponseSchema(BaseModel):
     items: list[CalendarEventResponseSchema]
+
+
+class CalendarListEntrySchema(BaseModel):
+    id: str
+    summary: str | None = None
+    primary: bool = False
+    selected: bool = False  # Shown in the user's calendar UI
+
+
+class CalendarListEntriesSchema(BaseModel):
+    items: list[CalendarListEntrySchema] = []
+
+
+class CalendarEventsPageSchema(BaseModel):
+    timeZone: str = "UTC"
+    items: list[CalendarEventResponseSchema] = []
+
+
+class UpcomingEventSchema(CalendarEventResponseSchema):
+    calendar_id: str
+    calendar_summary: str | None = None
+
+
+class UpcomingEventsResponseSchema(BaseModel):
+    items: list[UpcomingEventSchema]
+    failed_calendars: list[str] = []  # Calendars that could not be read, results may be incomplete
+
+
+class CalendarSyncEventSchema(BaseModel):
+    id: str
+    status: str = "confirmed"
+    summary: str | None = None
+    start: dict = {}  # Cancelled events in incremental sync carry only id and status
+    end: dict = {}
+
+
+class CalendarSyncPageSchema(BaseModel):
+    timeZone: str = "UTC"
+    items: list[CalendarSyncEventSchema] = []
+    nextPageToken: str | None = None
+    nextSyncToken: str | None = None  # Only on the last page
@@ -0,0 +1,167 @@
+import bisect
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Iterable
+
+from fastapi import HTTPException
+
+from core.settings import settings
+from integrations.google.client import GoogleClient
+from integrations.google.events import get_time_zone, parse_event_time
+from integrations.google.exceptions import GoogleAPIError
+from integrations.google.schemas import CalendarEventResponseSchema, CalendarSyncEventSchema
+from integrations.singleflight import SingleFlight
+
+
+class EventIndex:
+    """Events of one calendar ordered by start time, kept current by sync token deltas.
+
+    Events are stored once by id, the ordered list holds only (start, id) pairs for binary search.
+    """
+
+    def __init__(self) -> None:
+        self._order: list[tuple[float, str]] = []
+        self._events: dict[str, tuple[float, float, CalendarEventResponseSchema]] = {}
+        self._max_duration = 0.0  # Longest event seen, bounds the search for events already in progress
+        self.sync_token: str | None = None
+        self.synced_at = 0.0  # Monotonic time of the last successful sync
+        self.retained_from = 0.0  # Unix time since which events are complete, earlier ones were pruned
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def _remove(self, event_id: str) -> None:
+        entry = self._events.pop(event_id, None)
+
+        if entry is not None:
+            index = bisect.bisect_left(self._order, (entry[0], event_id))
+            del self._order[index]
+
+    def apply(self, events: Iterable[CalendarSyncEventSchema], time_zone: str) -> None:
+        """Upsert changed events and drop cancelled ones."""
+
+        zone = get_time_zone(time_zone)
+
+        for event in events:
+            self._remove(event.id)
+
+            if event.status == "cancelled" or not event.start or not event.end:
+                continue
+
+            start = parse_event_time(event.start, zone).timestamp()
+            end = parse_event_time(event.end, zone).timestamp()
+            self._events[event.id] = (
+                start,
+                end,
+                CalendarEventResponseSchema(summary=event.summary, start=event.start, end=event.end),
+            )
+            bisect.insort(self._order, (start, event.id))
+            self._max_duration = max(self._max_duration, end - start)
+
+    def prune(self, before: float) -> None:
+        """Drop events that ended before the given unix time."""
+
+        stale = [event_id for event_id, (_, end, _) in self._events.items() if end < before]
+
+        for event_id in stale:
+            self._remove(event_id)
+
+        self.retained_from = max(self.retained_from, before)
+
+    def between(self, time_min: float, time_max: float, limit: int) -> list[CalendarEventResponseSchema]:
+        """Events overlapping [time_min, time_max), ordered by start time like Google with orderBy=startTime."""
+
+        result = []
+        index = bisect.bisect_left(self._order, (time_min - self._max_duration,))
+
+        while index < len(self._order) and len(result) < limit:
+            start, event_id = self._order[index]
+
+            if start >= time_max:
+                break
+
+            _, end, event = self._events[event_id]
+
+            if end > time_min:
+                result.append(event)
+
+            index += 1
+
+        return result
+
+
+class CalendarSync:
+    """Per-user indexes of the primary calendar, synced with Google incrementally.
+
+    The first sync downloads all events, later ones fetch only changes since the stored sync token.
+    When Google expires the token (410 Gone) the index is rebuilt with a full sync.
+    """
+
+    def __init__(self, client: GoogleClient) -> None:
+        self._client = client
+        self._indexes: OrderedDict[str, EventIndex] = OrderedDict()
+        self._syncs = SingleFlight()
+
+    def __len__(self) -> int:
+        return len(self._indexes)
+
+    async def get_index(self, user_key: str, access_token: str) -> EventIndex:
+        """Get user's index, syncing it first when it is older than the sync interval."""
+
+        index = self._indexes.get(user_key)
+
+        if index is not None:
+            self._indexes.move_to_end(user_key)
+
+            if time.monotonic() - index.synced_at < settings.google.calendar.sync_interval:
+                return index
+
+        try:
+            return await self._syncs.do(user_key, partial(self._sync, user_key, access_token))
+        except HTTPException as e:
+            if index is None or e.status_code < 500:
+                raise
+
+            return index  # Slightly stale events beat an error while Google is unavailable
+
+    async def _sync(self, user_key: str, access_token: str) -> EventIndex:
+        index = self._indexes.get(user_key)
+
+        if index is not None:
+            try:
+                await self._pull(index, access_token)
+            except GoogleAPIError as e:
+                if e.status_code != 410:
+                    raise
+
+                index = None  # Sync token expired
+
+        if index is None:
+            # Full sync builds a new index, so readers never see a half-filled one
+            index = EventIndex()
+            await self._pull(index, access_token)
+
+        index.synced_at = time.monotonic()
+
+        self._indexes[user_key] = index
+        self._indexes.move_to_end(user_key)
+
+        while len(self._indexes) > settings.google.calendar.sync_max_users:
+            self._indexes.popitem(last=False)
+
+        return index
+
+    async def _pull(self, index: EventIndex, access_token: str) -> None:
+        params = {"singleEvents": "true", "maxResults": settings.google.calendar.sync_page_size}
+
+        if index.sync_token is not None:
+            params["syncToken"] = index.sync_token
+
+        async for page in self._client.iter_events_pages(access_token, params, context="Calendar sync"):
+            index.apply(page.items, page.timeZone)
+            # Pruned page by page, a full sync of a long history never holds all of it
+            index.prune(time.time() - settings.google.calendar.sync_retention)
+
+            if page.nextSyncToken is not None:
+                index.sync_token = page.nextSyncToken
@@ -0,0 +1,222 @@
+import asyncio
+import contextlib
+import contextvars
+import random
+import time
+from enum import StrEnum
+from typing import AsyncIterator, Iterator
+
+from core.settings import settings
+from core.timing import span
+
+_request_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar("request_deadline", default=None)
+
+
+@contextlib.contextmanager
+def request_deadline(seconds: float, renew: bool = False) -> Iterator[None]:
+    """Limit upstream calls made in this context to finish within seconds.
+
+    Nested scopes only shrink the deadline, unless renew replaces it (each step of a long stream gets its own).
+    """
+
+    deadline = time.monotonic() + seconds
+    current = _request_deadline.get()
+
+    token = _request_deadline.set(deadline if current is None or renew else min(current, deadline))
+
+    try:
+        yield
+    finally:
+        _request_deadline.reset(token)
+
+
+def deadline_remaining() -> float | None:
+    """Seconds left until current request deadline, None if there is no deadline."""
+
+    deadline = _request_deadline.get()
+
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter."""
+
+    config = settings.resilience
+
+    return random.uniform(0, min(config.backoff_max, config.backoff_base * 2**attempt))
+
+
+class CircuitState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Per-upstream circuit breaker driven by consecutive failures."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._failure_threshold = settings.resilience.breaker_failure_threshold
+        self._recovery_timeout = settings.resilience.breaker_recovery_timeout
+
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state is CircuitState.OPEN and time.monotonic() - self._opened_at >= self._recovery_timeout:
+            self._state = CircuitState.HALF_OPEN
+            self._probe_in_flight = False
+
+        return self._state
+
+    def retry_after(self) -> int:
+        """Seconds until breaker lets a probe request through."""
+
+        return max(1, round(self._opened_at + self._recovery_timeout - time.monotonic()))
+
+    def allow_request(self) -> bool:
+        state = self.state
+
+        if state is CircuitState.CLOSED:
+            return True
+
+        if state is CircuitState.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True  # Single probe decides whether upstream recovered
+            return True
+
+        return False
+
+    def record_success(self) -> None:
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Request let through ended without an outcome (cancelled), so the next one may probe instead."""
+
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+
+        if self._state is CircuitState.HALF_OPEN or self._failures >= self._failure_threshold:
+            self._state = CircuitState.OPEN
+            self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def snapshot(self) -> dict:
+        return {"upstream": self.name, "state": self.state, "consecutive_failures": self._failures}
+
+
+class RetryBudget:
+    """Token bucket allowing retries for a fraction of requests, so retries can't amplify an outage."""
+
+    def __init__(self) -> None:
+        config = settings.resilience
+
+        self._ratio = config.retry_budget_ratio
+        self._min_per_second = config.retry_budget_min_per_second
+        self._max_tokens = config.retry_budget_max_tokens
+
+        self._tokens = self._max_tokens
+        self._updated_at = time.monotonic()
+
+    def _refill(self, amount: float) -> None:
+        now = time.monotonic()
+        amount += (now - self._updated_at) * self._min_per_second
+        self._tokens = min(self._max_tokens, self._tokens + amount)
+        self._updated_at = now
+
+    def record_request(self) -> None:
+        self._refill(self._ratio)
+
+    def try_spend(self) -> bool:
+        self._refill(0)
+
+        if self._tokens < 1:
+            return False
+
+        self._tokens -= 1
+
+        return True
+
+    @property
+    def available(self) -> float:
+        self._refill(0)
+
+        return self._tokens
+
+
+retry_budget = RetryBudget()
+
+
+class OverloadedError(Exception):
+    """Bulkhead rejected the call, reason is queue_full or wait_timeout."""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
+class Bulkhead:
+    """Per-upstream cap on concurrent calls with a bounded wait queue.
+
+    A call that would queue behind too many others, or wait longer than allowed, is shed right away,
+    so overload turns into fast 503s instead of growing latency for everyone.
+    """
+
+    def __init__(self, name: str) -> None:
+        config = settings.resilience
+
+        self.name = name
+        self._max_concurrency = config.upstream_max_concurrency
+        self._max_queue = config.upstream_max_queue
+        self._max_wait = config.upstream_max_wait
+        self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        self._active = 0
+        self._waiting = 0
+
+    @contextlib.asynccontextmanager
+    async def acquire(self) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the call."""
+
+        if self._semaphore.locked():
+            if self._waiting >= self._max_queue:
+                raise OverloadedError("queue_full")
+
+            # Waiting past the request deadline is pointless, the call would time out anyway
+            remaining = deadline_remaining()
+            wait = self._max_wait if remaining is None else max(0.0, min(self._max_wait, remaining))
+
+            self._waiting += 1
+
+            try:
+                with span("upstream_queue"):
+                    async with asyncio.timeout(wait):
+                        await self._semaphore.acquire()
+            except TimeoutError:
+                raise OverloadedError("wait_timeout") from None
+            finally:
+                self._waiting -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self._active += 1
+
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._semaphore.release()
+
+    def snapshot(self) -> dict:
+        return {
+            "name": self.name,
+            "active": self._active,
+            "waiting": self._waiting,
+            "max_concurrency": self._max_concurrency,
+        }
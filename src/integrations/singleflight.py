@@ -0,0 +1,46 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one shared upstream call."""
+
+    def __init__(self) -> None:
+        self._tasks: dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await the in-flight call for key, starting it if there is none.
+
+        The shared call runs in its own task and every caller awaits it through
+        ``asyncio.shield``, so a cancelled (disconnected) caller never cancels the
+        call for the others. Exceptions are propagated to all callers.
+        """
+
+        task = self._tasks.get(key)
+
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+
+        return await asyncio.shield(task)
+
+    def running(self, key: Hashable) -> Awaitable | None:
+        """In-flight call for key to join without starting a new one, None if there is none."""
+
+        task = self._tasks.get(key)
+
+        return None if task is None else asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+
+        # Mark exception as retrieved in case every caller has been cancelled
+        if not task.cancelled():
+            task.exception()
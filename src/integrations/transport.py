@@ -0,0 +1,283 @@
+import abc
+import dataclasses
+import json
+from typing import Any, AsyncIterator, Mapping, TypeVar
+
+import aiohttp
+import httpx
+from pydantic import BaseModel
+
+from core.settings import settings
+from core.timing import span
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class UpstreamResponse:
+    status: int
+    headers: Mapping[str, str]  # Case-insensitive
+    body: bytes
+    http_version: str = "HTTP/1.1"
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+    def parse(self, schema: type[ModelT]) -> ModelT:
+        with span("parse"):
+            return schema.model_validate_json(self.body)
+
+
+class TransportError(Exception):
+    """Connection level failure (connect, reset, protocol error), upstream may not have seen the request."""
+
+
+class ResponseTooLargeError(Exception):
+    """Response body exceeds the limit of the request, reading stopped at the limit."""
+
+    def __init__(self, max_body: int) -> None:
+        super().__init__(f"Response body exceeds {max_body} bytes")
+        self.max_body = max_body
+
+
+def check_content_length(headers: Mapping[str, str], max_body: int | None) -> None:
+    """Reject a body declared too large before reading it."""
+
+    content_length = headers.get("Content-Length", "")
+
+    if max_body is not None and content_length.isdigit() and int(content_length) > max_body:
+        raise ResponseTooLargeError(max_body)
+
+
+async def read_limited(chunks: AsyncIterator[bytes], max_body: int) -> bytes:
+    """Read a streamed body, aborting as soon as it grows past max_body."""
+
+    body = bytearray()
+
+    async for chunk in chunks:
+        body += chunk
+
+        if len(body) > max_body:
+            raise ResponseTooLargeError(max_body)
+
+    return bytes(body)
+
+
+class Transport(abc.ABC):
+    """HTTP client of an API client, its connections live as long as the worker.
+
+    Timeouts are raised as `TimeoutError` and other connection failures as `TransportError`,
+    so retries and circuit breakers don't depend on the HTTP library.
+    """
+
+    name: str
+
+    @abc.abstractmethod
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Mapping[str, str] | None = None,
+        params: Mapping[str, Any] | None = None,
+        data: Mapping[str, Any] | bytes | None = None,
+        max_body: int | None = None,
+    ) -> UpstreamResponse:
+        """Send request and read the whole response body, at most max_body bytes (ResponseTooLargeError)."""
+
+    @abc.abstractmethod
+    async def open_connection(self, origin: str, timeout: float) -> None:
+        """Open a pooled connection to origin ahead of requests."""
+
+    @abc.abstractmethod
+    def pool_stats(self) -> dict[str, int]:
+        """Connections by state: acquired (busy), idle, and the pool limit."""
+
+    @abc.abstractmethod
+    async def close(self) -> None: ...
+
+
+class AiohttpTransport(Transport):
+    """HTTP/1.1 with a connection per concurrent request, up to the per-host limit."""
+
+    name = "aiohttp"
+
+    def __init__(self) -> None:
+        self._session: aiohttp.ClientSession | None = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            config = settings.http_client
+
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=config.pool_limit,
+                    limit_per_host=config.pool_limit_per_host,
+                    keepalive_timeout=config.keepalive_timeout,
+                    ttl_dns_cache=config.dns_cache_ttl,
+                ),
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=config.connect_timeout,
+                    sock_read=config.read_timeout,
+                ),
+            )
+
+        return self._session
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Mapping[str, str] | None = None,
+        params: Mapping[str, Any] | None = None,
+        data: Mapping[str, Any] | bytes | None = None,
+        max_body: int | None = None,
+    ) -> UpstreamResponse:
+        try:
+            async with self.session.request(method, url, headers=headers, params=params, data=data) as response:
+                if max_body is None:
+                    body = await response.read()
+                else:
+                    check_content_length(response.headers, max_body)
+                    body = await read_limited(response.content.iter_any(), max_body)
+
+                return UpstreamResponse(
+                    status=response.status,
+                    headers=response.headers,
+                    body=body,
+                    http_version=f"HTTP/{response.version.major}.{response.version.minor}",
+                )
+        except TimeoutError:
+            raise
+        except aiohttp.ClientError as e:
+            raise TransportError(str(e)) from e
+
+    async def open_connection(self, origin: str, timeout: float) -> None:
+        async with self.session.head(origin, allow_redirects=False, timeout=aiohttp.ClientTimeout(total=timeout)):
+            pass
+
+    def pool_stats(self) -> dict[str, int]:
+        if self._session is None:
+            return {"acquired": 0, "idle": 0, "limit": settings.http_client.pool_limit}
+
+        connector = self._session.connector
+
+        return {
+            "acquired": len(getattr(connector, "_acquired", ())),
+            "idle": sum(len(conns) for conns in getattr(connector, "_conns", {}).values()),
+            "limit": connector.limit,
+        }
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class HttpxTransport(Transport):
+    """httpx with HTTP/2 negotiated over TLS, concurrent requests to a host share a few multiplexed connections.
+
+    Prior knowledge skips negotiation and speaks HTTP/2 over plain TCP, for local stand-ins of upstream APIs.
+    """
+
+    name = "httpx"
+
+    def __init__(self, http2: bool | None = None, prior_knowledge: bool = False) -> None:
+        self.http2 = settings.http_client.http2 if http2 is None else http2
+        self.prior_knowledge = prior_knowledge and self.http2
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            config = settings.http_client
+
+            self._client = httpx.AsyncClient(
+                http1=not self.prior_knowledge,
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=config.pool_limit,
+                    max_keepalive_connections=config.pool_limit,
+                    keepalive_expiry=config.keepalive_timeout,
+                ),
+                timeout=httpx.Timeout(
+                    connect=config.connect_timeout,
+                    read=config.read_timeout,
+                    write=config.read_timeout,
+                    pool=config.connect_timeout,
+                ),
+            )
+
+        return self._client
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Mapping[str, str] | None = None,
+        params: Mapping[str, Any] | None = None,
+        data: Mapping[str, Any] | bytes | None = None,
+        max_body: int | None = None,
+    ) -> UpstreamResponse:
+        request = self.client.build_request(
+            method,
+            url,
+            headers=headers,
+            params=params,
+            content=data if isinstance(data, bytes) else None,
+            data=data if not isinstance(data, bytes) else None,
+        )
+
+        try:
+            if max_body is None:
+                response = await self.client.send(request)
+                body = response.content
+            else:
+                response = await self.client.send(request, stream=True)
+
+                try:
+                    check_content_length(response.headers, max_body)
+                    body = await read_limited(response.aiter_bytes(), max_body)
+                finally:
+                    await response.aclose()
+        except httpx.TimeoutException as e:
+            raise TimeoutError() from e
+        except httpx.TransportError as e:
+            raise TransportError(str(e)) from e
+
+        return UpstreamResponse(
+            status=response.status_code,
+            headers=response.headers,
+            body=body,
+            http_version=response.http_version,
+        )
+
+    async def open_connection(self, origin: str, timeout: float) -> None:
+        await self.client.head(origin, timeout=timeout)
+
+    def pool_stats(self) -> dict[str, int]:
+        limit = settings.http_client.pool_limit
+
+        if self._client is None:
+            return {"acquired": 0, "idle": 0, "limit": limit}
+
+        # An HTTP/2 connection counts as acquired while it has open streams
+        connections = getattr(getattr(self._client._transport, "_pool", None), "connections", ())  # noqa
+        idle = sum(1 for connection in connections if connection.is_idle())
+
+        return {"acquired": len(connections) - idle, "idle": idle, "limit": limit}
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def create_transport() -> Transport:
+    if settings.http_client.transport == "httpx":
+        return HttpxTransport()
+
+    return AiohttpTransport()
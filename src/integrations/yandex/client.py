@@ -1,27 +1,37 @@
-from aiohttp import ClientResponseError
+from functools import partial
+from typing import NoReturn
 
 from core.settings import settings
 from integrations.base_api_client import BaseAPIClient
+from integrations.transport import ResponseTooLargeError
 from integrations.yandex.exceptions import YandexAPIError
 from integrations.yandex.schemas import (
     YandexTokenRequestSchema,
+    YandexTokenRefreshRequestSchema,
     YandexTokenResponseSchema,
     YandexUserInfoSchema,
+    YandexAvatarSize,
 )
 
 
 class YandexClient(BaseAPIClient):
+    provider = "yandex"
+    warmup_urls = (
+        settings.yandex.oauth.yandex_token_url,
+        settings.yandex.oauth.yandex_user_info_url,
+    )
+
     @staticmethod
-    def _handle_error(e: ClientResponseError, context: str) -> None:
+    def _handle_error(status: int, context: str) -> NoReturn:
         """Handle API errors with sanitized messages."""
 
-        if e.status == 401:
+        if status == 401:
             raise YandexAPIError(401, "Authentication expired. Please login again.")
-        elif e.status == 403:
+        elif status == 403:
             raise YandexAPIError(403, "Access denied. Check permissions.")
-        elif e.status == 404:
+        elif status == 404:
             raise YandexAPIError(404, f"{context} not found.")
-        elif e.status >= 500:
+        elif status >= 500:
             raise YandexAPIError(502, "Yandex service temporarily unavailable.")
         else:
             raise YandexAPIError(400, f"Failed to {context.lower()}.")
@@ -29,33 +39,64 @@ class YandexClient(BaseAPIClient):
     async def get_auth_tokens(self, code: str) -> YandexTokenResponseSchema:
         """Exchange authorization code for access token."""
 
-        async with self.session.post(
-            url=settings.yandex.oauth.yandex_token_url,
+        response = await self._request(
+            "POST",
+            settings.yandex.oauth.yandex_token_url,
+            context="Exchange authorization code",
             data=YandexTokenRequestSchema(code=code).model_dump(),
-        ) as response:
-            try:
-                response.raise_for_status()
-            except ClientResponseError as e:
-                self._handle_error(e, "Exchange authorization code")
+        )
+
+        return response.parse(YandexTokenResponseSchema)
 
-            data = await response.json()
+    async def refresh_tokens(self, refresh_token: str) -> YandexTokenResponseSchema:
+        """Exchange refresh token for a new access token."""
 
-        return YandexTokenResponseSchema(**data)
+        response = await self._request(
+            "POST",
+            settings.yandex.oauth.yandex_token_url,
+            context="Refresh access token",
+            data=YandexTokenRefreshRequestSchema(refresh_token=refresh_token).model_dump(),
+        )
+
+        return response.parse(YandexTokenResponseSchema)
 
     async def get_user_info(self, access_token: str) -> YandexUserInfoSchema:
         """Get user information from Yandex API."""
 
-        headers = {"Authorization": f"Bearer {access_token}"}
+        return await self._cached(
+            self.cache.make_key(access_token, "GET", settings.yandex.oauth.yandex_user_info_url),
+            settings.cache.yandex_user_info_ttl,
+            partial(self._fetch_user_info, access_token),
+            YandexUserInfoSchema,
+        )
+
+    async def _fetch_user_info(self, access_token: str) -> YandexUserInfoSchema:
+        url = settings.yandex.oauth.yandex_user_info_url
+
+        return await self._get_revalidated(
+            self.cache.make_key(access_token, "GET", url),
+            url,
+            YandexUserInfoSchema,
+            context="User info",
+            access_token=access_token,
+        )
+
+    async def get_avatar(self, avatar_id: str, size: YandexAvatarSize) -> tuple[bytes, str]:
+        """Get avatar image and its media type, public (no access token)."""
+
+        try:
+            response = await self._request(
+                "GET",
+                f"{settings.yandex.oauth.yandex_avatar_url}/{avatar_id}/{size}",
+                context="Avatar",
+                max_body=settings.yandex.avatar.max_file_size,  # Streamed, an oversized body is never buffered
+            )
+        except ResponseTooLargeError as e:
+            raise YandexAPIError(502, "Yandex returned an invalid avatar.") from e
 
-        async with self.session.get(
-            "https://login.yandex.ru/info",
-            headers=headers,
-        ) as response:
-            try:
-                response.raise_for_status()
-            except ClientResponseError as e:
-                self._handle_error(e, "User info")
+        media_type = response.headers.get("Content-Type", "").partition(";")[0].strip()
 
-            data = await response.json()
+        if not media_type.startswith("image/"):
+            raise YandexAPIError(502, "Yandex returned an invalid avatar.")
 
-        return YandexUserInfoSchema(**data)
+        return response.body, media_type
@@ -1,3 +1,4 @@
+from enum import StrEnum
 from typing import Literal
 
 from pydantic import BaseModel
@@ -12,6 +13,13 @@ class YandexTokenRequestSchema(BaseModel):
     grant_type: Literal["authorization_code"] = "authorization_code"
 
 
+class YandexTokenRefreshRequestSchema(BaseModel):
+    refresh_token: str
+    client_id: str = settings.yandex.oauth.client_id
+    client_secret: str = settings.yandex.oauth.client_secret.get_secret_value()
+    grant_type: Literal["refresh_token"] = "refresh_token"
+
+
 class YandexTokenResponseSchema(BaseModel):
     access_token: str
     expires_in: int
@@ -32,3 +40,18 @@ class YandexUserInfoSchema(BaseModel):
     emails: list[str] = []
     default_avatar_id: str | None = None
     is_avatar_empty: bool | None = None
+
+
+class YandexAvatarSize(StrEnum):
+    """Avatar sizes served by Yandex, square in pixels (retina are doubled)."""
+
+    ISLANDS_SMALL = "islands-small"  # 28
+    ISLANDS_34 = "islands-34"
+    ISLANDS_MIDDLE = "islands-middle"  # 42
+    ISLANDS_50 = "islands-50"
+    ISLANDS_RETINA_SMALL = "islands-retina-small"  # 56
+    ISLANDS_68 = "islands-68"
+    ISLANDS_75 = "islands-75"
+    ISLANDS_RETINA_MIDDLE = "islands-retina-middle"  # 84
+    ISLANDS_RETINA_50 = "islands-retina-50"  # 100
+    ISLANDS_200 = "islands-200"
@@ -1,32 +1,88 @@
+import asyncio
+import os
+import sys
 from contextlib import asynccontextmanager
 from http import HTTPMethod
 from typing import AsyncGenerator
 
 import uvicorn
-from fastapi import FastAPI, Request, Response
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, Request
 from starlette.middleware.cors import CORSMiddleware
-from starlette.responses import HTMLResponse
+from starlette.responses import HTMLResponse, PlainTextResponse, Response
 
 from api.router import router as api_router
+from core.assets import StaticAssets
+from core.compression import brotli
+from core.constants import CACHE_CONTROL_REVALIDATE
+from core.log import log_event, log_writer
+from core.metrics import registry
 from core.settings import settings, ROOT_DIR
-from core.templates import templates
+from core.templates import render_page
+from integrations.base_api_client import register_client_metrics
 from integrations.google.client import GoogleClient
+from integrations.google.sync import CalendarSync
 from integrations.yandex.client import YandexClient
+from middlewares.access_log import AccessLogMiddleware
+from middlewares.compression import CompressionMiddleware
+from middlewares.conditional import ConditionalGetMiddleware
+from middlewares.deadline import RequestDeadlineMiddleware
+from middlewares.metrics import MetricsMiddleware
+from middlewares.rate_limit import RateLimitMiddleware
+from middlewares.security_headers import SecurityHeadersMiddleware
+from middlewares.server_timing import ServerTimingMiddleware
+from sessions.exchanges import CodeExchanges
+from sessions.manager import SessionManager
+from sessions.refresher import TokenRefreshScheduler
+from sessions.schemas import OAuthProvider
+from sessions.store import KeyValueSessionStore
+from storage.factory import create_storage_backend
+from storage.files import FileCache
 
 
 @asynccontextmanager
 async def lifespan(app_: FastAPI) -> AsyncGenerator[None, None]:
-    app_.state.google_client = GoogleClient()  # noqa
-    app_.state.yandex_client = YandexClient()  # noqa
+    log_writer.start()
+    if brotli is None:
+        log_event("brotli_disabled", always=True, detail="brotli package is not installed, gzip only")
+    static_assets.load()
+    app_.state.index_page = render_page("index.html", asset_url=static_assets.url)  # noqa
+    app_.state.storage = storage = create_storage_backend()  # noqa
+    app_.state.code_exchanges = CodeExchanges(storage)  # noqa
+    app_.state.avatar_cache = FileCache(  # noqa
+        settings.yandex.avatar.cache_dir,
+        settings.yandex.avatar.cache_max_bytes,
+    )
+    shared_cache = storage if storage.shared else None  # Process-local backend would only duplicate L1 cache
+    app_.state.google_client = GoogleClient(shared_cache)  # noqa
+    app_.state.yandex_client = YandexClient(shared_cache)  # noqa
+    register_client_metrics(app_.state.google_client, app_.state.yandex_client)  # noqa
+    app_.state.calendar_sync = CalendarSync(app_.state.google_client)  # noqa
+    token_refresh_scheduler = TokenRefreshScheduler() if settings.token_refresh.enabled else None
+    app_.state.session_manager = SessionManager(  # noqa
+        store=KeyValueSessionStore(storage),
+        clients={
+            OAuthProvider.GOOGLE: app_.state.google_client,  # noqa
+            OAuthProvider.YANDEX: app_.state.yandex_client,  # noqa
+        },
+        scheduler=token_refresh_scheduler,
+    )
+    if token_refresh_scheduler is not None:
+        token_refresh_scheduler.start(app_.state.session_manager.refresh_by_id)  # noqa
+    await asyncio.gather(app_.state.google_client.warmup(), app_.state.yandex_client.warmup())  # noqa
     yield
+    if token_refresh_scheduler is not None:
+        await token_refresh_scheduler.stop()
     await app_.state.google_client.shutdown()  # noqa
     await app_.state.yandex_client.shutdown()  # noqa
+    await storage.close()
+    await app_.state.avatar_cache.close()  # noqa
+    log_writer.stop()
 
 
 app = FastAPI(lifespan=lifespan)
 
-app.mount("/static", StaticFiles(directory=ROOT_DIR / "src/static"), name="static")
+static_assets = StaticAssets(ROOT_DIR / "src/static", exclude=("html",))  # Templates are rendered, not served
+app.mount(static_assets.url_prefix, static_assets, name="static")
 
 app.include_router(api_router)
 
@@ -38,31 +94,60 @@ app.add_middleware(
     allow_headers=["Content-Type", "Authorization"],
 )
 
+app.add_middleware(ConditionalGetMiddleware)
+if settings.compression.enabled:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.compression.minimum_size)
+
+app.add_middleware(RequestDeadlineMiddleware, timeout=settings.resilience.request_deadline)
+if settings.rate_limit.enabled:
+    app.add_middleware(
+        RateLimitMiddleware,
+        rate=settings.rate_limit.rate,
+        burst=settings.rate_limit.burst,
+        max_clients=settings.rate_limit.max_clients,
+        key=settings.rate_limit.key,
+    )
+app.add_middleware(SecurityHeadersMiddleware)
+if settings.admin.server_timing:
+    app.add_middleware(ServerTimingMiddleware)
+if settings.log.enabled:
+    app.add_middleware(AccessLogMiddleware)
+app.add_middleware(MetricsMiddleware)
 
-@app.middleware("http")
-async def add_security_headers(request: Request, call_next) -> Response:
-    response = await call_next(request)
 
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-    response.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=(), fullscreen=()"
+@app.get("/", response_class=HTMLResponse)
+def get_index(request: Request) -> Response:
+    """Index page rendered once on startup, repeat visits are answered by ETag with 304."""
 
-    return response
+    return request.app.state.index_page.response(request.headers, CACHE_CONTROL_REVALIDATE)
 
 
-@app.get("/", response_class=HTMLResponse)
-def get_index(request: Request) -> HTMLResponse:
-    return templates.TemplateResponse("index.html", {"request": request})
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics() -> PlainTextResponse:
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
 
 def main() -> None:
+    workers = settings.server.workers or os.cpu_count() or 1
+
+    if workers > 1 and not settings.server.reload and settings.storage.backend == "memory":
+        # OAuth state and sessions of one worker would be invisible to the others, logins would fail at random
+        sys.exit("SERVER__WORKERS > 1 requires shared storage: set STORAGE__BACKEND=sqlite or redis")
+
     uvicorn.run(
         "main:app",
-        host="0.0.0.0",
-        port=8000,
+        host=settings.server.host,
+        port=settings.server.port,
         reload=settings.server.reload,
+        workers=workers,
+        loop=settings.server.loop,
+        http=settings.server.http,
+        limit_max_requests=settings.server.limit_max_requests,
+        limit_max_requests_jitter=settings.server.limit_max_requests_jitter,
+        timeout_keep_alive=settings.server.timeout_keep_alive,
+        timeout_graceful_shutdown=settings.server.timeout_graceful_shutdown,
+        backlog=settings.server.backlog,
+        access_log=not settings.log.enabled,  # Replaced by the queued structured access log
     )
 
 
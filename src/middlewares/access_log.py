@@ -0,0 +1,58 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.log import log_event, request_log
+from core.settings import settings
+from middlewares.metrics import route_label
+
+
+class AccessLogMiddleware:
+    """Queue a structured access log record per request, with its upstream cache hits.
+
+    Pure ASGI. Upstream call records of the request carry the same request id.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, size
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+
+            await send(message)
+
+        started_at = time.perf_counter()
+
+        with request_log() as entry:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                duration = time.perf_counter() - started_at
+                client = scope.get("client")
+
+                log_event(
+                    "access",
+                    always=status_code >= 400 or duration >= settings.log.slow_request,
+                    method=scope["method"],
+                    route=route_label(scope),
+                    path=scope["path"],
+                    query=scope.get("query_string", b"").decode("latin-1"),  # Redacted by the writer thread
+                    status=status_code,
+                    duration_ms=round(duration * 1000, 2),
+                    bytes=size,
+                    cache_hits=entry.cache_hits,
+                    client=client[0] if client else None,
+                )
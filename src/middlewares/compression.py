@@ -0,0 +1,81 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.compression import StreamCompressor, choose_encoding, compress, is_compressible, stream_compressor
+
+
+class CompressionMiddleware:
+    """Compress response bodies with brotli or gzip, as negotiated by Accept-Encoding.
+
+    Pure ASGI. Whole bodies smaller than ``minimum_size`` are sent as is. Streamed bodies are compressed
+    chunk by chunk and flushed after each one, so the client still gets every chunk as soon as it is produced.
+    Responses that already have Content-Encoding (precompressed assets) are passed through.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        compressor: StreamCompressor | None = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, compressor, passthrough
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message.get("headers", []))
+                passthrough = "content-encoding" in headers or not is_compressible(headers.get("content-type", ""))
+
+                if passthrough:
+                    await send(message)
+                else:
+                    start = message  # Held back until the first body chunk shows whether it is worth compressing
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body, more_body = message.get("body", b""), message.get("more_body", False)
+
+            if start is not None:
+                headers = MutableHeaders(scope=start)
+                headers.add_vary_header("Accept-Encoding")
+
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+
+                headers["Content-Encoding"] = encoding
+
+                if more_body:
+                    del headers["Content-Length"]
+                    compressor = stream_compressor(encoding)
+                else:
+                    body = compress(body, encoding)
+                    headers["Content-Length"] = str(len(body))
+
+                await send(start)
+                start = None
+
+            if compressor is not None:
+                body = compressor.compress(body)
+                body += compressor.flush() if more_body else compressor.finish()
+
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
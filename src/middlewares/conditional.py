@@ -0,0 +1,67 @@
+from typing import Final
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Headers a 304 response keeps from the full one (RFC 9110, section 15.4.5)
+NOT_MODIFIED_HEADERS: Final[frozenset[bytes]] = frozenset(
+    {b"etag", b"cache-control", b"vary", b"content-location", b"date", b"expires"}
+)
+
+
+def etag_matches(if_none_match: str, etag: str | None) -> bool:
+    """Weak comparison of If-None-Match against response ETag."""
+
+    if etag is None:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    return etag.removeprefix("W/") in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+
+
+class ConditionalGetMiddleware:
+    """Answer GET and HEAD with 304 Not Modified when If-None-Match matches ETag of the response.
+
+    Pure ASGI, the handler still runs and computes the ETag, only the body is not sent.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+
+        if not if_none_match:
+            await self.app(scope, receive, send)
+            return
+
+        not_modified = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal not_modified
+
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+
+                if message["status"] == 200 and etag_matches(if_none_match, Headers(raw=headers).get("etag")):
+                    not_modified = True
+                    message = {
+                        "type": "http.response.start",
+                        "status": 304,
+                        "headers": [(name, value) for name, value in headers if name in NOT_MODIFIED_HEADERS],
+                    }
+            elif not_modified:
+                if message.get("more_body", False):
+                    return
+
+                message = {"type": "http.response.body", "body": b""}
+
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
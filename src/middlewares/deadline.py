@@ -0,0 +1,19 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from integrations.resilience import request_deadline
+
+
+class RequestDeadlineMiddleware:
+    """Bound upstream calls made while handling a request by a single overall deadline."""
+
+    def __init__(self, app: ASGIApp, timeout: float) -> None:
+        self.app = app
+        self.timeout = timeout
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with request_deadline(self.timeout):
+            await self.app(scope, receive, send)
@@ -0,0 +1,54 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.metrics import http_request_duration_seconds, http_requests_in_flight, http_requests_total
+
+
+def route_label(scope: Scope) -> str:
+    """Route template instead of raw path, to keep label cardinality bounded."""
+
+    route = scope.get("route")
+
+    if route is None:
+        return scope.get("root_path") or "unmatched"  # Mounted apps (static files) set root_path
+
+    # Newer FastAPI versions keep included routes unprefixed and resolve full path per request
+    context = scope.get("fastapi", {}).get("effective_route_context")
+
+    return getattr(context, "path_format", None) or route.path_format
+
+
+class MetricsMiddleware:
+    """Record per-route request counts and latencies."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._in_flight = http_requests_in_flight.labels()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+            await send(message)
+
+        started_at = time.perf_counter()
+        self._in_flight.inc()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self._in_flight.dec()
+
+            labels = (scope["method"], route_label(scope), str(status_code))
+            http_requests_total.labels(*labels).inc()
+            http_request_duration_seconds.labels(*labels).observe(time.perf_counter() - started_at)
@@ -0,0 +1,116 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Literal
+
+from starlette.datastructures import Headers
+from starlette.requests import cookie_parser
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from core.constants import GOOGLE_SESSION_COOKIE_NAME, YANDEX_SESSION_COOKIE_NAME
+from core.metrics import http_requests_rate_limited_total
+
+
+class TokenBucketLimiter:
+    """Token bucket per key, buckets of the least recently seen keys are dropped beyond max_keys."""
+
+    def __init__(self, rate: float, burst: int, max_keys: int) -> None:
+        self._rate = rate
+        self._burst = burst
+        self._max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()  # Key -> tokens and update time
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._buckets
+
+    def acquire(self, key: str) -> float:
+        """Take a token, returns 0 on success or seconds until a token is available."""
+
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (self._burst, now))
+        tokens = min(self._burst, tokens + (now - updated_at) * self._rate)
+        wait = 0.0
+
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self._rate
+
+        self._buckets[key] = (tokens, now)
+
+        if len(self._buckets) > self._max_keys:
+            self._buckets.popitem(last=False)
+
+        return wait
+
+
+class RateLimitMiddleware:
+    """Reject requests of clients exceeding their rate with 429 and Retry-After.
+
+    Pure ASGI, limited requests never reach routing or upstream calls. Clients are told apart by address,
+    or by session cookie in session mode (requests without one fall back to address). A session gets its
+    own bucket only once it is found in the session store, until then requests are charged to the address,
+    so a made-up cookie per request never gets a fresh bucket.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        rate: float,
+        burst: int,
+        max_clients: int,
+        key: Literal["ip", "session"] = "ip",
+        path_prefix: str = "/api/",
+    ) -> None:
+        self.app = app
+        self.key = key
+        self.path_prefix = path_prefix
+        self.limiter = TokenBucketLimiter(rate, burst, max_clients)
+
+    @staticmethod
+    def _session_id(scope: Scope) -> str | None:
+        cookies = cookie_parser(Headers(scope=scope).get("cookie", ""))
+
+        return cookies.get(GOOGLE_SESSION_COOKIE_NAME) or cookies.get(YANDEX_SESSION_COOKIE_NAME)
+
+    async def _acquire(self, scope: Scope) -> float:
+        client = scope.get("client")
+        address_key = f"ip:{client[0] if client else 'unknown'}"
+        session_id = self._session_id(scope) if self.key == "session" else None
+
+        if not session_id:
+            return self.limiter.acquire(address_key)
+
+        session_key = f"session:{session_id}"
+
+        if session_key not in self.limiter:
+            # Store lookups of unknown cookies are limited by the address bucket too
+            wait = self.limiter.acquire(address_key)
+
+            if wait > 0 or not await scope["app"].state.session_manager.exists(session_id):
+                return wait
+
+        return self.limiter.acquire(session_key)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        wait = await self._acquire(scope)
+
+        if wait > 0:
+            http_requests_rate_limited_total.labels().inc()
+            response = JSONResponse(
+                {"detail": "Too many requests. Please retry later."},
+                status_code=429,
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
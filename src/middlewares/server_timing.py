@@ -0,0 +1,33 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.timing import collect_timings, format_server_timing
+
+
+class ServerTimingMiddleware:
+    """Report request phases recorded with `core.timing.span` in Server-Timing header.
+
+    Pure ASGI. Phases are taken when the response starts, so a streamed body is not covered.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+
+        with collect_timings() as timings:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    value = format_server_timing(timings, time.perf_counter() - started_at)
+                    message["headers"] = [*message.get("headers", ()), (b"server-timing", value.encode("latin-1"))]
+
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
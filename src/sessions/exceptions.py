@@ -0,0 +1,15 @@
+from fastapi import HTTPException
+
+
+class SessionExpiredError(HTTPException):
+    """Session is missing or its tokens can no longer be refreshed."""
+
+    def __init__(self, detail: str = "Session expired. Please login again.") -> None:
+        super().__init__(status_code=401, detail=detail)
+
+
+class CodeExchangeError(HTTPException):
+    """Repeated callback of an authorization code whose exchange has failed or expired."""
+
+    def __init__(self, detail: str = "Invalid state") -> None:
+        super().__init__(status_code=400, detail=detail)
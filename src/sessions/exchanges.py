@@ -0,0 +1,94 @@
+import asyncio
+import dataclasses
+import hashlib
+from typing import Awaitable, Callable, Final
+
+from core.constants import CODE_EXCHANGE_TTL, OAUTH_EXCHANGE_KEY_PREFIX
+from core.settings import settings
+from integrations.singleflight import SingleFlight
+from sessions.exceptions import CodeExchangeError
+from sessions.schemas import OAuthProvider
+from storage.base import KeyValueBackend
+
+PENDING: Final[bytes] = b""  # Stored while the exchange runs, replaced with session id once it is done
+POLL_INTERVAL: Final[float] = 0.05  # Repeated callback checks an exchange running in another worker this often
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class CodeExchange:
+    key: str
+    fresh: bool  # Callback consumed the state, False for a repeated callback of an already consumed one
+
+
+class CodeExchanges:
+    """Authorization code exchanges, so a callback hit more than once creates one session.
+
+    Double clicks, browser prefetch and reloads repeat the callback, but the provider accepts a code once and
+    the state is consumed by the first hit. Repeats get the session of the first exchange instead of
+    a failed one: concurrent repeats in the worker join it, others read its result from storage.
+    """
+
+    def __init__(self, storage: KeyValueBackend, ttl: float = CODE_EXCHANGE_TTL) -> None:
+        self._storage = storage
+        self._ttl = ttl
+        self._flights = SingleFlight()
+
+    @staticmethod
+    def key(provider: OAuthProvider, state: str, code: str) -> str:
+        """Storage key, hashed since the code is a credential, and bound to the state of the login."""
+
+        digest = hashlib.sha256(f"{provider}:{state}:{code}".encode()).hexdigest()
+
+        return OAUTH_EXCHANGE_KEY_PREFIX + digest
+
+    async def begin(self, key: str) -> None:
+        """Mark exchange of a just consumed state as running, the mark can't outlive the request."""
+
+        await self._storage.set(key, PENDING, settings.resilience.request_deadline)
+
+    async def resolve(self, exchange: CodeExchange, create: Callable[[], Awaitable[str]]) -> str:
+        """Id of the session created for the code, by `create` for a fresh callback or by the first one."""
+
+        if exchange.fresh:
+            return await self._flights.do(exchange.key, lambda: self._run(exchange.key, create))
+
+        session_id = await self._result(exchange.key)
+
+        if session_id is None:
+            raise CodeExchangeError()
+
+        return session_id
+
+    async def _run(self, key: str, create: Callable[[], Awaitable[str]]) -> str:
+        try:
+            session_id = await create()
+        except Exception:
+            await self._storage.delete(key)  # Repeats waiting for the result give up at once
+            raise
+
+        await self._storage.set(key, session_id.encode(), self._ttl)
+
+        return session_id
+
+    async def _result(self, key: str) -> str | None:
+        missing = 0
+
+        while True:
+            flight = self._flights.running(key)
+
+            if flight is not None:
+                return await flight
+
+            value = await self._storage.get(key)
+
+            if value:
+                return value.decode()
+
+            if value is None:
+                # State may have just been consumed by a callback that hasn't marked its exchange yet
+                missing += 1
+
+                if missing > 1:
+                    return None
+
+            await asyncio.sleep(POLL_INTERVAL)
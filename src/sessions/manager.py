@@ -0,0 +1,159 @@
+import secrets
+import time
+from functools import partial
+from typing import Mapping, Protocol
+
+from fastapi import HTTPException
+
+from core.constants import ACCESS_TOKEN_REFRESH_LEEWAY, SESSION_COOKIE_MAX_AGE
+from core.settings import settings
+from core.timing import span
+from integrations.exceptions import InvalidGrantError
+from integrations.singleflight import SingleFlight
+from sessions.exceptions import SessionExpiredError
+from sessions.refresher import TokenRefreshScheduler
+from sessions.schemas import OAuthProvider, SessionData
+from sessions.store import SessionStore
+
+
+class TokenResponse(Protocol):
+    access_token: str
+    expires_in: int
+    refresh_token: str | None
+
+
+class OAuthClient(Protocol):
+    async def refresh_tokens(self, refresh_token: str) -> TokenResponse: ...
+
+    def invalidate_cache(self, access_token: str | None = None) -> int: ...
+
+
+class SessionManager:
+    """Create sessions from OAuth tokens and keep their access tokens fresh."""
+
+    def __init__(
+        self,
+        store: SessionStore,
+        clients: Mapping[OAuthProvider, OAuthClient],
+        scheduler: TokenRefreshScheduler | None = None,
+    ) -> None:
+        self._store = store
+        self._clients = clients
+        self._scheduler = scheduler
+        self._refreshes = SingleFlight()
+
+    @staticmethod
+    def _ttl(session: SessionData) -> float:
+        """Remaining session lifetime, refreshes never extend it."""
+
+        return session.created_at + SESSION_COOKIE_MAX_AGE - time.time()
+
+    async def _save(self, session: SessionData) -> None:
+        await self._store.set(session, self._ttl(session))
+
+        if self._scheduler is not None and session.refresh_token is not None:
+            self._scheduler.schedule(session.id, session.expires_at)
+
+    async def create(
+        self,
+        provider: OAuthProvider,
+        tokens: TokenResponse,
+        subject: str | None = None,
+        email: str | None = None,
+    ) -> SessionData:
+        session = SessionData(
+            id=secrets.token_urlsafe(32),
+            provider=provider,
+            access_token=tokens.access_token,
+            refresh_token=tokens.refresh_token,
+            expires_at=time.time() + tokens.expires_in,
+            subject=subject,
+            email=email,
+        )
+        await self._save(session)
+
+        return session
+
+    async def get(self, session_id: str, provider: OAuthProvider) -> SessionData:
+        """Get provider session, refreshing its access token if it is about to expire."""
+
+        with span("session"):
+            session = await self._store.get(session_id)
+
+        if session is None or session.provider != provider:
+            raise SessionExpiredError()
+
+        if session.expires_within(ACCESS_TOKEN_REFRESH_LEEWAY):
+            session = await self.refresh(session)
+
+        return session
+
+    async def exists(self, session_id: str) -> bool:
+        """Session is stored and not expired, its access token may be."""
+
+        return await self._store.get(session_id) is not None
+
+    async def get_access_token(self, session_id: str, provider: OAuthProvider) -> str:
+        session = await self.get(session_id, provider)
+
+        return session.access_token
+
+    async def refresh(self, session: SessionData) -> SessionData:
+        """Renew session access token, concurrent refreshes of one session are coalesced."""
+
+        return await self._refreshes.do(session.id, partial(self._refresh, session))
+
+    async def _refresh(self, session: SessionData) -> SessionData:
+        if session.refresh_token is None:
+            if session.expires_within(0):
+                await self.delete(session.id)
+                raise SessionExpiredError()
+
+            return session
+
+        client = self._clients[session.provider]
+
+        try:
+            tokens = await client.refresh_tokens(session.refresh_token)
+        except HTTPException as e:
+            # Refresh token revoked or expired. Other errors (rate limit, outage) keep the session for a retry
+            if isinstance(e, InvalidGrantError) or e.status_code == 401:
+                await self.delete(session.id)
+                raise SessionExpiredError() from e
+
+            raise
+
+        client.invalidate_cache(session.access_token)
+
+        refreshed = session.model_copy(
+            update={
+                "access_token": tokens.access_token,
+                "refresh_token": tokens.refresh_token or session.refresh_token,
+                "expires_at": time.time() + tokens.expires_in,
+            }
+        )
+        await self._save(refreshed)
+
+        return refreshed
+
+    async def refresh_by_id(self, session_id: str) -> None:
+        """Refresh stored session ahead of time, used by the background scheduler."""
+
+        session = await self._store.get(session_id)
+
+        # With a shared store every worker holds its own schedule entry, another worker may have refreshed already
+        config = settings.token_refresh
+
+        if session is None or not session.expires_within(config.lead_time + config.jitter):
+            return
+
+        try:
+            await self.refresh(session)
+        except SessionExpiredError:
+            pass
+
+    async def delete(self, session_id: str) -> None:
+        await self._store.delete(session_id)
+
+        if self._scheduler is not None:
+            self._scheduler.unschedule(session_id)
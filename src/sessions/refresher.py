@@ -0,0 +1,102 @@
+import asyncio
+import heapq
+import random
+import time
+from typing import Awaitable, Callable
+
+from core.settings import settings
+
+
+class TokenRefreshScheduler:
+    """Background task refreshing session access tokens shortly before they expire.
+
+    Sessions are kept in a heap ordered by refresh time. Rescheduling a session
+    pushes a new heap entry and leaves the old one to be skipped as stale.
+    """
+
+    def __init__(self) -> None:
+        config = settings.token_refresh
+
+        self._lead_time = config.lead_time
+        self._jitter = config.jitter
+        self._retry_delay = config.retry_delay
+        self._semaphore = asyncio.Semaphore(config.max_concurrency)
+
+        self._heap: list[tuple[float, str]] = []
+        self._scheduled: dict[str, float] = {}  # Session id -> actual refresh time
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._refreshes: set[asyncio.Task] = set()
+        self._refresh: Callable[[str], Awaitable[object]] | None = None
+
+    def __len__(self) -> int:
+        return len(self._scheduled)
+
+    def schedule(self, session_id: str, expires_at: float) -> None:
+        """Schedule refresh ahead of access token expiration, with random jitter."""
+
+        self._schedule_at(session_id, expires_at - self._lead_time - random.uniform(0, self._jitter))
+
+    def unschedule(self, session_id: str) -> None:
+        self._scheduled.pop(session_id, None)
+
+    def _schedule_at(self, session_id: str, refresh_at: float) -> None:
+        self._scheduled[session_id] = refresh_at
+        heapq.heappush(self._heap, (refresh_at, session_id))
+
+        if self._heap[0][1] == session_id:
+            self._wakeup.set()
+
+    def start(self, refresh: Callable[[str], Awaitable[object]]) -> None:
+        self._refresh = refresh
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+
+        for task in self._refreshes:
+            task.cancel()
+
+        await asyncio.gather(self._task, *self._refreshes, return_exceptions=True)
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+
+            while self._heap and self._heap[0][0] <= time.time():
+                refresh_at, session_id = heapq.heappop(self._heap)
+
+                if self._scheduled.get(session_id) != refresh_at:
+                    continue  # Stale entry, session was rescheduled or removed
+
+                del self._scheduled[session_id]
+
+                # Bounded concurrency, due sessions wait here instead of piling up on the token endpoint
+                await self._semaphore.acquire()
+
+                task = asyncio.create_task(self._refresh_session(session_id))
+                self._refreshes.add(task)
+                task.add_done_callback(self._refreshes.discard)
+
+            timeout = self._heap[0][0] - time.time() if self._heap else None
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except TimeoutError:
+                pass
+
+    async def _refresh_session(self, session_id: str) -> None:
+        try:
+            await self._refresh(session_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception:  # noqa
+            # Transient failure, try again later (request path still refreshes on expiry)
+            if session_id not in self._scheduled:
+                self._schedule_at(session_id, time.time() + self._retry_delay + random.uniform(0, self._jitter))
+        finally:
+            self._semaphore.release()
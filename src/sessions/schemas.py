@@ -0,0 +1,27 @@
+import time
+from enum import StrEnum
+
+from pydantic import BaseModel, Field
+
+
+class OAuthProvider(StrEnum):
+    GOOGLE = "google"
+    YANDEX = "yandex"
+
+
+class SessionData(BaseModel):
+    """Server-side session with provider tokens."""
+
+    id: str
+    provider: OAuthProvider
+    access_token: str
+    refresh_token: str | None = None
+    expires_at: float  # Access token expiration, unix timestamp
+    created_at: float = Field(default_factory=time.time)
+
+    # User identity, when provider returns it with tokens (e.g. verified Google id_token)
+    subject: str | None = None
+    email: str | None = None
+
+    def expires_within(self, seconds: float) -> bool:
+        return self.expires_at - time.time() <= seconds
@@ -0,0 +1,41 @@
+import abc
+from typing import Final
+
+from sessions.schemas import SessionData
+from storage.base import KeyValueBackend
+
+
+class SessionStore(abc.ABC):
+    """Storage backend for server-side sessions."""
+
+    @abc.abstractmethod
+    async def get(self, session_id: str) -> SessionData | None: ...
+
+    @abc.abstractmethod
+    async def set(self, session: SessionData, ttl: float) -> None: ...
+
+    @abc.abstractmethod
+    async def delete(self, session_id: str) -> None: ...
+
+
+class KeyValueSessionStore(SessionStore):
+    """Session store on top of a key-value backend, shared by workers when the backend is."""
+
+    KEY_PREFIX: Final[str] = "session:"
+
+    def __init__(self, backend: KeyValueBackend) -> None:
+        self._backend = backend
+
+    async def get(self, session_id: str) -> SessionData | None:
+        payload = await self._backend.get(self.KEY_PREFIX + session_id)
+
+        if payload is None:
+            return None
+
+        return SessionData.model_validate_json(payload)
+
+    async def set(self, session: SessionData, ttl: float) -> None:
+        await self._backend.set(self.KEY_PREFIX + session.id, session.__pydantic_serializer__.to_json(session), ttl)
+
+    async def delete(self, session_id: str) -> None:
+        await self._backend.delete(self.KEY_PREFIX + session_id)
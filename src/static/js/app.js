@@ -0,0 +1,225 @@
+async function getEvent() {
+    const btn = document.getElementById('fetchBtn');
+    const container = document.getElementById('eventContainer');
+
+    btn.disabled = true;
+    btn.innerHTML = '<span class="loading"></span>Загрузка...';
+    container.classList.remove('visible');
+
+    try {
+        const response = await fetch('/api/google/calendar/next-event');
+        const data = await response.json();
+
+        if (!response.ok) {
+            throw new Error(data.detail || 'Ошибка загрузки данных');
+        }
+
+        const events = data.items || [];
+        if (events.length === 0) {
+            container.innerHTML = '<div class="no-event">Нет предстоящих событий</div>';
+        } else {
+            container.innerHTML = renderEvent(events[0]);
+        }
+
+        container.classList.add('visible');
+    } catch (error) {
+        container.innerHTML = `<div class="error-message">${error.message}</div>`;
+        container.classList.add('visible');
+    } finally {
+        btn.disabled = false;
+        btn.innerHTML = '📅 Получить событие из Google Календаря';
+    }
+}
+
+function renderEvent(event) {
+    const title = event.summary || 'Без названия';
+    const start = formatDateTime(event.start?.dateTime || event.start?.date);
+    const end = formatDateTime(event.end?.dateTime || event.end?.date);
+
+    return `
+        <div class="event-card">
+            <div class="event-title">
+                <div class="event-title-text">
+                    <span>📅</span>
+                    <span>${escapeHtml(title)}</span>
+                </div>
+                <button class="close-btn" onclick="removeCard(event)" title="Закрыть">×</button>
+            </div>
+            <div class="event-details">
+                <div class="event-row">
+                    <span class="event-icon">🕐</span>
+                    <span class="event-label">Начало:</span>
+                    <span class="event-value">${start}</span>
+                </div>
+                <div class="event-row">
+                    <span class="event-icon">🕑</span>
+                    <span class="event-label">Конец:</span>
+                    <span class="event-value">${end}</span>
+                </div>
+            </div>
+        </div>
+    `;
+}
+
+function formatDateTime(dateStr) {
+    if (!dateStr) return 'Не указано';
+    const date = new Date(dateStr);
+    return date.toLocaleString('ru-RU', {
+        day: 'numeric',
+        month: 'long',
+        year: 'numeric',
+        hour: '2-digit',
+        minute: '2-digit'
+    });
+}
+
+function escapeHtml(text) {
+    const div = document.createElement('div');
+    div.textContent = text;
+    return div.innerHTML;
+}
+
+function removeCard(event) {
+    event.stopPropagation();
+    const card = event.currentTarget.closest('.event-card');
+    if (card) {
+        card.classList.add('removing');
+        setTimeout(() => {
+            const container = card.parentElement;
+            card.remove();
+            if (container && container.children.length === 0) {
+                container.classList.remove('visible');
+            }
+        }, 300);
+    }
+}
+
+async function getYandexUser() {
+    const btn = document.getElementById('fetchUserBtn');
+    const container = document.getElementById('userContainer');
+
+    btn.disabled = true;
+    btn.innerHTML = '<span class="loading"></span>Загрузка...';
+    container.classList.remove('visible');
+
+    try {
+        const response = await fetch('/api/yandex/user/info');
+        const data = await response.json();
+
+        if (!response.ok) {
+            throw new Error(data.detail || 'Ошибка загрузки данных');
+        }
+
+        container.innerHTML = renderUserInfo(data);
+        container.classList.add('visible');
+    } catch (error) {
+        container.innerHTML = `<div class="error-message">${error.message}</div>`;
+        container.classList.add('visible');
+    } finally {
+        btn.disabled = false;
+        btn.innerHTML = '👤 Получить данные профиля Яндекс';
+    }
+}
+
+function renderUserInfo(user) {
+    const displayName = user.display_name || user.real_name || user.login;
+    const email = user.default_email || (user.emails && user.emails[0]) || 'Не указан';
+    const login = user.login;
+    const firstName = user.first_name || '';
+    const lastName = user.last_name || '';
+    const fullName = `${firstName} ${lastName}`.trim() || displayName;
+    const avatar = user.default_avatar_id && !user.is_avatar_empty
+        ? '<img class="user-avatar" src="/api/yandex/avatar/islands-retina-small" alt="" width="28" height="28">'
+        : '<span>👤</span>';
+
+    return `
+        <div class="event-card" style="background: linear-gradient(135deg, #FC3F1D 0%, #E63100 100%);">
+            <div class="event-title">
+                <div class="event-title-text">
+                    ${avatar}
+                    <span>${escapeHtml(fullName)}</span>
+                </div>
+                <button class="close-btn" onclick="removeCard(event)" title="Закрыть">×</button>
+            </div>
+            <div class="event-details">
+                <div class="event-row">
+                    <span class="event-icon">🔑</span>
+                    <span class="event-label">ID:</span>
+                    <span class="event-value">${escapeHtml(user.id)}</span>
+                </div>
+                <div class="event-row">
+                    <span class="event-icon">👤</span>
+                    <span class="event-label">Логин:</span>
+                    <span class="event-value">${escapeHtml(login)}</span>
+                </div>
+                <div class="event-row">
+                    <span class="event-icon">📧</span>
+                    <span class="event-label">Email:</span>
+                    <span class="event-value">${escapeHtml(email)}</span>
+                </div>
+                ${displayName !== fullName ? `
+                <div class="event-row">
+                    <span class="event-icon">✨</span>
+                    <span class="event-label">Отображаемое имя:</span>
+                    <span class="event-value">${escapeHtml(displayName)}</span>
+                </div>
+                ` : ''}
+            </div>
+        </div>
+    `;
+}
+
+async function getDashboard() {
+    const btn = document.getElementById('fetchDashboardBtn');
+    const eventContainer = document.getElementById('eventContainer');
+    const userContainer = document.getElementById('userContainer');
+
+    btn.disabled = true;
+    btn.innerHTML = '<span class="loading"></span>Загрузка...';
+    eventContainer.classList.remove('visible');
+    userContainer.classList.remove('visible');
+
+    try {
+        // Both providers are queried concurrently on the server, errors are reported per provider
+        const response = await fetch('/api/dashboard');
+        const data = await response.json();
+
+        if (!response.ok) {
+            throw new Error(data.detail || 'Ошибка загрузки данных');
+        }
+
+        const errors = data.errors || {};
+
+        if (data.next_event) {
+            const events = data.next_event.items || [];
+            eventContainer.innerHTML = events.length === 0
+                ? '<div class="no-event">Нет предстоящих событий</div>'
+                : renderEvent(events[0]);
+        } else {
+            eventContainer.innerHTML = renderProviderError('Google', errors.google);
+        }
+
+        if (data.user_info) {
+            userContainer.innerHTML = renderUserInfo(data.user_info);
+        } else {
+            userContainer.innerHTML = renderProviderError('Яндекс', errors.yandex);
+        }
+
+        eventContainer.classList.add('visible');
+        userContainer.classList.add('visible');
+    } catch (error) {
+        eventContainer.innerHTML = `<div class="error-message">${escapeHtml(error.message)}</div>`;
+        eventContainer.classList.add('visible');
+    } finally {
+        btn.disabled = false;
+        btn.innerHTML = '📊 Получить все данные одним запросом';
+    }
+}
+
+function renderProviderError(provider, error) {
+    const message = error && error.status_code !== 401
+        ? error.detail
+        : `Войдите через ${provider}, чтобы увидеть данные`;
+
+    return `<div class="error-message">${escapeHtml(message)}</div>`;
+}
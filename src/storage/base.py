@@ -0,0 +1,30 @@
+import abc
+
+
+class KeyValueBackend(abc.ABC):
+    """Async key-value storage with per-key TTL, values are raw bytes."""
+
+    shared: bool = False  # Whether other worker processes see the same data
+
+    def __init__(self, prefix: str = "") -> None:
+        self._prefix = prefix
+
+    def _key(self, key: str) -> str:
+        return self._prefix + key
+
+    @abc.abstractmethod
+    async def get(self, key: str) -> bytes | None: ...
+
+    @abc.abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Store value for ttl seconds, non-positive ttl deletes the key."""
+
+    @abc.abstractmethod
+    async def delete(self, key: str) -> None: ...
+
+    @abc.abstractmethod
+    async def pop(self, key: str) -> bytes | None:
+        """Atomically get and delete value, so only one caller can consume it."""
+
+    async def close(self) -> None:
+        pass
@@ -0,0 +1,8 @@
+from fastapi import HTTPException
+
+
+class StorageUnavailableError(HTTPException):
+    """Key-value backend can't be reached or failed to execute a command."""
+
+    def __init__(self) -> None:
+        super().__init__(status_code=503, detail="Storage temporarily unavailable. Please retry later.")
@@ -0,0 +1,35 @@
+from core.constants import OAUTH_EXCHANGE_KEY_PREFIX, OAUTH_STATE_KEY_PREFIX
+from core.settings import settings
+from sessions.store import KeyValueSessionStore
+from storage.base import KeyValueBackend
+from storage.memory import MemoryBackend
+from storage.redis import RedisBackend
+from storage.sqlite import SQLiteBackend
+
+
+def create_storage_backend() -> KeyValueBackend:
+    """Create key-value backend selected in settings."""
+
+    config = settings.storage
+
+    if config.backend == "sqlite":
+        return SQLiteBackend(config.sqlite_path, prefix=config.key_prefix)
+
+    if config.backend == "redis":
+        return RedisBackend(
+            config.redis_url,
+            password=config.redis_password and config.redis_password.get_secret_value(),
+            pool_size=config.redis_pool_size,
+            timeout=config.redis_timeout,
+            prefix=config.key_prefix,
+        )
+
+    return MemoryBackend(
+        config.memory_max_size,
+        prefix=config.key_prefix,
+        limits={
+            KeyValueSessionStore.KEY_PREFIX: None,
+            OAUTH_STATE_KEY_PREFIX: config.memory_max_oauth_states,
+            OAUTH_EXCHANGE_KEY_PREFIX: config.memory_max_code_exchanges,
+        },
+    )
@@ -0,0 +1,168 @@
+import asyncio
+import dataclasses
+import hashlib
+import mimetypes
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Final, TypeVar
+
+from integrations.singleflight import SingleFlight
+
+T = TypeVar("T")
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class CachedFile:
+    path: Path
+    digest: str
+    media_type: str
+    stat: os.stat_result
+
+
+class FileCache:
+    """Content-addressed files on disk, shared by worker processes, with a total size cap.
+
+    Blobs are named by content hash (identical content is stored once), keys are symlinks to blobs.
+    Blob mtime is the recency: hits touch it, eviction removes the least recently used blobs and
+    dangling key links. Disk I/O runs on one dedicated thread per process, never on the event loop.
+    """
+
+    TOUCH_INTERVAL: Final[float] = 60.0  # Hits refresh blob mtime at most this often (in seconds)
+    LOW_WATERMARK: Final[float] = 0.9  # Eviction frees space down to this share of max_bytes
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self._blobs = directory / "blobs"
+        self._keys = directory / "keys"
+        self._max_bytes = max_bytes
+        self._size: int | None = None  # Known after the first scan, then grows with stored blobs
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="file-cache")
+        self._fills = SingleFlight()
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _key_path(self, key: str) -> Path:
+        return self._keys / hashlib.sha256(key.encode()).hexdigest()
+
+    async def get(self, key: str) -> CachedFile | None:
+        return await self._run(self._lookup, key)
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[tuple[bytes, str]]]) -> CachedFile:
+        """Cached file of key, or fetch its content and media type and store it.
+
+        Concurrent misses for the same key share a single fetch.
+        """
+
+        cached = await self.get(key)
+
+        if cached is not None:
+            return cached
+
+        return await self._fills.do(key, partial(self._fill, key, fetch))
+
+    async def _fill(self, key: str, fetch: Callable[[], Awaitable[tuple[bytes, str]]]) -> CachedFile:
+        body, media_type = await fetch()
+
+        return await self._run(self._store, key, body, media_type)
+
+    def _lookup(self, key: str) -> CachedFile | None:
+        link = self._key_path(key)
+
+        try:
+            path = link.resolve(strict=True)
+            stat = path.stat()
+
+            if time.time() - stat.st_mtime > self.TOUCH_INTERVAL:
+                os.utime(path)
+        except (FileNotFoundError, RuntimeError):  # No key, or its blob has been evicted (maybe by another worker)
+            return None
+
+        return self._cached_file(path, stat)
+
+    def _store(self, key: str, body: bytes, media_type: str) -> CachedFile:
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        path = self._blobs / digest[:2] / (digest + (mimetypes.guess_extension(media_type) or ""))
+
+        if path.exists():
+            os.utime(path)
+        else:
+            self._write_atomic(path, body)
+
+            if self._size is not None:
+                self._size += len(body)
+
+        link = self._key_path(key)
+        link.parent.mkdir(parents=True, exist_ok=True)
+        temporary = link.with_name(f"{link.name}.{os.getpid()}.tmp")
+        temporary.unlink(missing_ok=True)
+        temporary.symlink_to(path.resolve())
+        temporary.replace(link)
+
+        if self._size is None or self._size > self._max_bytes:
+            self._evict(keep=path)
+
+        return self._cached_file(path, path.stat())
+
+    @staticmethod
+    def _write_atomic(path: Path, body: bytes) -> None:
+        """Readers (other workers too) see either no blob or the complete one."""
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(body)
+
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def _evict(self, keep: Path) -> None:
+        """Remove least recently used blobs, except the one just stored, until the cache fits the low watermark."""
+
+        blobs = []
+
+        for directory in self._blobs.iterdir():
+            for entry in os.scandir(directory):
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    stat = entry.stat()
+                    blobs.append((stat.st_mtime, stat.st_size, entry.path))
+
+        size = sum(blob_size for _, blob_size, _ in blobs)
+
+        if size > self._max_bytes:
+            target = self._max_bytes * self.LOW_WATERMARK
+
+            for _, blob_size, path in sorted(blobs):
+                if size <= target:
+                    break
+
+                if path == str(keep):
+                    continue
+
+                Path(path).unlink(missing_ok=True)
+                size -= blob_size
+
+            for link in self._keys.iterdir():
+                if not link.exists():  # Follows the link, False once its blob is gone
+                    link.unlink(missing_ok=True)
+
+        self._size = size
+
+    @staticmethod
+    def _cached_file(path: Path, stat: os.stat_result) -> CachedFile:
+        return CachedFile(
+            path=path,
+            digest=path.stem,
+            media_type=mimetypes.guess_type(path.name)[0] or "application/octet-stream",
+            stat=stat,
+        )
+
+    async def close(self) -> None:
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,88 @@
+import time
+from collections import OrderedDict
+from typing import Final, Mapping
+
+from storage.base import KeyValueBackend
+
+
+class MemoryBackend(KeyValueBackend):
+    """Process-local storage, every worker has its own copy.
+
+    Keys are split into namespaces by prefix, each one is a separate LRU with its own bound, so a flood of
+    entries in one namespace (OAuth state of anonymous logins) never evicts another's. A namespace bounded
+    by None (sessions) loses entries only to their TTL. Keys matching no prefix share max_size.
+    """
+
+    SWEEP_INTERVAL: Final[float] = 60.0  # Seconds between purges of expired entries
+
+    def __init__(self, max_size: int, prefix: str = "", limits: Mapping[str, int | None] | None = None) -> None:
+        super().__init__(prefix)
+        self._limits: dict[str, int | None] = {**(limits or {}), "": max_size}
+        self._namespaces: dict[str, OrderedDict[str, tuple[float, bytes]]] = {
+            namespace: OrderedDict() for namespace in self._limits
+        }
+        self._next_sweep = time.monotonic() + self.SWEEP_INTERVAL
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._namespaces.values())
+
+    def _namespace(self, key: str) -> str:
+        return next(namespace for namespace in self._limits if key.startswith(namespace))
+
+    async def get(self, key: str) -> bytes | None:
+        entries = self._namespaces[self._namespace(key)]
+        key = self._key(key)
+        entry = entries.get(key)
+
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+
+        if expires_at <= time.monotonic():
+            del entries[key]
+            return None
+
+        entries.move_to_end(key)
+
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        namespace = self._namespace(key)
+        entries = self._namespaces[namespace]
+        key = self._key(key)
+
+        if ttl <= 0:
+            entries.pop(key, None)
+            return
+
+        now = time.monotonic()
+        entries[key] = (now + ttl, value)
+        entries.move_to_end(key)
+
+        if (max_size := self._limits[namespace]) is not None:
+            while len(entries) > max_size:
+                entries.popitem(last=False)
+
+        if now >= self._next_sweep:
+            self._sweep(now)
+
+    def _sweep(self, now: float) -> None:
+        for entries in self._namespaces.values():
+            expired = [key for key, (expires_at, _) in entries.items() if expires_at <= now]
+
+            for key in expired:
+                del entries[key]
+
+        self._next_sweep = now + self.SWEEP_INTERVAL
+
+    async def delete(self, key: str) -> None:
+        self._namespaces[self._namespace(key)].pop(self._key(key), None)
+
+    async def pop(self, key: str) -> bytes | None:
+        entry = self._namespaces[self._namespace(key)].pop(self._key(key), None)
+
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+
+        return entry[1]
@@ -0,0 +1,156 @@
+import asyncio
+from urllib.parse import urlsplit
+
+from storage.base import KeyValueBackend
+from storage.exceptions import StorageUnavailableError
+
+RESPValue = bytes | int | list | None
+
+
+class RedisError(Exception):
+    """Error reply returned by the server."""
+
+
+class RedisConnection:
+    """Single RESP2 connection, commands are sent one at a time."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._reader = reader
+        self._writer = writer
+
+    @staticmethod
+    def encode(*args: str | bytes | int) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+
+        return b"".join(parts)
+
+    async def execute(self, *args: str | bytes | int) -> RESPValue:
+        self._writer.write(self.encode(*args))
+        await self._writer.drain()
+
+        return await self._read_reply()
+
+    async def _read_reply(self) -> RESPValue:
+        line = await self._reader.readuntil(b"\r\n")
+        kind, payload = line[:1], line[1:-2]
+
+        if kind == b"+":
+            return payload
+        if kind == b"-":
+            raise RedisError(payload.decode(errors="replace"))
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+
+            if length < 0:
+                return None
+
+            return (await self._reader.readexactly(length + 2))[:-2]
+        if kind == b"*":
+            length = int(payload)
+
+            if length < 0:
+                return None
+
+            return [await self._read_reply() for _ in range(length)]
+
+        raise RedisError(f"Unexpected reply type: {kind!r}")
+
+    async def close(self) -> None:
+        self._writer.close()
+
+        try:
+            await self._writer.wait_closed()
+        except OSError:
+            pass
+
+
+class RedisBackend(KeyValueBackend):
+    """Minimal Redis protocol client with a small connection pool, shared by all hosts."""
+
+    shared = True
+
+    def __init__(
+        self,
+        url: str,
+        password: str | None = None,
+        pool_size: int = 10,
+        timeout: float = 2.0,
+        prefix: str = "",
+    ) -> None:
+        super().__init__(prefix)
+        parts = urlsplit(url)
+        self._host = parts.hostname or "127.0.0.1"
+        self._port = parts.port or 6379
+        self._password = password or parts.password
+        self._db = int(parts.path.lstrip("/") or 0)
+        self._timeout = timeout
+        self._pool_size = pool_size
+        self._idle: list[RedisConnection] = []
+        self._slots: asyncio.Semaphore | None = None  # Created lazily inside the running loop
+
+    async def _connect(self) -> RedisConnection:
+        reader, writer = await asyncio.open_connection(self._host, self._port)
+        connection = RedisConnection(reader, writer)
+
+        if self._password:
+            await connection.execute("AUTH", self._password)
+        if self._db:
+            await connection.execute("SELECT", self._db)
+
+        return connection
+
+    async def execute(self, *args: str | bytes | int) -> RESPValue:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._pool_size)
+
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else None
+
+            try:
+                async with asyncio.timeout(self._timeout):
+                    if connection is None:
+                        connection = await self._connect()
+
+                    result = await connection.execute(*args)
+            except (OSError, EOFError, TimeoutError, asyncio.LimitOverrunError, RedisError) as e:
+                if connection is not None:
+                    await connection.close()  # Reply stream may be out of sync, never reuse it
+
+                raise StorageUnavailableError() from e
+            except BaseException:
+                if connection is not None:
+                    await connection.close()
+
+                raise
+
+            self._idle.append(connection)
+
+            return result
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.execute("GET", self._key(key))
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        if ttl <= 0:
+            await self.delete(key)
+            return
+
+        await self.execute("SET", self._key(key), value, "PX", max(1, int(ttl * 1000)))
+
+    async def delete(self, key: str) -> None:
+        await self.execute("DEL", self._key(key))
+
+    async def pop(self, key: str) -> bytes | None:
+        return await self.execute("GETDEL", self._key(key))  # Redis 6.2+
+
+    async def close(self) -> None:
+        while self._idle:
+            await self._idle.pop().close()
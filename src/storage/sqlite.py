@@ -0,0 +1,122 @@
+import asyncio
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Final, TypeVar
+
+from storage.base import KeyValueBackend
+from storage.exceptions import StorageUnavailableError
+
+T = TypeVar("T")
+
+SCHEMA: Final[str] = """
+CREATE TABLE IF NOT EXISTS kv (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS kv_expires_at ON kv (expires_at);
+"""
+
+
+class SQLiteBackend(KeyValueBackend):
+    """SQLite database in WAL mode, shared by all worker processes on one host.
+
+    Every process keeps a single connection used from one dedicated thread, so the
+    event loop never blocks on disk I/O or database locks.
+    """
+
+    shared = True
+
+    SWEEP_INTERVAL: Final[float] = 60.0  # Seconds between purges of expired keys
+    BUSY_TIMEOUT: Final[float] = 5.0  # Seconds to wait for a write lock held by another process
+
+    def __init__(self, path: Path, prefix: str = "") -> None:
+        super().__init__(prefix)
+        self._path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-storage")
+        self._connection: sqlite3.Connection | None = None
+        self._next_sweep = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(
+                self._path,
+                timeout=self.BUSY_TIMEOUT,
+                isolation_level=None,  # Autocommit, every statement is its own transaction
+                check_same_thread=False,  # Created and used by the single executor thread
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")  # Durable enough in WAL mode, no fsync per commit
+            connection.executescript(SCHEMA)
+            self._connection = connection
+
+        return self._connection
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+
+        try:
+            return await loop.run_in_executor(self._executor, fn, *args)
+        except sqlite3.Error as e:
+            raise StorageUnavailableError() from e
+
+    def _get(self, key: str) -> bytes | None:
+        row = self._connect().execute(
+            "SELECT value FROM kv WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+
+        return None if row is None else row[0]
+
+    def _set(self, key: str, value: bytes, ttl: float) -> None:
+        connection = self._connect()
+        now = time.time()
+
+        if ttl <= 0:
+            connection.execute("DELETE FROM kv WHERE key = ?", (key,))
+            return
+
+        connection.execute(
+            "INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+            (key, value, now + ttl),
+        )
+
+        if now >= self._next_sweep:
+            connection.execute("DELETE FROM kv WHERE expires_at <= ?", (now,))
+            self._next_sweep = now + self.SWEEP_INTERVAL
+
+    def _delete(self, key: str) -> None:
+        self._connect().execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    def _pop(self, key: str) -> bytes | None:
+        # fetchall() steps the statement to completion, so the delete is committed right away
+        rows = self._connect().execute("DELETE FROM kv WHERE key = ? RETURNING value, expires_at", (key,)).fetchall()
+
+        if not rows or rows[0][1] <= time.time():
+            return None
+
+        return rows[0][0]
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._run(self._get, self._key(key))
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._run(self._set, self._key(key), value, ttl)
+
+    async def delete(self, key: str) -> None:
+        await self._run(self._delete, self._key(key))
+
+    async def pop(self, key: str) -> bytes | None:
+        return await self._run(self._pop, self._key(key))
+
+    async def close(self) -> None:
+        await self._run(self._close)
+        self._executor.shutdown(wait=False)
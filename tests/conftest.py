@@ -0,0 +1,49 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Required settings, real credentials and upstream connections are never needed by the tests
+TEST_ENV = {
+    "SERVER__RELOAD": "False",
+    "GOOGLE__OAUTH__CLIENT_ID": "test-google-client",
+    "GOOGLE__OAUTH__CLIENT_SECRET": "test-google-secret",
+    "YANDEX__OAUTH__CLIENT_ID": "test-yandex-client",
+    "YANDEX__OAUTH__CLIENT_SECRET": "test-yandex-secret",
+    "HTTP_CLIENT__WARMUP_CONNECTIONS": "0",
+    "TOKEN_REFRESH__ENABLED": "False",
+    "RATE_LIMIT__ENABLED": "False",
+    "LOG__ENABLED": "False",
+}
+
+for name, value in TEST_ENV.items():
+    os.environ.setdefault(name, value)
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+class Clock:
+    """Controllable clock, patched in place of `time` of the module under test."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> Clock:
+    return Clock()
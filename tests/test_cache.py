@@ -0,0 +1,75 @@
+import pytest
+
+from integrations import cache as cache_module
+from integrations.cache import ResponseCache, hash_token
+from integrations.yandex.client import YandexClient
+
+URL = "https://login.yandex.ru/info"
+
+
+@pytest.fixture
+def cache(monkeypatch, clock) -> ResponseCache:
+    monkeypatch.setattr(cache_module, "time", clock)
+
+    return ResponseCache(max_size=3)
+
+
+def test_entry_expires_after_ttl(cache, clock):
+    cache.set("key", "value", ttl=10)
+
+    clock.advance(9.9)
+    assert cache.get("key") == "value"
+
+    clock.advance(0.1)
+    assert cache.get("key") is None
+    assert len(cache) == 0
+    assert cache.stats() == {"size": 0, "hits": 1, "misses": 1}
+
+
+def test_non_positive_ttl_is_not_stored(cache):
+    cache.set("key", "value", ttl=0)
+
+    assert cache.get("key", "default") == "default"
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    for key in ("a", "b", "c"):
+        cache.set(key, key, ttl=60)
+
+    cache.get("a")  # Now b is the least recently used
+    cache.set("d", "d", ttl=60)
+
+    assert [cache.get(key) for key in ("a", "b", "c", "d")] == ["a", None, "c", "d"]
+
+
+def test_keys_of_different_tokens_are_isolated(cache):
+    first = cache.make_key("token-1", "get", URL, {"format": "json"})
+    second = cache.make_key("token-2", "GET", URL, {"format": "json"})
+    cache.set(first, "user-1", ttl=60)
+
+    assert cache.get(second) is None
+    assert first == cache.make_key("token-1", "GET", URL, {"format": "json"})
+    assert first != cache.make_key("token-1", "GET", URL, {"format": "xml"})
+    assert "token-1" not in repr(first)  # Raw credentials never end up in keys
+    assert first[0] == hash_token("token-1")
+
+
+def test_invalidate_drops_only_entries_of_token(cache):
+    cache.set(cache.make_key("token-1", "GET", URL), "user-1", ttl=60)
+    cache.set(cache.make_key("token-1", "GET", URL, {"page": 2}), "user-1 page 2", ttl=60)
+    cache.set(cache.make_key("token-2", "GET", URL), "user-2", ttl=60)
+
+    assert cache.invalidate("token-1") == 2
+    assert cache.get(cache.make_key("token-2", "GET", URL)) == "user-2"
+    assert cache.invalidate() == 1
+    assert len(cache) == 0
+
+
+def test_client_invalidate_cache_drops_responses_of_token():
+    client = YandexClient()
+    client.cache.set(client.cache.make_key("token-1", "GET", URL), "user-1", ttl=60)
+    client.cache.set(client.cache.make_key("token-2", "GET", URL), "user-2", ttl=60)
+
+    assert client.invalidate_cache("token-1") == 1
+    assert client.cache.get(client.cache.make_key("token-1", "GET", URL)) is None
+    assert client.cache.get(client.cache.make_key("token-2", "GET", URL)) == "user-2"
@@ -0,0 +1,177 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core.settings import settings
+from integrations.google import sync as sync_module
+from integrations.google.exceptions import GoogleAPIError
+from integrations.google.schemas import CalendarSyncEventSchema, CalendarSyncPageSchema
+from integrations.google.sync import CalendarSync, EventIndex
+
+NOW = datetime(2030, 1, 1, 12, tzinfo=timezone.utc)
+
+
+def event(event_id: str, start_hours: float, hours: float = 1, summary: str | None = None) -> dict:
+    start = NOW + timedelta(hours=start_hours)
+
+    return {
+        "id": event_id,
+        "summary": summary or event_id,
+        "start": {"dateTime": start.isoformat()},
+        "end": {"dateTime": (start + timedelta(hours=hours)).isoformat()},
+    }
+
+
+def cancelled(event_id: str) -> dict:
+    return {"id": event_id, "status": "cancelled"}
+
+
+def page(*events: dict, sync_token: str | None = None, page_token: str | None = None) -> CalendarSyncPageSchema:
+    return CalendarSyncPageSchema(items=list(events), nextSyncToken=sync_token, nextPageToken=page_token)
+
+
+class StubGoogleClient:
+    """Answers every iter_events_pages call with the next scripted list of pages (or error)."""
+
+    def __init__(self, *responses: list[CalendarSyncPageSchema] | Exception) -> None:
+        self.responses = list(responses)
+        self.calls: list[dict] = []
+
+    async def iter_events_pages(self, access_token: str, params: dict, context: str):
+        self.calls.append(dict(params))
+        response = self.responses.pop(0)
+
+        if isinstance(response, Exception):
+            raise response
+
+        for response_page in response:
+            yield response_page
+
+
+def summaries(index: EventIndex, hours_from: float = -48, hours_to: float = 48) -> list[str]:
+    time_min = (NOW + timedelta(hours=hours_from)).timestamp()
+    time_max = (NOW + timedelta(hours=hours_to)).timestamp()
+
+    return [item.summary for item in index.between(time_min, time_max, limit=100)]
+
+
+@pytest.fixture(autouse=True)
+def frozen_time(monkeypatch, clock):
+    clock.now = NOW.timestamp()
+    monkeypatch.setattr(sync_module, "time", clock)
+
+    return clock
+
+
+def test_index_orders_events_and_finds_those_in_progress():
+    index = EventIndex()
+    index.apply(
+        [CalendarSyncEventSchema(**event(*args)) for args in (("late", 5), ("long", -3, 4), ("early", 1))], "UTC"
+    )
+
+    assert summaries(index) == ["long", "early", "late"]
+    assert summaries(index, hours_from=0, hours_to=2) == ["long", "early"]  # long started before, still running
+
+
+@pytest.mark.anyio
+async def test_full_sync_then_incremental_changes():
+    client = StubGoogleClient(
+        [page(event("a", 1), event("b", 2), page_token="p2"), page(event("c", 3), sync_token="token-1")],
+        [page(cancelled("b"), event("c", 4, summary="c moved"), event("d", 5), sync_token="token-2")],
+    )
+    calendar_sync = CalendarSync(client)
+
+    index = await calendar_sync.get_index("user", "access")
+    assert summaries(index) == ["a", "b", "c"]
+    assert "syncToken" not in client.calls[0]
+    assert index.sync_token == "token-1"
+
+    index.synced_at -= settings.google.calendar.sync_interval  # Stale, next read syncs
+    index = await calendar_sync.get_index("user", "access")
+
+    assert client.calls[1]["syncToken"] == "token-1"
+    assert summaries(index) == ["a", "c moved", "d"]
+    assert index.sync_token == "token-2"
+
+
+@pytest.mark.anyio
+async def test_fresh_index_is_not_synced_again():
+    client = StubGoogleClient([page(event("a", 1), sync_token="token-1")])
+    calendar_sync = CalendarSync(client)
+
+    first = await calendar_sync.get_index("user", "access")
+
+    assert await calendar_sync.get_index("user", "access") is first
+    assert len(client.calls) == 1
+
+
+@pytest.mark.anyio
+async def test_expired_sync_token_resets_to_full_sync():
+    client = StubGoogleClient(
+        [page(event("a", 1), event("b", 2), sync_token="token-1")],
+        GoogleAPIError(410, "Sync token is no longer valid."),
+        [page(event("b", 2), sync_token="token-2")],  # "a" was deleted while the token was expired
+    )
+    calendar_sync = CalendarSync(client)
+
+    old_index = await calendar_sync.get_index("user", "access")
+    old_index.synced_at -= settings.google.calendar.sync_interval
+    index = await calendar_sync.get_index("user", "access")
+
+    assert index is not old_index  # Rebuilt, readers of the old one never see it half-filled
+    assert client.calls[1]["syncToken"] == "token-1"
+    assert "syncToken" not in client.calls[2]
+    assert summaries(index) == ["b"]
+    assert index.sync_token == "token-2"
+
+
+@pytest.mark.anyio
+async def test_upstream_outage_serves_stale_index():
+    client = StubGoogleClient(
+        [page(event("a", 1), sync_token="token-1")], GoogleAPIError(503, "Google is unavailable.")
+    )
+    calendar_sync = CalendarSync(client)
+
+    index = await calendar_sync.get_index("user", "access")
+    index.synced_at -= settings.google.calendar.sync_interval
+
+    assert await calendar_sync.get_index("user", "access") is index
+
+
+@pytest.mark.anyio
+async def test_events_past_retention_are_pruned(frozen_time):
+    retention_hours = settings.google.calendar.sync_retention / 3600
+    client = StubGoogleClient(
+        [page(event("old", -retention_hours - 2), event("recent", -retention_hours + 1), sync_token="token-1")]
+    )
+
+    index = await CalendarSync(client).get_index("user", "access")
+
+    assert summaries(index, hours_from=-retention_hours - 48) == ["recent"]
+    assert index.retained_from == frozen_time.now - settings.google.calendar.sync_retention
+
+
+@pytest.mark.anyio
+async def test_least_recently_used_user_index_is_evicted(monkeypatch):
+    calendar = settings.google.calendar.model_copy(update={"sync_max_users": 2})
+    monkeypatch.setattr(
+        sync_module,
+        "settings",
+        settings.model_copy(update={"google": settings.google.model_copy(update={"calendar": calendar})}),
+    )
+    client = StubGoogleClient(*([page(event("a", 1), sync_token="token")] for _ in range(4)))
+    calendar_sync = CalendarSync(client)
+
+    await calendar_sync.get_index("user-1", "access-1")
+    await calendar_sync.get_index("user-2", "access-2")
+    await calendar_sync.get_index("user-1", "access-1")  # Fresh, user-2 is now the least recently used
+    await calendar_sync.get_index("user-3", "access-3")
+
+    assert len(calendar_sync) == 2
+
+    await calendar_sync.get_index("user-1", "access-1")
+    assert len(client.calls) == 3  # user-1 still indexed
+
+    await calendar_sync.get_index("user-2", "access-2")
+    assert len(client.calls) == 4  # user-2 was evicted, synced from scratch
+    assert "syncToken" not in client.calls[3]
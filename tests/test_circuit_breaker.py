@@ -0,0 +1,77 @@
+import asyncio
+import time
+from typing import NoReturn
+
+import pytest
+from fastapi import HTTPException
+
+from core.settings import settings
+from integrations.base_api_client import BaseAPIClient
+from integrations.exceptions import UpstreamUnavailableError
+from integrations.resilience import CircuitState
+from integrations.transport import UpstreamResponse
+
+URL = "http://upstream.test/resource"
+
+
+class StubTransport:
+    """Answers 200 unless `hang` is set, then requests wait until cancelled."""
+
+    def __init__(self) -> None:
+        self.hang = False
+        self.started = asyncio.Event()
+
+    async def request(self, method: str, url: str, **kwargs) -> UpstreamResponse:
+        self.started.set()
+
+        if self.hang:
+            await asyncio.Event().wait()
+
+        return UpstreamResponse(status=200, headers={}, body=b"{}")
+
+
+class StubClient(BaseAPIClient):
+    provider = "stub"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.transport = StubTransport()
+
+    @staticmethod
+    def _handle_error(status: int, context: str) -> NoReturn:
+        raise HTTPException(status_code=status, detail=context)
+
+
+def open_breaker(client: StubClient) -> None:
+    breaker = client._breaker(URL)
+
+    for _ in range(settings.resilience.breaker_failure_threshold):
+        breaker.record_failure()
+
+    breaker._opened_at = time.monotonic() - settings.resilience.breaker_recovery_timeout  # Recovery timeout passed
+    assert breaker.state is CircuitState.HALF_OPEN
+
+
+@pytest.mark.anyio
+async def test_cancelled_probe_releases_half_open_breaker():
+    client = StubClient()
+    open_breaker(client)
+
+    client.transport.hang = True
+    probe = asyncio.create_task(client._request("GET", URL, context="Resource"))
+    await client.transport.started.wait()
+
+    with pytest.raises(UpstreamUnavailableError):  # Only one probe at a time
+        await client._request("GET", URL, context="Resource")
+
+    probe.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    client.transport.hang = False
+
+    response = await client._request("GET", URL, context="Resource")
+
+    assert response.status == 200
+    assert client._breaker(URL).state is CircuitState.CLOSED
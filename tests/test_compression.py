@@ -0,0 +1,132 @@
+import gzip
+import zlib
+
+import pytest
+from starlette.datastructures import Headers
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+
+from core.compression import BROTLI, GZIP, SUPPORTED_ENCODINGS, brotli, choose_encoding
+from middlewares.compression import CompressionMiddleware
+
+MINIMUM_SIZE = 100
+BODY = "compressible text " * 20  # Over MINIMUM_SIZE
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "available", "expected"),
+    [
+        ("gzip, deflate", (GZIP,), GZIP),
+        ("GZIP", (GZIP,), GZIP),
+        ("", (GZIP,), None),
+        ("identity", (GZIP,), None),
+        ("gzip;q=0", (GZIP,), None),
+        ("*;q=0, identity", (BROTLI, GZIP), None),
+        ("*", (BROTLI, GZIP), BROTLI),  # Server preference among equal weights
+        ("gzip, br", (BROTLI, GZIP), BROTLI),
+        ("gzip;q=1.0, br;q=0.5", (BROTLI, GZIP), GZIP),
+        ("br;q=0, *", (BROTLI, GZIP), GZIP),
+        ("br", (GZIP,), None),  # brotli package missing
+        ("br, gzip;q=0.5", (GZIP,), GZIP),
+        ("gzip;q=abc, br", (BROTLI, GZIP), BROTLI),  # Malformed weight is ignored
+    ],
+)
+def test_choose_encoding(accept_encoding, available, expected):
+    assert choose_encoding(accept_encoding, available) == expected
+
+
+@pytest.mark.skipif(brotli is not None, reason="brotli is installed")
+def test_brotli_is_not_offered_without_package():
+    assert SUPPORTED_ENCODINGS == (GZIP,)
+    assert choose_encoding("br") is None
+    assert choose_encoding("br, gzip") == GZIP
+
+
+async def run(response: Response, accept_encoding: str | None = "gzip") -> tuple[Headers, list[dict]]:
+    """Response start headers and body messages as sent through the middleware."""
+
+    async def app(scope, receive, send) -> None:
+        await response(scope, receive, send)
+
+    async def receive() -> dict:
+        return {"type": "http.disconnect"}
+
+    messages = []
+
+    async def send(message: dict) -> None:
+        messages.append(message)
+
+    headers = [] if accept_encoding is None else [(b"accept-encoding", accept_encoding.encode())]
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": headers, "query_string": b""}
+    await CompressionMiddleware(app, minimum_size=MINIMUM_SIZE)(scope, receive, send)
+
+    return Headers(raw=messages[0]["headers"]), [message for message in messages[1:] if message["body"]]
+
+
+@pytest.mark.anyio
+async def test_body_is_compressed_with_negotiated_encoding():
+    headers, messages = await run(PlainTextResponse(BODY, headers={"Vary": "Cookie"}))
+
+    body = b"".join(message["body"] for message in messages)
+    assert headers["Content-Encoding"] == "gzip"
+    assert headers["Content-Length"] == str(len(body))
+    assert gzip.decompress(body) == BODY.encode()
+    assert headers["Vary"] == "Cookie, Accept-Encoding"
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("accept_encoding", [None, "identity", "gzip;q=0"])
+async def test_identity_is_sent_as_is(accept_encoding):
+    headers, messages = await run(PlainTextResponse(BODY), accept_encoding)
+
+    assert "Content-Encoding" not in headers
+    assert messages[0]["body"] == BODY.encode()
+
+
+@pytest.mark.anyio
+async def test_body_below_minimum_size_is_sent_as_is():
+    headers, messages = await run(PlainTextResponse("short"))
+
+    assert "Content-Encoding" not in headers
+    assert headers["Content-Length"] == "5"
+    assert messages[0]["body"] == b"short"
+    assert headers["Vary"] == "Accept-Encoding"  # Larger bodies of the same URL may be compressed
+
+
+@pytest.mark.anyio
+async def test_already_encoded_response_is_passed_through():
+    precompressed = gzip.compress(BODY.encode())
+    headers, messages = await run(
+        Response(precompressed, media_type="text/plain", headers={"Content-Encoding": "gzip"})
+    )
+
+    assert messages[0]["body"] == precompressed
+    assert headers["Content-Length"] == str(len(precompressed))
+
+
+@pytest.mark.anyio
+async def test_incompressible_type_is_passed_through():
+    image = b"\x89PNG" + bytes(range(256)) * 2
+    headers, messages = await run(Response(image, media_type="image/png"))
+
+    assert "Content-Encoding" not in headers
+    assert messages[0]["body"] == image
+
+
+@pytest.mark.anyio
+async def test_streamed_chunks_are_flushed_one_by_one():
+    chunks = ["first chunk\n", "second chunk\n", "third chunk\n"]
+
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    headers, messages = await run(StreamingResponse(stream(), media_type="application/x-ndjson"))
+
+    assert headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in headers
+
+    # Every chunk decompresses on arrival, the client never waits for the end of the stream
+    decompressor = zlib.decompressobj(31)
+    received = [decompressor.decompress(message["body"]).decode() for message in messages]
+    assert received[: len(chunks)] == chunks
+    assert decompressor.eof
@@ -0,0 +1,47 @@
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from api.deps.getters import get_session_manager, get_yandex_client
+from core.constants import GOOGLE_SESSION_COOKIE_NAME, YANDEX_SESSION_COOKIE_NAME
+from main import app
+from sessions.exceptions import SessionExpiredError
+
+
+class StrictSchema(BaseModel):
+    id: str
+
+
+class FakeSessionManager:
+    async def get(self, session_id: str, provider: str):
+        raise SessionExpiredError()
+
+    async def get_access_token(self, session_id: str, provider: str) -> str:
+        return "access"
+
+
+class BrokenYandexClient:
+    async def get_user_info(self, access_token: str) -> StrictSchema:
+        return StrictSchema.model_validate({})  # Malformed upstream response raises ValidationError
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_session_manager] = FakeSessionManager
+    app.dependency_overrides[get_yandex_client] = BrokenYandexClient
+
+    with TestClient(app) as client:
+        yield client
+
+    app.dependency_overrides.clear()
+
+
+def test_unexpected_provider_error_is_reported_per_provider(client):
+    client.cookies.update({GOOGLE_SESSION_COOKIE_NAME: "google", YANDEX_SESSION_COOKIE_NAME: "yandex"})
+
+    response = client.get("/api/dashboard")
+
+    assert response.status_code == 200
+    errors = response.json()["errors"]
+    assert errors["google"]["status_code"] == 401
+    assert errors["yandex"] == {"status_code": 502, "detail": "Provider request failed."}
@@ -0,0 +1,128 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from storage.files import FileCache
+
+
+def content(body: bytes, media_type: str = "image/png"):
+    async def fetch() -> tuple[bytes, str]:
+        return body, media_type
+
+    return fetch
+
+
+def age(path, seconds: float) -> None:
+    """Make a blob look last used `seconds` ago."""
+
+    timestamp = time.time() - seconds
+    os.utime(path, (timestamp, timestamp))
+
+
+@pytest.fixture
+async def cache(tmp_path):
+    file_cache = FileCache(tmp_path, max_bytes=250)
+
+    yield file_cache
+
+    await file_cache.close()
+
+
+def blobs(cache: FileCache) -> int:
+    return sum(1 for path in cache._blobs.rglob("*") if path.is_file())
+
+
+@pytest.mark.anyio
+async def test_stored_file_is_served_by_content_digest(cache):
+    cached = await cache.get_or_fetch("avatar-1", content(b"x" * 100))
+
+    assert cached.path.read_bytes() == b"x" * 100
+    assert cached.media_type == "image/png"
+    assert cached.stat.st_size == 100
+    assert await cache.get("avatar-1") == cached
+    assert await cache.get("avatar-2") is None
+
+
+@pytest.mark.anyio
+async def test_identical_content_is_stored_once(cache):
+    first = await cache.get_or_fetch("avatar-1", content(b"same"))
+    second = await cache.get_or_fetch("avatar-2", content(b"same"))
+
+    assert first.path == second.path
+    assert blobs(cache) == 1
+
+
+@pytest.mark.anyio
+async def test_concurrent_misses_fetch_once(cache):
+    fetches = 0
+
+    async def fetch() -> tuple[bytes, str]:
+        nonlocal fetches
+        fetches += 1
+        await asyncio.sleep(0.01)
+        return b"body", "image/jpeg"
+
+    results = await asyncio.gather(*(cache.get_or_fetch("avatar-1", fetch) for _ in range(5)))
+
+    assert fetches == 1
+    assert len({result.path for result in results}) == 1
+
+
+@pytest.mark.anyio
+async def test_least_recently_used_blobs_are_evicted_over_byte_cap(cache):
+    first = await cache.get_or_fetch("avatar-1", content(b"1" * 100))
+    second = await cache.get_or_fetch("avatar-2", content(b"2" * 100))
+    age(first.path, 120)
+    age(second.path, 90)
+
+    assert await cache.get("avatar-1") is not None  # Hit refreshes recency, avatar-2 is now the oldest
+
+    third = await cache.get_or_fetch("avatar-3", content(b"3" * 100))  # 300 bytes > 250
+
+    assert await cache.get("avatar-2") is None
+    assert not second.path.exists()
+    assert await cache.get("avatar-1") is not None
+    assert await cache.get("avatar-3") == third
+    assert blobs(cache) == 2
+    assert sum(1 for _ in cache._keys.iterdir()) == 2  # Dangling key link removed too
+
+
+@pytest.mark.anyio
+async def test_eviction_frees_down_to_low_watermark(cache):
+    for n in range(5):
+        cached = await cache.get_or_fetch(f"avatar-{n}", content(bytes([n]) * 50))
+        age(cached.path, 100 - n)
+
+    await cache.get_or_fetch("avatar-5", content(b"5" * 50))  # 300 bytes, must fit 225
+
+    assert blobs(cache) == 4
+    assert [await cache.get(f"avatar-{n}") is not None for n in range(6)] == [False, False, True, True, True, True]
+
+
+@pytest.mark.anyio
+async def test_file_larger_than_cap_is_kept_until_the_next_store(cache):
+    large = await cache.get_or_fetch("large", content(b"L" * 300))
+
+    assert large.path.exists()  # Just stored, served to the caller
+    age(large.path, 10)
+
+    await cache.get_or_fetch("small", content(b"s" * 10))
+
+    assert not large.path.exists()
+    assert await cache.get("small") is not None
+
+
+@pytest.mark.anyio
+async def test_size_is_recovered_from_disk_by_another_instance(tmp_path):
+    first = FileCache(tmp_path, max_bytes=250)
+    old = await first.get_or_fetch("avatar-1", content(b"1" * 200))
+    age(old.path, 100)
+    await first.close()
+
+    second = FileCache(tmp_path, max_bytes=250)  # Another worker, or a restart
+    await second.get_or_fetch("avatar-2", content(b"2" * 100))
+
+    assert await second.get("avatar-1") is None
+    await second.close()
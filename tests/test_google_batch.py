@@ -0,0 +1,113 @@
+import re
+
+import pytest
+
+from integrations.google.batch import BatchResponsePart, build_batch_request, parse_batch_response
+
+REQUESTS = {
+    "0": "/calendar/v3/calendars/primary/events?maxResults=5",
+    "1": "/calendar/v3/calendars/team%40group.calendar.google.com/events?maxResults=5",
+}
+
+
+def batch_response(parts: dict[str, tuple[str, bytes]], boundary: str = "batch_response") -> tuple[bytes, str]:
+    """Batch response the way Google writes it: Content-ID <response-ID>, embedded HTTP response per part."""
+
+    lines = []
+
+    for content_id, (status_line, body) in parts.items():
+        lines += [
+            f"--{boundary}",
+            "Content-Type: application/http",
+            f"Content-ID: <response-{content_id}>",
+            "",
+            status_line,
+            "Content-Type: application/json; charset=UTF-8",
+            "",
+            body.decode(),
+        ]
+
+    lines += [f"--{boundary}--", ""]
+
+    return "\r\n".join(lines).encode(), f"multipart/mixed; boundary={boundary}"
+
+
+def test_request_encodes_every_get_with_its_content_id():
+    body, content_type = build_batch_request(REQUESTS)
+    boundary = re.fullmatch(r"multipart/mixed; boundary=(batch_\w+)", content_type).group(1)
+    parts = body.decode().split(f"--{boundary}")
+
+    assert parts[-1] == "--\r\n"
+    assert [re.search(r"Content-ID: <(.+)>\r\n\r\nGET (\S+)\r\n", part).groups() for part in parts[1:-1]] == list(
+        REQUESTS.items()
+    )
+
+
+def test_request_boundaries_are_unique():
+    assert build_batch_request(REQUESTS)[1] != build_batch_request(REQUESTS)[1]
+
+
+def test_round_trip_maps_responses_to_requests():
+    body, _ = build_batch_request(REQUESTS)
+    content_ids = re.findall(rb"Content-ID: <(.+)>", body)
+    response, content_type = batch_response(
+        {content_id.decode(): ("HTTP/1.1 200 OK", b'{"items": []}') for content_id in content_ids}
+    )
+
+    assert parse_batch_response(response, content_type) == {
+        content_id: BatchResponsePart(status=200, body=b'{"items": []}') for content_id in REQUESTS
+    }
+
+
+def test_part_statuses_are_kept_and_missing_parts_left_out():
+    response, content_type = batch_response(
+        {"0": ("HTTP/1.1 200 OK", b"{}"), "2": ("HTTP/1.1 404 Not Found", b'{"error": {"code": 404}}')}
+    )
+    parts = parse_batch_response(response, content_type)
+
+    assert sorted(parts) == ["0", "2"]
+    assert "1" not in parts  # Caller retries a calendar without an answer
+    assert parts["2"] == BatchResponsePart(status=404, body=b'{"error": {"code": 404}}')
+
+
+def test_quoted_boundary():
+    response, _ = batch_response({"0": ("HTTP/1.1 503 Service Unavailable", b"")}, boundary="b=1")
+
+    assert parse_batch_response(response, 'multipart/mixed; boundary="b=1"')["0"].status == 503
+
+
+def test_boundary_not_in_body_yields_no_parts():
+    response, _ = batch_response({"0": ("HTTP/1.1 200 OK", b"{}")})
+
+    assert parse_batch_response(response, "multipart/mixed; boundary=other_boundary") == {}
+
+
+@pytest.mark.parametrize(
+    ("body", "content_type"),
+    [
+        pytest.param(b"", "application/json", id="no boundary"),
+        pytest.param(
+            b"--b\r\nContent-Type: application/http\r\n\r\nHTTP/1.1 200 OK\r\n\r\n{}\r\n--b--",
+            "multipart/mixed; boundary=b",
+            id="no Content-ID",
+        ),
+        pytest.param(
+            b"--b\r\nContent-ID: <response-0>\r\n\r\nHTTP/1.1 200 OK\r\n--b--",
+            "multipart/mixed; boundary=b",
+            id="no embedded response body",
+        ),
+        pytest.param(
+            b"--b\r\nContent-ID: <response-0>\r\n\r\nHTTP/1.1\r\n\r\n{}\r\n--b--",
+            "multipart/mixed; boundary=b",
+            id="no status code",
+        ),
+        pytest.param(
+            b"--b\r\nContent-ID: <response-0>\r\n\r\nHTTP/1.1 OK 200\r\n\r\n{}\r\n--b--",
+            "multipart/mixed; boundary=b",
+            id="status code not a number",
+        ),
+    ],
+)
+def test_malformed_response_raises_value_error(body, content_type):
+    with pytest.raises(ValueError):
+        parse_batch_response(body, content_type)
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from integrations.google.client import GoogleClient
+from integrations.google.exceptions import GoogleAPIError
+from integrations.transport import UpstreamResponse
+
+CALENDARS = {
+    "items": [
+        {"id": "primary", "primary": True},
+        {"id": "broken@group.calendar.google.com", "selected": True},
+        {"id": "slow@group.calendar.google.com", "selected": True},
+    ]
+}
+EVENTS = {"items": [{"summary": "Planning", "start": {"dateTime": "2030-01-01T10:00:00Z"}, "end": {}}]}
+
+
+class CalendarTransport:
+    """Google Calendar stand-in, batch requests fail, so calendars are fetched one by one."""
+
+    def __init__(self, broken_status: int = 200) -> None:
+        self.broken_status = broken_status
+
+    async def request(self, method: str, url: str, **kwargs) -> UpstreamResponse:
+        if "/batch/" in url:
+            return UpstreamResponse(status=400, headers={}, body=b"{}")
+        if url.endswith("/users/me/calendarList"):
+            return UpstreamResponse(status=200, headers={}, body=json.dumps(CALENDARS).encode())
+        if "slow%40" in url or "slow@" in url:
+            raise TimeoutError()
+        if "broken%40" in url or "broken@" in url:
+            # Unexpected body (200) or an error of one calendar
+            body = b'{"items": "not a list"}' if self.broken_status == 200 else b"{}"
+            return UpstreamResponse(status=self.broken_status, headers={}, body=body)
+
+        return UpstreamResponse(status=200, headers={}, body=json.dumps(EVENTS).encode())
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("broken_status", [200, 403])
+async def test_failing_calendars_are_reported_not_raised(broken_status):
+    client = GoogleClient()
+    client.transport = CalendarTransport(broken_status)
+
+    upcoming = await client.get_upcoming_events("access", limit=5)
+
+    assert [event.summary for event in upcoming.items] == ["Planning"]
+    assert sorted(upcoming.failed_calendars) == ["broken@group.calendar.google.com", "slow@group.calendar.google.com"]
+
+
+@pytest.mark.anyio
+async def test_expired_token_fails_the_whole_response():
+    client = GoogleClient()
+    client.transport = CalendarTransport(broken_status=401)
+
+    with pytest.raises(GoogleAPIError) as error:
+        await client.get_upcoming_events("access", limit=5)
+
+    assert error.value.status_code == 401
@@ -0,0 +1,121 @@
+import base64
+import hashlib
+import json
+import time
+
+import pytest
+
+from integrations.google.exceptions import GoogleAPIError
+from integrations.google.id_token import SHA256_DIGEST_INFO_PREFIX, JWKSCache, verify_id_token
+
+AUDIENCE = "test-google-client"
+KID = "key-1"
+
+# Fixed 1024-bit RSA key, key size does not matter to the verifier
+P = int(
+    "c25655332aa50c2d0b43fa83eccbfda18d9cafcfa22888708aabaaec5c691477"
+    "cff59a75ef70847131b5000eb659f6e731b154c778527317d659019441ab0abd",
+    16,
+)
+Q = int(
+    "c176d928d4ca7bcae895949f4a53be8ee29a695db56bcadde6bc82dd121aa3f6"
+    "7311047bce0b42983e38583db74264cb90ed5a87f11054aac105f185d16938db",
+    16,
+)
+N = P * Q
+E = 65537
+D = pow(E, -1, (P - 1) * (Q - 1))
+
+
+def b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def encode(part: object) -> str:
+    return b64url(json.dumps(part).encode())
+
+
+def sign(signing_input: str) -> str:
+    size = (N.bit_length() + 7) // 8
+    digest_info = SHA256_DIGEST_INFO_PREFIX + hashlib.sha256(signing_input.encode()).digest()
+    encoded = b"\x00\x01" + b"\xff" * (size - len(digest_info) - 3) + b"\x00" + digest_info
+
+    return b64url(pow(int.from_bytes(encoded, "big"), D, N).to_bytes(size, "big"))
+
+
+def token(header: object | None = None, **claims: object) -> str:
+    now = int(time.time())
+    claims = {
+        "iss": "https://accounts.google.com",
+        "aud": AUDIENCE,
+        "sub": "user-1",
+        "iat": now,
+        "exp": now + 3600,
+        **claims,
+    }
+    signing_input = f"{encode({'alg': 'RS256', 'kid': KID} if header is None else header)}.{encode(claims)}"
+
+    return f"{signing_input}.{sign(signing_input)}"
+
+
+async def fetch_keys() -> tuple[dict, int]:
+    size = (N.bit_length() + 7) // 8
+    jwk = {"kty": "RSA", "kid": KID, "n": b64url(N.to_bytes(size, "big")), "e": b64url(E.to_bytes(3, "big"))}
+
+    return {"keys": [jwk]}, 3600
+
+
+async def verify(id_token: str):
+    return await verify_id_token(id_token, JWKSCache(fetch_keys), AUDIENCE)
+
+
+@pytest.mark.anyio
+async def test_valid_token():
+    claims = await verify(token(email="user@example.com"))
+
+    assert (claims.sub, claims.email) == ("user-1", "user@example.com")
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "id_token",
+    [
+        pytest.param("not-a-jwt", id="not three parts"),
+        pytest.param("!!.!!.!!", id="bad base64"),
+        pytest.param(token(header=[]), id="header is a list"),
+        pytest.param(token(header="x"), id="header is a string"),
+        pytest.param(token(header={"alg": "RS256", "kid": ["key-1"]}), id="kid is not a string"),
+        pytest.param(token(header={"alg": "HS256", "kid": KID}), id="bad alg"),
+        pytest.param(token(header={"alg": "none", "kid": KID}), id="alg none"),
+        pytest.param(token(header={"alg": "RS256"}), id="no kid"),
+        pytest.param(token(header={"alg": "RS256", "kid": "rotated-away"}), id="unknown kid"),
+        pytest.param(token().rsplit(".", 1)[0] + "." + sign("other input"), id="bad signature"),
+        pytest.param(token(aud="another-client"), id="wrong aud"),
+        pytest.param(token(iss="https://evil.example.com"), id="wrong iss"),
+    ],
+)
+async def test_invalid_token(id_token):
+    with pytest.raises(GoogleAPIError) as error:
+        await verify(id_token)
+
+    assert (error.value.status_code, error.value.detail) == (401, "Invalid ID token.")
+
+
+@pytest.mark.anyio
+async def test_claims_not_an_object():
+    signing_input = f"{encode({'alg': 'RS256', 'kid': KID})}.{encode(['user-1'])}"
+
+    with pytest.raises(GoogleAPIError) as error:
+        await verify(f"{signing_input}.{sign(signing_input)}")
+
+    assert error.value.status_code == 401
+
+
+@pytest.mark.anyio
+async def test_expired_token():
+    now = int(time.time())
+
+    with pytest.raises(GoogleAPIError) as error:
+        await verify(token(iat=now - 7200, exp=now - 3600))
+
+    assert (error.value.status_code, error.value.detail) == (401, "ID token expired.")
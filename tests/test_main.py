@@ -0,0 +1,41 @@
+import pytest
+
+import main
+from core.settings import settings
+
+
+def configure(monkeypatch, workers: int, backend: str) -> list[dict]:
+    runs = []
+    monkeypatch.setattr(
+        main,
+        "settings",
+        settings.model_copy(
+            update={
+                "server": settings.server.model_copy(update={"workers": workers}),
+                "storage": settings.storage.model_copy(update={"backend": backend}),
+            }
+        ),
+    )
+    monkeypatch.setattr(main.os, "cpu_count", lambda: 8)
+    monkeypatch.setattr(main.uvicorn, "run", lambda *args, **kwargs: runs.append(kwargs))
+
+    return runs
+
+
+@pytest.mark.parametrize("workers", [4, 0])
+def test_several_workers_with_memory_storage_refuse_to_start(monkeypatch, workers):
+    runs = configure(monkeypatch, workers, "memory")
+
+    with pytest.raises(SystemExit, match="STORAGE__BACKEND"):
+        main.main()
+
+    assert runs == []
+
+
+@pytest.mark.parametrize(("workers", "backend", "started"), [(1, "memory", 1), (4, "sqlite", 4), (0, "redis", 8)])
+def test_workers_start_with_suitable_storage(monkeypatch, workers, backend, started):
+    runs = configure(monkeypatch, workers, backend)
+
+    main.main()
+
+    assert runs[0]["workers"] == started
@@ -0,0 +1,57 @@
+import pytest
+
+from core.constants import OAUTH_STATE_KEY_PREFIX
+from sessions.store import KeyValueSessionStore
+from storage.memory import MemoryBackend
+
+SESSION_KEY = KeyValueSessionStore.KEY_PREFIX + "session-1"
+
+
+def backend() -> MemoryBackend:
+    return MemoryBackend(3, limits={KeyValueSessionStore.KEY_PREFIX: None, OAUTH_STATE_KEY_PREFIX: 10})
+
+
+@pytest.mark.anyio
+async def test_state_burst_does_not_evict_session():
+    storage = backend()
+    await storage.set(SESSION_KEY, b"session", 3600)
+
+    for n in range(1000):
+        await storage.set(f"{OAUTH_STATE_KEY_PREFIX}{n}", b"google", 600)
+
+    assert await storage.get(SESSION_KEY) == b"session"
+    assert await storage.get(f"{OAUTH_STATE_KEY_PREFIX}0") is None  # Oldest states evicted within their own bound
+    assert await storage.get(f"{OAUTH_STATE_KEY_PREFIX}999") == b"google"
+    assert len(storage) == 1 + 10
+
+
+@pytest.mark.anyio
+async def test_unbounded_namespace_loses_entries_only_to_ttl():
+    storage = backend()
+
+    for n in range(100):
+        await storage.set(f"{KeyValueSessionStore.KEY_PREFIX}{n}", b"session", 3600)
+
+    for n in range(100):
+        await storage.set(f"cache:{n}", b"cached", 3600)
+
+    assert all([await storage.get(f"{KeyValueSessionStore.KEY_PREFIX}{n}") for n in range(100)])
+    assert [await storage.get(f"cache:{n}") for n in (96, 97, 98, 99)] == [None, b"cached", b"cached", b"cached"]
+
+    await storage.set(SESSION_KEY, b"session", 0)
+
+    assert await storage.get(SESSION_KEY) is None
+
+
+@pytest.mark.anyio
+async def test_pop_and_delete_use_key_namespace():
+    storage = backend()
+    await storage.set(f"{OAUTH_STATE_KEY_PREFIX}state", b"yandex", 600)
+    await storage.set(SESSION_KEY, b"session", 3600)
+
+    assert await storage.pop(f"{OAUTH_STATE_KEY_PREFIX}state") == b"yandex"
+    assert await storage.pop(f"{OAUTH_STATE_KEY_PREFIX}state") is None
+
+    await storage.delete(SESSION_KEY)
+
+    assert len(storage) == 0
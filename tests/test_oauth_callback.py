@@ -0,0 +1,98 @@
+from types import SimpleNamespace
+from typing import NoReturn
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.deps.getters import get_google_client, get_yandex_client
+from core.constants import GOOGLE_SESSION_COOKIE_NAME, STATE_COOKIE_NAME, YANDEX_SESSION_COOKIE_NAME
+from integrations.exceptions import UpstreamTimeoutError
+from main import app
+
+
+class FakeYandexClient:
+    def __init__(self) -> None:
+        self.exchanged_codes: list[str] = []
+
+    async def get_auth_tokens(self, code: str) -> SimpleNamespace:
+        self.exchanged_codes.append(code)
+
+        return SimpleNamespace(access_token=f"access-{code}", expires_in=3600, refresh_token=None)
+
+
+class FakeGoogleClient:
+    async def get_auth_tokens(self, code: str) -> SimpleNamespace:
+        return SimpleNamespace(access_token=f"access-{code}", expires_in=3600, refresh_token=None, id_token="id")
+
+    async def verify_id_token(self, id_token: str) -> NoReturn:
+        raise UpstreamTimeoutError()  # Signing keys could not be fetched
+
+
+@pytest.fixture
+def yandex_client():
+    client = FakeYandexClient()
+    app.dependency_overrides[get_yandex_client] = lambda: client
+
+    yield client
+
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def browser():
+    with TestClient(app, follow_redirects=False) as client:
+        yield client
+
+
+def login(browser: TestClient, provider: str = "yandex") -> str:
+    response = browser.get(f"/api/{provider}/auth/login")
+    assert response.status_code == 307
+
+    return browser.cookies[STATE_COOKIE_NAME]
+
+
+def test_sequential_repeated_callback_reuses_session(browser, yandex_client):
+    state = login(browser)
+    params = {"code": "code-1", "state": state}
+
+    first = browser.get("/api/yandex/auth/callback", params=params)
+    assert first.status_code == 307
+    session_id = first.cookies[YANDEX_SESSION_COOKIE_NAME]
+
+    # Browser cookie jar after the first callback, as a reload or navigation after prefetch sends it
+    repeat = browser.get("/api/yandex/auth/callback", params=params)
+
+    assert repeat.status_code == 307
+    assert repeat.cookies[YANDEX_SESSION_COOKIE_NAME] == session_id
+    assert yandex_client.exchanged_codes == ["code-1"]
+
+
+def test_repeated_callback_with_another_code_is_rejected(browser, yandex_client):
+    state = login(browser)
+
+    assert browser.get("/api/yandex/auth/callback", params={"code": "code-1", "state": state}).status_code == 307
+    assert browser.get("/api/yandex/auth/callback", params={"code": "code-2", "state": state}).status_code == 400
+    assert yandex_client.exchanged_codes == ["code-1"]
+
+
+def test_callback_without_state_cookie_is_rejected(browser, yandex_client):
+    state = login(browser)
+    browser.cookies.clear()
+
+    response = browser.get("/api/yandex/auth/callback", params={"code": "code-1", "state": state})
+
+    assert response.status_code == 401
+    assert yandex_client.exchanged_codes == []
+
+
+def test_google_callback_falls_back_to_userinfo_when_signing_keys_fail(browser):
+    app.dependency_overrides[get_google_client] = FakeGoogleClient
+    state = login(browser, "google")
+
+    try:
+        response = browser.get("/api/google/auth/callback", params={"code": "code-1", "state": state})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 307
+    assert GOOGLE_SESSION_COOKIE_NAME in response.cookies
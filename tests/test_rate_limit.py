@@ -0,0 +1,126 @@
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from core.constants import YANDEX_SESSION_COOKIE_NAME
+from middlewares import rate_limit
+from middlewares.rate_limit import RateLimitMiddleware, TokenBucketLimiter
+from sessions.manager import SessionManager
+from sessions.schemas import OAuthProvider, SessionData
+from sessions.store import KeyValueSessionStore
+from storage.memory import MemoryBackend
+
+
+async def ok(request) -> PlainTextResponse:
+    return PlainTextResponse("ok")
+
+
+@pytest.fixture
+def limiter(monkeypatch, clock) -> TokenBucketLimiter:
+    monkeypatch.setattr(rate_limit, "time", clock)
+
+    return TokenBucketLimiter(rate=2, burst=3, max_keys=2)
+
+
+def test_burst_then_wait_until_next_token(limiter, clock):
+    assert [limiter.acquire("client") for _ in range(3)] == [0, 0, 0]
+    assert limiter.acquire("client") == pytest.approx(0.5)  # One token per 1 / rate seconds
+
+    clock.advance(0.25)
+    assert limiter.acquire("client") == pytest.approx(0.25)
+
+
+def test_tokens_refill_at_rate_up_to_burst(limiter, clock):
+    for _ in range(3):
+        limiter.acquire("client")
+
+    clock.advance(1)  # Two tokens back
+    assert [limiter.acquire("client") for _ in range(3)] == [0, 0, pytest.approx(0.5)]
+
+    clock.advance(60)  # Refill is capped at burst
+    assert [limiter.acquire("client") > 0 for _ in range(4)] == [False, False, False, True]
+
+
+def test_rejected_requests_do_not_take_tokens(limiter, clock):
+    for _ in range(3):
+        limiter.acquire("client")
+
+    for _ in range(10):
+        limiter.acquire("client")
+
+    clock.advance(0.5)
+    assert limiter.acquire("client") == 0
+
+
+def test_clients_have_separate_buckets(limiter):
+    for _ in range(3):
+        limiter.acquire("first")
+
+    assert limiter.acquire("first") > 0
+    assert limiter.acquire("second") == 0
+
+
+def test_least_recently_seen_buckets_are_dropped_beyond_max_keys(limiter):
+    for _ in range(3):
+        limiter.acquire("first")
+
+    limiter.acquire("second")
+    limiter.acquire("third")  # max_keys=2, "first" is dropped with its empty bucket
+
+    assert len(limiter) == 2
+    assert "first" not in limiter
+    assert limiter.acquire("first") == 0  # Starts over with a full bucket
+
+
+def test_retry_after_is_rounded_up_to_whole_seconds(monkeypatch, clock):
+    monkeypatch.setattr(rate_limit, "time", clock)
+    app = Starlette(routes=[Route("/api/data", ok), Route("/health", ok)])
+    app.add_middleware(RateLimitMiddleware, rate=0.4, burst=1, max_clients=100)
+    client = TestClient(app)
+
+    assert client.get("/api/data").status_code == 200
+
+    limited = client.get("/api/data")
+    assert limited.status_code == 429
+    assert limited.headers["Retry-After"] == "3"  # 2.5 seconds until the next token
+    assert client.get("/health").status_code == 200  # Only /api is limited
+
+    clock.advance(2.5)
+    assert client.get("/api/data").status_code == 200
+
+
+@pytest.fixture
+def session_limited_app():
+    app = Starlette(routes=[Route("/api/data", ok)])
+    app.state.session_manager = SessionManager(KeyValueSessionStore(MemoryBackend(max_size=100)), {})
+    app.add_middleware(RateLimitMiddleware, rate=0.001, burst=3, max_clients=100, key="session")
+
+    return app
+
+
+def get(client: TestClient, session_id: str) -> int:
+    client.cookies = {YANDEX_SESSION_COOKIE_NAME: session_id}
+
+    return client.get("/api/data").status_code
+
+
+def test_made_up_session_cookies_share_the_address_bucket(session_limited_app):
+    client = TestClient(session_limited_app)
+
+    assert [get(client, f"random-{n}") for n in range(5)] == [200, 200, 200, 429, 429]
+
+
+def test_stored_session_gets_its_own_bucket(session_limited_app):
+    session = SessionData(
+        id="session-1", provider=OAuthProvider.YANDEX, access_token="access", refresh_token=None, expires_at=2e9
+    )
+    client = TestClient(session_limited_app)
+
+    with client:
+        client.portal.call(session_limited_app.state.session_manager._save, session)
+
+    # First request is charged to the address until the session is found, then the session bucket is used
+    assert [get(client, session.id) for _ in range(4)] == [200, 200, 200, 429]
+    assert [get(client, f"random-{n}") for n in range(3)] == [200, 200, 429]
@@ -0,0 +1,95 @@
+import json
+import time
+
+import pytest
+
+from integrations.exceptions import UpstreamRateLimitedError
+from integrations.transport import UpstreamResponse
+from integrations.yandex.client import YandexClient
+from integrations.yandex.exceptions import YandexAPIError
+from sessions.exceptions import SessionExpiredError
+from sessions.manager import SessionManager
+from sessions.schemas import OAuthProvider, SessionData
+from sessions.store import KeyValueSessionStore
+from storage.memory import MemoryBackend
+
+
+class StubTransport:
+    def __init__(self, status: int, body: dict, headers: dict | None = None) -> None:
+        self.response = UpstreamResponse(status=status, headers=headers or {}, body=json.dumps(body).encode())
+        self.calls = 0
+
+    async def request(self, method: str, url: str, **kwargs) -> UpstreamResponse:
+        self.calls += 1
+        return self.response
+
+
+async def refresh(transport: StubTransport) -> tuple[SessionManager, SessionData]:
+    client = YandexClient()
+    client.transport = transport
+    manager = SessionManager(KeyValueSessionStore(MemoryBackend(max_size=100)), {OAuthProvider.YANDEX: client})
+    session = SessionData(
+        id="session-1",
+        provider=OAuthProvider.YANDEX,
+        access_token="access",
+        refresh_token="refresh",
+        expires_at=time.time() - 1,
+    )
+    await manager._save(session)
+
+    return manager, session
+
+
+@pytest.mark.anyio
+async def test_invalid_grant_deletes_session():
+    manager, session = await refresh(StubTransport(400, {"error": "invalid_grant"}))
+
+    with pytest.raises(SessionExpiredError):
+        await manager.refresh(session)
+
+    with pytest.raises(SessionExpiredError):
+        await manager.get(session.id, OAuthProvider.YANDEX)
+
+
+@pytest.mark.anyio
+async def test_rate_limited_refresh_keeps_session():
+    manager, session = await refresh(StubTransport(429, {"error": "too_many_requests"}, {"Retry-After": "7"}))
+
+    with pytest.raises(UpstreamRateLimitedError) as error:
+        await manager.refresh(session)
+
+    assert error.value.status_code == 429
+    assert error.value.headers == {"Retry-After": "7"}
+    assert await manager._store.get(session.id) == session
+
+
+@pytest.mark.anyio
+async def test_other_client_error_keeps_session():
+    manager, session = await refresh(StubTransport(400, {"error": "invalid_request"}))
+
+    with pytest.raises(YandexAPIError):
+        await manager.refresh(session)
+
+    assert await manager._store.get(session.id) == session
+
+
+@pytest.mark.anyio
+async def test_scheduled_refresh_skips_session_refreshed_by_another_worker():
+    transport = StubTransport(200, {"access_token": "new", "expires_in": 3600, "token_type": "bearer"})
+    manager, session = await refresh(transport)
+    backend = manager._store
+
+    # Another worker sharing the store has refreshed it, this worker's schedule entry is stale
+    fresh = session.model_copy(update={"access_token": "other-worker", "expires_at": time.time() + 3600})
+    await backend.set(fresh, 3600)
+
+    await manager.refresh_by_id(session.id)
+
+    assert transport.calls == 0
+    assert await backend.get(session.id) == fresh
+
+    await backend.set(session, 3600)  # Still expiring, the scheduled refresh goes through
+    await manager.refresh_by_id(session.id)
+
+    assert transport.calls == 1
+    assert (await backend.get(session.id)).access_token == "new"
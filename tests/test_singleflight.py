@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from integrations.singleflight import SingleFlight
+
+
+@pytest.mark.anyio
+async def test_concurrent_calls_share_one_call():
+    flight = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def fetch() -> str:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "value"
+
+    callers = [asyncio.create_task(flight.do("key", fetch)) for _ in range(5)]
+    await asyncio.sleep(0)
+
+    assert len(flight) == 1
+
+    release.set()
+
+    assert await asyncio.gather(*callers) == ["value"] * 5
+    assert calls == 1
+    assert len(flight) == 0
+
+
+@pytest.mark.anyio
+async def test_different_keys_are_not_coalesced():
+    flight = SingleFlight()
+
+    async def fetch(value: str) -> str:
+        await asyncio.sleep(0)
+        return value
+
+    assert await asyncio.gather(flight.do("a", lambda: fetch("a")), flight.do("b", lambda: fetch("b"))) == ["a", "b"]
+
+
+@pytest.mark.anyio
+async def test_error_is_propagated_to_every_caller_and_not_remembered():
+    flight = SingleFlight()
+    calls = 0
+
+    async def fail() -> None:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        raise ValueError("upstream failed")
+
+    results = await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert calls == 1
+
+    with pytest.raises(ValueError):
+        await flight.do("key", fail)  # Next call starts afresh
+
+    assert calls == 2
+
+
+@pytest.mark.anyio
+async def test_cancelled_caller_does_not_cancel_shared_call():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def fetch() -> str:
+        await release.wait()
+        return "value"
+
+    first = asyncio.create_task(flight.do("key", fetch))
+    second = asyncio.create_task(flight.do("key", fetch))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    release.set()
+
+    assert await second == "value"
+    assert first.cancelled()
+
+
+@pytest.mark.anyio
+async def test_running_joins_only_in_flight_call():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def fetch() -> str:
+        await release.wait()
+        return "value"
+
+    assert flight.running("key") is None
+
+    caller = asyncio.create_task(flight.do("key", fetch))
+    await asyncio.sleep(0)
+    joined = flight.running("key")
+    release.set()
+
+    assert await joined == "value"
+    assert await caller == "value"
@@ -0,0 +1,133 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+from storage.exceptions import StorageUnavailableError
+from storage.memory import MemoryBackend
+from storage.redis import RedisBackend
+from storage.sqlite import SQLiteBackend
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from fake_redis import FakeRedis  # noqa: E402
+
+TTL = 0.05  # Short enough to wait out in tests (in seconds)
+
+
+@pytest.fixture
+async def redis_url():
+    server = await FakeRedis(password="secret").start("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    async with server:
+        yield f"redis://127.0.0.1:{port}/1"
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+async def backend(request, tmp_path, redis_url):
+    if request.param == "memory":
+        storage = MemoryBackend(max_size=100, prefix="test:")
+    elif request.param == "sqlite":
+        storage = SQLiteBackend(tmp_path / "storage.sqlite3", prefix="test:")
+    else:
+        storage = RedisBackend(redis_url, password="secret", prefix="test:")
+
+    yield storage
+
+    await storage.close()
+
+
+@pytest.mark.anyio
+async def test_get_set_delete(backend):
+    value = b"binary\r\n$-1\r\n\x00value"  # Survives RESP framing
+
+    assert await backend.get("key") is None
+
+    await backend.set("key", value, 60)
+    assert await backend.get("key") == value
+
+    await backend.set("key", b"replaced", 60)
+    assert await backend.get("key") == b"replaced"
+
+    await backend.delete("key")
+    await backend.delete("key")  # Deleting a missing key is fine
+    assert await backend.get("key") is None
+
+
+@pytest.mark.anyio
+async def test_pop_consumes_value_once(backend):
+    await backend.set("state", b"google", 60)
+
+    results = await asyncio.gather(*(backend.pop("state") for _ in range(5)))
+
+    assert sorted(results, key=bool) == [None, None, None, None, b"google"]
+    assert await backend.get("state") is None
+
+
+@pytest.mark.anyio
+async def test_entries_expire_after_ttl(backend):
+    await backend.set("short", b"value", TTL)
+    await backend.set("popped", b"value", TTL)
+    await backend.set("long", b"value", 60)
+
+    await asyncio.sleep(TTL * 2)
+
+    assert await backend.get("short") is None
+    assert await backend.pop("popped") is None
+    assert await backend.get("long") == b"value"
+
+
+@pytest.mark.anyio
+async def test_non_positive_ttl_deletes_key(backend):
+    await backend.set("key", b"value", 60)
+    await backend.set("key", b"value", 0)
+
+    assert await backend.get("key") is None
+
+
+@pytest.mark.anyio
+async def test_sqlite_is_shared_by_connections_to_one_file(tmp_path):
+    first = SQLiteBackend(tmp_path / "storage.sqlite3")
+    second = SQLiteBackend(tmp_path / "storage.sqlite3")
+
+    try:
+        await first.set("session", b"data", 60)
+
+        assert await second.pop("session") == b"data"
+        assert await first.get("session") is None
+    finally:
+        await first.close()
+        await second.close()
+
+
+@pytest.mark.anyio
+async def test_redis_prefix_and_reused_connections(redis_url):
+    backend = RedisBackend(redis_url, password="secret", pool_size=2, prefix="service:")
+
+    try:
+        await asyncio.gather(*(backend.set(f"key-{n}", b"value", 60) for n in range(10)))
+
+        assert await backend.get("key-9") == b"value"
+        assert len(backend._idle) <= 2
+    finally:
+        await backend.close()
+
+
+@pytest.mark.anyio
+async def test_redis_wrong_password_is_unavailable(redis_url):
+    backend = RedisBackend(redis_url, password="wrong")
+
+    with pytest.raises(StorageUnavailableError):
+        await backend.get("key")
+
+    assert backend._idle == []  # Connection in unknown state is dropped
+
+
+@pytest.mark.anyio
+async def test_redis_unreachable_is_unavailable():
+    backend = RedisBackend("redis://127.0.0.1:1/0", timeout=0.5)
+
+    with pytest.raises(StorageUnavailableError):
+        await backend.set("key", b"value", 60)
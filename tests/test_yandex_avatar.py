@@ -0,0 +1,128 @@
+from types import SimpleNamespace
+from typing import NoReturn
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from fastapi.testclient import TestClient
+
+from api.deps.auth import get_yandex_access_token
+from api.deps.getters import get_avatar_cache, get_yandex_client
+from core.settings import settings
+from integrations.transport import AiohttpTransport, HttpxTransport, ResponseTooLargeError
+from integrations.yandex.client import YandexClient
+from integrations.yandex.exceptions import YandexAPIError
+from integrations.yandex.schemas import YandexAvatarSize
+from main import app
+from storage.files import FileCache
+
+MAX_BODY = 1024
+
+
+class FakeYandexClient:
+    def __init__(self) -> None:
+        self.avatar = b"first-avatar"
+
+    async def get_user_info(self, access_token: str) -> SimpleNamespace:
+        return SimpleNamespace(default_avatar_id=f"avatar-{self.avatar.decode()}", is_avatar_empty=False)
+
+    async def get_avatar(self, avatar_id: str, size: YandexAvatarSize) -> tuple[bytes, str]:
+        return self.avatar, "image/png"
+
+
+@pytest.fixture
+def browser(tmp_path):
+    client = FakeYandexClient()
+    cache = FileCache(tmp_path, 1024 * 1024)
+    app.dependency_overrides[get_yandex_client] = lambda: client
+    app.dependency_overrides[get_yandex_access_token] = lambda: "access"
+    app.dependency_overrides[get_avatar_cache] = lambda: cache
+
+    with TestClient(app) as browser:
+        browser.yandex = client
+        yield browser
+
+    app.dependency_overrides.clear()
+
+
+def test_avatar_is_revalidated_by_etag(browser):
+    first = browser.get("/api/yandex/avatar/islands-50")
+
+    assert first.status_code == 200
+    assert first.content == b"first-avatar"
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    unchanged = browser.get("/api/yandex/avatar/islands-50", headers={"If-None-Match": first.headers["ETag"]})
+    assert unchanged.status_code == 304
+
+    browser.yandex.avatar = b"other-account-avatar"  # Same URL, another account or a changed avatar
+    changed = browser.get("/api/yandex/avatar/islands-50", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert changed.status_code == 200
+    assert changed.content == b"other-account-avatar"
+    assert changed.headers["ETag"] != first.headers["ETag"]
+
+
+async def stream_body(request: web.Request) -> web.StreamResponse:
+    """Chunked body without Content-Length, only streaming can stop it at the limit."""
+
+    response = web.StreamResponse(headers={"Content-Type": "image/png"})
+    await response.prepare(request)
+
+    for _ in range(int(request.query["chunks"])):
+        await response.write(b"x" * 256)
+
+    await response.write_eof()
+
+    return response
+
+
+async def sized_body(request: web.Request) -> web.Response:
+    return web.Response(body=b"x" * int(request.query["size"]), content_type="image/png")
+
+
+@pytest.fixture
+async def upstream():
+    app_ = web.Application()
+    app_.router.add_get("/stream", stream_body)
+    app_.router.add_get("/sized", sized_body)
+
+    async with TestServer(app_) as server:
+        yield server
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("transport_class", [AiohttpTransport, HttpxTransport])
+@pytest.mark.parametrize("path", ["/stream?chunks=100", f"/sized?size={MAX_BODY + 1}"])
+async def test_transport_stops_reading_past_max_body(upstream, transport_class, path):
+    transport = transport_class()
+
+    try:
+        with pytest.raises(ResponseTooLargeError):
+            await transport.request("GET", str(upstream.make_url(path)), max_body=MAX_BODY)
+
+        response = await transport.request("GET", str(upstream.make_url("/stream?chunks=4")), max_body=MAX_BODY)
+        assert response.body == b"x" * MAX_BODY
+    finally:
+        await transport.close()
+
+
+class OversizedTransport:
+    def __init__(self) -> None:
+        self.max_body: int | None = None
+
+    async def request(self, method: str, url: str, *, max_body: int | None = None, **kwargs) -> NoReturn:
+        self.max_body = max_body
+        raise ResponseTooLargeError(max_body)
+
+
+@pytest.mark.anyio
+async def test_oversized_avatar_is_rejected():
+    client = YandexClient()
+    client.transport = OversizedTransport()
+
+    with pytest.raises(YandexAPIError) as error:
+        await client.get_avatar("avatar-1", YandexAvatarSize.ISLANDS_50)
+
+    assert error.value.status_code == 502
+    assert client.transport.max_body == settings.yandex.avatar.max_file_size